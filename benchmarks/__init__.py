@@ -0,0 +1,6 @@
+"""
+Benchmarks for UCLV Downloader
+
+Run from the project root, e.g.:
+    python -m benchmarks.bench_listing_parser
+"""
@@ -0,0 +1,281 @@
+"""
+Benchmark: listing, end-to-end download and progress overhead of UCLVDownloader against a fake site
+
+Every number comes from a local fake_visuales server with deterministic content, so JSON
+results from different commits can be compared with --compare.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fake_visuales import PROJECT_ROOT, start_server_process
+from core import SessionFactory, UCLVDownloader
+from core.downloaders import DownloadProgress, ListingCache, RetryPolicy
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Windows
+
+
+# Metrics printed by --compare: (section, key, higher is better)
+COMPARED_METRICS = (
+    ('listing', 'cold_s', False),
+    ('listing', 'revalidate_s', False),
+    ('transfer', 'mb_per_s', True),
+    ('transfer', 'cpu_s_per_gb', False),
+    ('transfer', 'peak_rss_mb', False),
+    ('progress', 'update_us', False),
+    ('progress', 'poller_cpu_overhead', False),
+    ('errors', 'wall_s', False),
+)
+
+
+def server_stats(root_url: str) -> Dict[str, int]:
+    """Request counters of the fake site"""
+    stats_url = root_url.split('/Series/')[0] + '/__stats__'
+    with urllib.request.urlopen(stats_url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def stats_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Counters that changed between two server_stats calls"""
+    return {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit() -> Optional[str]:
+    """Short hash of the checked out commit, if this is a git tree"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, timeout=10)
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def create_downloader(workers: int, segments: int) -> UCLVDownloader:
+    """Engine with an in-memory listing cache and short retry waits (the fake site needs no courtesy)"""
+    session = SessionFactory.create_session(pool_size=workers * segments + 2, backoff_factor=0.01)
+    downloader = UCLVDownloader(download_delay=0, max_workers=workers, segments=segments, session=session,
+                                listing_cache=ListingCache(persist=False),
+                                retry_policy=RetryPolicy(max_retries=4, base_delay=0.05, max_delay=0.5))
+    downloader.configure_downloads(videos=True, subtitles=True)
+    return downloader
+
+
+def bench_listing(root_url: str, depth: int, workers: int) -> Tuple[Dict[str, Any], List[Tuple[str, str, str]]]:
+    """Cold crawl, conditional revalidation (304s) and in-memory re-filtering of the whole tree"""
+    downloader = create_downloader(workers, 1)
+    recursive = depth > 0
+    timings = {}
+    before = server_stats(root_url)
+    for name, revalidate in (('cold_s', True), ('revalidate_s', True), ('cached_s', False)):
+        start = time.perf_counter()
+        files = downloader.get_file_list(root_url, recursive=recursive, max_depth=depth + 1,
+                                         revalidate=revalidate)
+        timings[name] = time.perf_counter() - start
+    timings['files'] = len(files)
+    timings['server'] = stats_delta(before, server_stats(root_url))
+    return timings, files
+
+
+def bench_transfer(root_url: str, files: List[Tuple[str, str, str]], workers: int, segments: int,
+                   poll_progress: bool = False) -> Dict[str, Any]:
+    """Download every file into an empty folder, optionally polling snapshots like the GUI does"""
+    downloader = create_downloader(workers, segments)
+    stop = threading.Event()
+    
+    def poller():
+        while not stop.wait(1 / 15):
+            downloader.progress.snapshot()
+    
+    before = server_stats(root_url)
+    with tempfile.TemporaryDirectory() as target:
+        thread = threading.Thread(target=poller, daemon=True) if poll_progress else None
+        if thread:
+            thread.start()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        result = downloader.download_selected_files(files, root_url, Path(target),
+                                                    progress_callback=lambda *args: None)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        stop.set()
+        if thread:
+            thread.join()
+        
+        size = sum(path.stat().st_size for path in Path(target).rglob('*')
+                   if path.is_file() and not path.name.startswith('.'))
+    
+    gigabytes = size / 1024 ** 3
+    return {
+        'bytes': size,
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'mb_per_s': size / 1024 ** 2 / wall if wall else 0.0,
+        'cpu_s_per_gb': cpu / gigabytes if gigabytes else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'completed': result.get('completed', 0),
+        'failed': len(result.get('failed', [])),
+        'retry_stats': result.get('retry_stats', {}),
+        'server': stats_delta(before, server_stats(root_url))
+    }
+
+
+def bench_progress(updates: int) -> Dict[str, float]:
+    """Cost of the tracker calls made per chunk and per GUI poll, without any GUI"""
+    progress = DownloadProgress()
+    progress.start_file('Capitulo 000.mkv')
+    start = time.perf_counter()
+    for i in range(updates):
+        progress.update_file('Capitulo 000.mkv', i * 65536, updates * 65536)
+    update_s = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for _ in range(updates // 10):
+        progress.snapshot()
+    snapshot_s = time.perf_counter() - start
+    return {
+        'update_us': update_s / updates * 1e6,
+        'snapshot_us': snapshot_s / (updates // 10) * 1e6
+    }
+
+
+def best_of(runs: List[Dict[str, Any]], key: str) -> Dict[str, Any]:
+    """Run with the lowest value of key"""
+    return min(runs, key=lambda run: run[key])
+
+
+def compare(results: Dict[str, Any], baseline_path: str) -> List[str]:
+    """Lines describing how the key metrics moved against a previous JSON result"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    lines = [f"📈 Comparado con {baseline.get('meta', {}).get('commit') or baseline_path}"]
+    for section, key, higher_is_better in COMPARED_METRICS:
+        old = baseline.get(section, {}).get(key)
+        new = results.get(section, {}).get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        better = change > 0 if higher_is_better else change < 0
+        mark = '✅' if abs(change) < 0.05 or better else '⚠️'
+        lines.append(f"   {mark} {section}.{key}: {old:.4g} → {new:.4g} ({change * 100:+.1f}%)")
+    return lines
+
+
+def main():
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark del flujo de descarga contra un sitio falso local")
+    parser.add_argument('--entries', type=int, default=40, help='Archivos por carpeta')
+    parser.add_argument('--depth', type=int, default=1, help='Niveles de subcarpetas')
+    parser.add_argument('--dirs', type=int, default=2, help='Subcarpetas por carpeta')
+    parser.add_argument('--file-size', type=int, default=2048, help='Tamaño de cada video en KB')
+    parser.add_argument('--latency', type=float, default=0, help='Latencia del servidor en ms')
+    parser.add_argument('--bandwidth', type=float, default=0, help='Límite por conexión en KB/s (0 = sin límite)')
+    parser.add_argument('--no-ranges', action='store_true', help='Servidor sin soporte de Range')
+    parser.add_argument('--workers', type=int, default=4, help='Descargas simultáneas')
+    parser.add_argument('--segments', type=int, default=1, help='Segmentos por archivo')
+    parser.add_argument('--error-rate', type=float, default=0.2, help='Errores inyectados en el escenario de fallos')
+    parser.add_argument('--truncate-rate', type=float, default=0.1, help='Respuestas cortadas en el escenario de fallos')
+    parser.add_argument('--repeat', type=int, default=1, help='Repeticiones de la descarga completa')
+    parser.add_argument('--output', help='Guardar el resultado JSON en este archivo')
+    parser.add_argument('--compare', metavar='JSON', help='Comparar con un resultado guardado')
+    parser.add_argument('--json', action='store_true', help='Salida JSON')
+    args = parser.parse_args()
+    
+    site = {
+        'entries': args.entries, 'depth': args.depth, 'dirs': args.dirs, 'file_size': args.file_size,
+        'latency': args.latency, 'bandwidth': args.bandwidth, 'no_ranges': args.no_ranges
+    }
+    results: Dict[str, Any] = {
+        'meta': {
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'config': dict(site, workers=args.workers, segments=args.segments,
+                       error_rate=args.error_rate, truncate_rate=args.truncate_rate)
+    }
+    
+    # The engine reports every file on stdout; keep it out of the summary and the JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        process, root_url = start_server_process(site)
+        try:
+            results['listing'], files = bench_listing(root_url, args.depth, args.workers)
+            runs = [bench_transfer(root_url, files, args.workers, args.segments)
+                    for _ in range(max(1, args.repeat))]
+            results['transfer'] = best_of(runs, 'cpu_s')
+            polled = bench_transfer(root_url, files, args.workers, args.segments, poll_progress=True)
+        finally:
+            process.terminate()
+            process.wait()
+        
+        results['progress'] = bench_progress(200000)
+        base_cpu = results['transfer']['cpu_s']
+        results['progress']['poller_cpu_overhead'] = (polled['cpu_s'] - base_cpu) / base_cpu if base_cpu else 0.0
+        
+        # Same engine against a flaky site: 5xx answers and connections dropped mid-file
+        flaky = dict(entries=12, file_size=args.file_size, error_rate=args.error_rate,
+                     truncate_rate=args.truncate_rate)
+        process, flaky_url = start_server_process(flaky)
+        try:
+            _, flaky_files = bench_listing(flaky_url, 0, args.workers)
+            errors = bench_transfer(flaky_url, flaky_files, args.workers, args.segments)
+        finally:
+            process.terminate()
+            process.wait()
+        results['errors'] = {key: errors[key] for key in ('wall_s', 'completed', 'failed', 'retry_stats', 'server')}
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        listing = results['listing']
+        transfer = results['transfer']
+        progress = results['progress']
+        errors = results['errors']
+        print(f"📊 Flujo de descarga ({listing['files']} archivos, {transfer['bytes'] / 1024 ** 2:.0f} MB, "
+              f"{args.workers} hilos)")
+        print(f"   • Listado: {listing['cold_s'] * 1000:.0f} ms en frío | "
+              f"{listing['revalidate_s'] * 1000:.0f} ms revalidando | {listing['cached_s'] * 1000:.1f} ms en memoria")
+        rss = f" | memoria máx. {transfer['peak_rss_mb']:.0f} MB" if transfer['peak_rss_mb'] else ''
+        print(f"   • Descarga: {transfer['mb_per_s']:.0f} MB/s | {transfer['cpu_s_per_gb']:.2f} s CPU/GB{rss}")
+        print(f"   • Progreso: {progress['update_us']:.2f} µs por actualización | "
+              f"{progress['snapshot_us']:.2f} µs por instantánea | "
+              f"sondeo {progress['poller_cpu_overhead'] * 100:+.1f}% CPU")
+        print(f"   • Con fallos: {errors['completed']} completados, {errors['failed']} fallidos, "
+              f"{errors['retry_stats'].get('retries', 0)} reintentos en {errors['wall_s']:.1f} s")
+    
+    if args.compare:
+        for line in compare(results, args.compare):
+            print(line, file=sys.stderr if args.json else sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark: loading large synthetic folders into the GUI file list
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# The model needs no Tk; the view part is skipped when tkinter is missing
+from gui.components.widgets.file_list_model import FileListModel
+
+try:
+    import tkinter as tk
+    from gui.components.widgets.file_list_view import FileListView
+except ImportError:
+    tk = None
+
+
+BASE_URL = 'https://visuales.ucv.cu/Series/Benchmark/'
+TYPES = ('video', 'subtitle', 'subtitle', 'image', 'info')
+
+
+def make_files(entries: int) -> List[Tuple[str, str, str]]:
+    """Synthetic (filename, url, type) tuples like a recursive listing"""
+    files = []
+    for i in range(entries):
+        file_type = TYPES[i % len(TYPES)]
+        name = f"Temporada {i // 500 + 1:02d}/Serie Capitulo {i:05d}.{file_type[:3]}"
+        files.append((name, BASE_URL + name.replace(' ', '%20'), file_type))
+    return files
+
+
+def time_call(function, *args) -> float:
+    """Wall time of one call in seconds"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def bench_model(files: List[Tuple[str, str, str]]) -> Dict[str, float]:
+    """Time the model operations that run on every load and selection change"""
+    model = FileListModel()
+    notifications = []
+    model.add_selection_callback(notifications.append)
+    result = {
+        'set_files_s': time_call(model.set_files, files),
+        'get_selected_files_s': time_call(model.get_selected_files),
+        'get_statistics_s': time_call(model.get_statistics),
+        'get_selected_size_s': time_call(model.get_selected_size),
+        'select_by_type_s': time_call(model.select_by_type, 'video'),
+        'invert_selection_s': time_call(model.invert_selection),
+        'select_all_s': time_call(model.select_all),
+        'toggle_one_s': time_call(model.toggle_file_selection, 0)
+    }
+    result['notifications'] = len(notifications)
+    return result
+
+
+def bench_view(root, files: List[Tuple[str, str, str]], render_batch: int) -> Dict[str, float]:
+    """Time until the first rows are shown and until every row is inserted"""
+    view = FileListView(root)
+    view.RENDER_BATCH = render_batch
+    view.pack()
+    model = FileListModel()
+    model.set_files(files)
+    
+    start = time.perf_counter()
+    view.update_tree_display(model.files_data, model.is_selected)
+    root.update()
+    first_rows = time.perf_counter() - start
+    # The longest the event loop was blocked between two turns
+    longest_block = first_rows
+    while view.is_rendering():
+        turn = time.perf_counter()
+        root.update()
+        longest_block = max(longest_block, time.perf_counter() - turn)
+    total = time.perf_counter() - start
+    
+    view.frame.destroy()
+    return {'first_rows_s': first_rows, 'total_s': total, 'longest_block_s': longest_block}
+
+
+def main():
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la lista de archivos de la GUI")
+    parser.add_argument('--entries', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help='Cantidades de archivos a cargar')
+    parser.add_argument('--json', action='store_true', help='Salida JSON')
+    args = parser.parse_args()
+    
+    root = None
+    if tk is None:
+        print("⚠️  tkinter no está disponible: solo se mide el modelo", file=sys.stderr)
+    else:
+        try:
+            root = tk.Tk()
+            root.withdraw()
+        except tk.TclError as e:
+            print(f"⚠️  Sin pantalla ({e}): solo se mide el modelo", file=sys.stderr)
+    
+    results = {}
+    for entries in args.entries:
+        files = make_files(entries)
+        result = {'model': bench_model(files)}
+        if root is not None:
+            result['view_batched'] = bench_view(root, files, FileListView.RENDER_BATCH)
+            # All rows in one go, as the list used to be filled
+            result['view_single_pass'] = bench_view(root, files, entries)
+        results[entries] = result
+    
+    if root is not None:
+        root.destroy()
+    
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    
+    print("📊 Lista de archivos de la GUI")
+    for entries, result in results.items():
+        model = result['model']
+        line = (f"   • {entries} archivos: modelo {model['set_files_s'] * 1000:.1f} ms"
+                f" | solo videos {model['select_by_type_s'] * 1000:.1f} ms")
+        if 'view_batched' in result:
+            batched = result['view_batched']
+            single = result['view_single_pass']
+            line += (f" | primeras filas {batched['first_rows_s'] * 1000:.0f} ms"
+                     f" (bloqueo máx. {batched['longest_block_s'] * 1000:.0f} ms,"
+                     f" total {batched['total_s']:.2f} s)"
+                     f" | todo de una vez {single['total_s']:.2f} s")
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: autoindex parser vs BeautifulSoup on synthetic listings
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+from core.downloaders.listing_fetcher import ListingFetcher
+
+
+BASE_URL = 'https://visuales.ucv.cu/Series/Benchmark/'
+
+
+def make_apache_table(entries: int) -> bytes:
+    """Apache 2.4 FancyIndexing listing with HTMLTable"""
+    rows = ['<tr><th><a href="?C=N;O=D">Name</a></th><th><a href="?C=M;O=A">Last modified</a></th>'
+            '<th><a href="?C=S;O=A">Size</a></th></tr>',
+            '<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td>'
+            '<td><a href="/Series/">Parent Directory</a></td><td>&nbsp;</td><td align="right">  - </td></tr>']
+    for i in range(entries):
+        name = f"Serie%20Capitulo%20{i:05d}.mp4"
+        rows.append(f'<tr><td valign="top"><img src="/icons/movie.gif" alt="[VID]"></td>'
+                    f'<td><a href="{name}">Serie Capitulo {i:05d}.mp4</a></td>'
+                    f'<td align="right">2024-03-{i % 28 + 1:02d} 12:{i % 60:02d}  </td>'
+                    f'<td align="right">{(i % 900) + 100}M</td><td>&nbsp;</td></tr>')
+    return ('<html><body><h1>Index of /Series/Benchmark</h1><table>'
+            + '\n'.join(rows) + '</table></body></html>').encode('utf-8')
+
+
+def make_nginx(entries: int) -> bytes:
+    """nginx autoindex listing with exact sizes"""
+    rows = ['<a href="../">../</a>']
+    for i in range(entries):
+        name = f"Serie%20Capitulo%20{i:05d}.mkv"
+        rows.append(f'<a href="{name}">Serie Capitulo {i:05d}.mkv</a>'
+                    f'{" " * 20}{i % 28 + 1:02d}-Mar-2024 12:{i % 60:02d}{" " * 10}{1000000 + i}')
+    return ('<html><head><title>Index of /</title></head><body><h1>Index of /</h1><hr><pre>'
+            + '\n'.join(rows) + '\n</pre><hr></body></html>').encode('utf-8')
+
+
+def time_parser(parse: Callable[[bytes, str], List], content: bytes, repeat: int) -> Dict[str, float]:
+    """Run a parser several times and keep the best and mean wall time"""
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(parse(content, BASE_URL))
+        timings.append(time.perf_counter() - start)
+    return {'best_s': min(timings), 'mean_s': sum(timings) / len(timings), 'entries': count}
+
+
+def main():
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark de parsers de listados autoindex")
+    parser.add_argument('--entries', type=int, default=10000, help='Entradas por listado')
+    parser.add_argument('--repeat', type=int, default=5, help='Repeticiones por parser')
+    parser.add_argument('--json', action='store_true', help='Salida JSON')
+    args = parser.parse_args()
+    
+    fetcher = ListingFetcher(session=None)
+    results = {}
+    for layout, builder in (('apache_table', make_apache_table), ('nginx', make_nginx)):
+        content = builder(args.entries)
+        autoindex = time_parser(fetcher.parse, content, args.repeat)
+        soup = time_parser(fetcher.parse_with_soup, content, args.repeat)
+        results[layout] = {
+            'bytes': len(content),
+            'autoindex': autoindex,
+            'beautifulsoup': soup,
+            'speedup': soup['best_s'] / autoindex['best_s'] if autoindex['best_s'] else 0.0
+        }
+    
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+    
+    print(f"📊 Parser de listados ({args.entries} entradas, mejor de {args.repeat})")
+    for layout, result in results.items():
+        print(f"   • {layout}: autoindex {result['autoindex']['best_s'] * 1000:.1f} ms | "
+              f"BeautifulSoup {result['beautifulsoup']['best_s'] * 1000:.1f} ms | "
+              f"x{result['speedup']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
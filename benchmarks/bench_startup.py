@@ -0,0 +1,133 @@
+"""
+Benchmark: startup import cost of main.py, the batch CLI and the GUI (python -X importtime)
+"""
+
+import argparse
+import importlib.util
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that the fast paths must not load
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'tqdm', 'tkinter')
+
+# name -> (python arguments, import budget in ms, heavy modules allowed)
+SCENARIOS = {
+    'version': (['main.py', '--version'], 60.0, False),
+    'help': (['main.py', '--help'], 60.0, False),
+    'cli': (['-c', 'import main, core; core.UCLVDownloader'], 400.0, True),
+    'gui': (['-c', 'from gui import GUIInterface; g = GUIInterface(); g.root.update(); g.root.destroy()'],
+            800.0, True),
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Parse -X importtime lines into (module, self µs, cumulative µs, nesting depth)"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return imports
+
+
+def run_importtime(args: List[str]) -> Tuple[float, List[Tuple[str, int, int, int]], int]:
+    """Run python -X importtime with args; returns (wall seconds, imports, exit code)"""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=PROJECT_ROOT,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    return elapsed, parse_importtime(process.stderr), process.returncode
+
+
+def measure(args: List[str], baseline: set, repeat: int) -> Optional[Dict]:
+    """Best of several runs; import cost only counts modules the bare interpreter does not load"""
+    best = None
+    for _ in range(repeat):
+        elapsed, imports, returncode = run_importtime(args)
+        if returncode != 0:
+            return None
+        app_imports = [entry for entry in imports if entry[0] not in baseline]
+        import_ms = sum(entry[1] for entry in app_imports) / 1000
+        if best is None or import_ms < best['import_ms']:
+            names = {entry[0] for entry in imports}
+            top_level = sorted((entry for entry in app_imports if entry[3] == 0), key=lambda e: -e[2])
+            best = {
+                'wall_ms': elapsed * 1000,
+                'import_ms': import_ms,
+                'modules': len(app_imports),
+                'heavy': [name for name in HEAVY_MODULES if name in names],
+                'top': [{'module': name, 'cumulative_ms': cumulative / 1000}
+                        for name, _, cumulative, _ in top_level[:5]]
+            }
+    return best
+
+
+def main():
+    """Run the benchmark, check the budgets and print a summary"""
+    parser = argparse.ArgumentParser(description="Benchmark de arranque (python -X importtime)")
+    parser.add_argument('--repeat', type=int, default=5, help='Ejecuciones por escenario (se toma la mejor)')
+    parser.add_argument('--budget', action='append', default=[], metavar='ESCENARIO=MS',
+                        help='Cambiar el presupuesto de importación de un escenario')
+    parser.add_argument('--json', action='store_true', help='Salida JSON')
+    args = parser.parse_args()
+    
+    budgets = {name: scenario[1] for name, scenario in SCENARIOS.items()}
+    for value in args.budget:
+        name, _, ms = value.partition('=')
+        if name not in budgets:
+            parser.error(f"escenario desconocido: {name}")
+        budgets[name] = float(ms)
+    
+    # Warm the bytecode cache, then take what the bare interpreter imports as the baseline
+    run_importtime(['main.py', '--version'])
+    baseline = {entry[0] for entry in run_importtime(['-c', 'pass'])[1]}
+    has_tkinter = importlib.util.find_spec('tkinter') is not None
+    
+    results = {}
+    for name, (scenario_args, _, heavy_allowed) in SCENARIOS.items():
+        result = None
+        if name != 'gui' or has_tkinter:
+            result = measure(scenario_args, baseline, max(1, args.repeat))
+        if result is None:
+            # No tkinter or no display to paint on
+            results[name] = {'skipped': True, 'budget_ms': budgets[name]}
+            continue
+        result['budget_ms'] = budgets[name]
+        result['ok'] = result['import_ms'] <= budgets[name] and (heavy_allowed or not result['heavy'])
+        results[name] = result
+    
+    ok = all(result.get('ok', True) for result in results.values())
+    
+    if args.json:
+        json.dump({'ok': ok, 'scenarios': results}, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"📊 Arranque (mejor de {args.repeat}, importaciones propias de la aplicación)")
+        for name, result in results.items():
+            if result.get('skipped'):
+                print(f"   • {name}: omitido (sin tkinter o sin pantalla)")
+                continue
+            mark = '✅' if result['ok'] else '❌'
+            heavy = f" | pesados: {', '.join(result['heavy'])}" if result['heavy'] else ''
+            print(f"   {mark} {name}: {result['import_ms']:.1f} ms de {result['budget_ms']:.0f} ms | "
+                  f"{result['modules']} módulos | {result['wall_ms']:.0f} ms total{heavy}")
+            for entry in result['top'][:3]:
+                print(f"      - {entry['module']}: {entry['cumulative_ms']:.1f} ms")
+    
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+"""
+Fake visuales.ucv.cu: a local Apache-style autoindex server with deterministic content
+
+Serves a synthetic folder tree with configurable size, latency, bandwidth, Range support and
+injected failures, so the download path can be benchmarked without the real site.
+Run it standalone with:
+    python -m benchmarks.fake_visuales --entries 200 --depth 2 --latency 20
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+ROOT_PATH = '/Series/Benchmark/'
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Every listing and file claims the same modification time, so validators never change
+LAST_MODIFIED = formatdate(1700000000, usegmt=True)
+
+
+class SiteLayout:
+    """Deterministic folder tree: every folder has `dirs` subfolders (up to `depth` levels) and `entries` files"""
+    
+    SUBTITLE_SIZE = 32 * 1024
+    
+    def __init__(self, entries: int = 50, depth: int = 0, dirs: int = 2, file_size: int = 1024 * 1024):
+        self.entries = entries
+        self.depth = depth
+        self.dirs = dirs
+        self.file_size = file_size
+    
+    def _level(self, path: str) -> Optional[int]:
+        """Depth of a folder path below the root (None if it does not exist)"""
+        if not path.startswith(ROOT_PATH):
+            return None
+        parts = [part for part in path[len(ROOT_PATH):].split('/') if part]
+        for part in parts:
+            if not part.startswith('Temporada ') or not part[10:].isdigit() or not 1 <= int(part[10:]) <= self.dirs:
+                return None
+        return len(parts) if len(parts) <= self.depth else None
+    
+    def list_folder(self, path: str) -> Optional[Tuple[List[str], List[str]]]:
+        """(subfolder names, file names) of a folder path, or None if it does not exist"""
+        level = self._level(path)
+        if level is None:
+            return None
+        subfolders = [f"Temporada {i:02d}" for i in range(1, self.dirs + 1)] if level < self.depth else []
+        # Every fourth file is the subtitle of the video before it
+        files = [f"Capitulo {i - 1:03d}.srt" if i % 4 == 3 else f"Capitulo {i:03d}.mkv"
+                 for i in range(self.entries)]
+        return subfolders, files
+    
+    def file_size_of(self, path: str) -> Optional[int]:
+        """Size of a file path, or None if it does not exist"""
+        folder, _, name = path.rpartition('/')
+        listing = self.list_folder(folder + '/')
+        if listing is None or name not in listing[1]:
+            return None
+        return min(self.file_size, self.SUBTITLE_SIZE) if name.endswith('.srt') else self.file_size
+    
+    def total_files(self) -> Tuple[int, int]:
+        """(number of files, total bytes) of the whole tree"""
+        folders = sum(self.dirs ** level for level in range(self.depth + 1))
+        _, files = self.list_folder(ROOT_PATH)
+        size = sum(self.file_size_of(ROOT_PATH + name) for name in files)
+        return folders * len(files), folders * size
+    
+    @staticmethod
+    def content_block(path: str) -> bytes:
+        """64 KiB pattern repeated through a file; byte i of the file is block[i % len(block)]"""
+        return hashlib.sha256(path.encode('utf-8')).digest() * 2048
+
+
+def format_listing_size(size: int) -> str:
+    """Size column as Apache prints it (1.0K, 350M, 1.2G)"""
+    for unit in ('', 'K', 'M', 'G'):
+        if size < 1024 or unit == 'G':
+            return str(size) if not unit else (f"{size:.1f}{unit}" if size < 10 else f"{size:.0f}{unit}")
+        size /= 1024
+
+
+class FakeVisualesHandler(BaseHTTPRequestHandler):
+    """Apache 2.4 autoindex (HTMLTable) listings and file downloads with optional Range support"""
+    
+    protocol_version = 'HTTP/1.1'
+    server: 'FakeVisualesServer'
+    
+    def log_message(self, format, *args):
+        """Keep benchmark output clean"""
+    
+    def do_HEAD(self):
+        self._serve(head=True)
+    
+    def do_GET(self):
+        self._serve(head=False)
+    
+    def _serve(self, head: bool):
+        """Route a request to the stats, a listing or a file"""
+        server = self.server
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if path == '/__stats__':
+            self._send_bytes(200, json.dumps(server.get_stats()).encode('utf-8'), 'application/json', head)
+            return
+        
+        server.count('requests')
+        if server.latency:
+            time.sleep(server.latency)
+        
+        if path.endswith('/'):
+            self._serve_listing(path, head)
+        else:
+            self._serve_file(path, head)
+    
+    def _send_bytes(self, status: int, body: bytes, content_type: str, head: bool,
+                    headers: Optional[Dict[str, str]] = None):
+        """Send a small in-memory response"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+    
+    def _serve_listing(self, path: str, head: bool):
+        """Folder listing, answering 304 to a matching If-None-Match"""
+        listing = self.server.layout.list_folder(path)
+        if listing is None:
+            self._send_bytes(404, b'Not Found', 'text/plain', head)
+            return
+        
+        body = self.server.render_listing(path, *listing)
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.server.count('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        self.server.count('listings')
+        self._send_bytes(200, body, 'text/html;charset=UTF-8', head,
+                         {'ETag': etag, 'Last-Modified': LAST_MODIFIED})
+    
+    def _serve_file(self, path: str, head: bool):
+        """File content (whole or one byte range), with the configured failures injected"""
+        server = self.server
+        size = server.layout.file_size_of(path)
+        if size is None:
+            self._send_bytes(404, b'Not Found', 'text/plain', head)
+            return
+        
+        if not head and server.roll(server.error_rate):
+            server.count('injected_errors')
+            self._send_bytes(server.error_status, b'Injected error', 'text/plain', head)
+            return
+        
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get('Range', '')
+        if server.ranges and range_header.startswith('bytes='):
+            first, _, last = range_header[6:].split(',')[0].partition('-')
+            if first.isdigit() and int(first) < size:
+                start = int(first)
+                end = min(int(last), size - 1) if last.isdigit() else size - 1
+                status = 206
+                server.count('ranges')
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('ETag', f'"{size:x}-{hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]}"')
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        if server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+        
+        server.count('files')
+        # A truncated response drops the connection halfway, like a reset from a busy mirror
+        if server.roll(server.truncate_rate):
+            server.count('truncated')
+            end = start + (end - start) // 2
+            self.close_connection = True
+        self._write_range(SiteLayout.content_block(path), start, end)
+    
+    def _write_range(self, block: bytes, start: int, end: int):
+        """Send bytes start..end of the repeated block, paced to the bandwidth cap"""
+        view = memoryview(block)
+        bandwidth = self.server.bandwidth
+        began = time.perf_counter()
+        sent = 0
+        position = start
+        while position <= end:
+            offset = position % len(block)
+            chunk = view[offset:offset + min(len(block) - offset, end - position + 1)]
+            self.wfile.write(chunk)
+            position += len(chunk)
+            sent += len(chunk)
+            if bandwidth:
+                ahead = sent / bandwidth - (time.perf_counter() - began)
+                if ahead > 0:
+                    time.sleep(ahead)
+        self.server.count('bytes_sent', sent)
+
+
+class FakeVisualesServer(ThreadingHTTPServer):
+    """Threaded fake site; request counters are exposed at /__stats__"""
+    
+    daemon_threads = True
+    
+    def __init__(self, port: int = 0, layout: Optional[SiteLayout] = None, latency: float = 0.0,
+                 bandwidth: float = 0.0, ranges: bool = True, error_rate: float = 0.0,
+                 error_status: int = 503, truncate_rate: float = 0.0, seed: int = 1):
+        """
+        Args:
+            port: Local port (0 picks a free one)
+            layout: Folder tree to serve
+            latency: Seconds added before every response
+            bandwidth: Bytes per second per connection (0 = unlimited)
+            ranges: Honour Range requests and advertise Accept-Ranges
+            error_rate: Fraction of file GETs answered with error_status
+            truncate_rate: Fraction of file GETs cut in half by closing the connection
+            seed: Seed of the injected failures, so runs fail the same requests
+        """
+        super().__init__(('127.0.0.1', port), FakeVisualesHandler)
+        self.layout = layout or SiteLayout()
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.ranges = ranges
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.truncate_rate = truncate_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._listing_cache: Dict[str, bytes] = {}
+        self.stats: Dict[str, int] = dict.fromkeys(
+            ('requests', 'listings', 'not_modified', 'files', 'ranges', 'bytes_sent',
+             'injected_errors', 'truncated'), 0)
+    
+    @property
+    def root_url(self) -> str:
+        """URL of the root folder of the fake site"""
+        return f"http://127.0.0.1:{self.server_address[1]}{urllib.parse.quote(ROOT_PATH)}"
+    
+    def count(self, key: str, amount: int = 1):
+        """Increment a request counter"""
+        with self._lock:
+            self.stats[key] += amount
+    
+    def roll(self, rate: float) -> bool:
+        """Deterministic coin flip for failure injection"""
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Copy of the request counters"""
+        with self._lock:
+            return dict(self.stats)
+    
+    def render_listing(self, path: str, subfolders: List[str], files: List[str]) -> bytes:
+        """Apache FancyIndexing HTMLTable page (cached per folder)"""
+        body = self._listing_cache.get(path)
+        if body is not None:
+            return body
+        
+        rows = ['<tr><th valign="top"><img src="/icons/blank.gif" alt="[ICO]"></th>'
+                '<th><a href="?C=N;O=D">Name</a></th><th><a href="?C=M;O=A">Last modified</a></th>'
+                '<th><a href="?C=S;O=A">Size</a></th><th><a href="?C=D;O=A">Description</a></th></tr>',
+                '<tr><td valign="top"><img src="/icons/back.gif" alt="[PARENTDIR]"></td>'
+                '<td><a href="../">Parent Directory</a></td><td>&nbsp;</td><td align="right">  - </td>'
+                '<td>&nbsp;</td></tr>']
+        for name in subfolders:
+            rows.append(f'<tr><td valign="top"><img src="/icons/folder.gif" alt="[DIR]"></td>'
+                        f'<td><a href="{urllib.parse.quote(name)}/">{name}/</a></td>'
+                        f'<td align="right">2023-11-14 22:13  </td><td align="right">  - </td>'
+                        f'<td>&nbsp;</td></tr>')
+        for name in files:
+            size = self.layout.file_size_of(path + name)
+            icon = 'text.gif" alt="[TXT]' if name.endswith('.srt') else 'movie.gif" alt="[VID]'
+            rows.append(f'<tr><td valign="top"><img src="/icons/{icon}"></td>'
+                        f'<td><a href="{urllib.parse.quote(name)}">{name}</a></td>'
+                        f'<td align="right">2023-11-14 22:13  </td>'
+                        f'<td align="right">{format_listing_size(size)}</td><td>&nbsp;</td></tr>')
+        
+        body = (f'<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 3.2 Final//EN">\n<html>\n<head>\n'
+                f'<title>Index of {path.rstrip("/")}</title>\n</head>\n<body>\n'
+                f'<h1>Index of {path.rstrip("/")}</h1>\n<table>\n'
+                + '\n'.join(rows) + '\n</table>\n</body></html>\n').encode('utf-8')
+        self._listing_cache[path] = body
+        return body
+
+
+def free_port() -> int:
+    """Ask the OS for an unused local port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server_process(options: Dict[str, Any]) -> Tuple[subprocess.Popen, str]:
+    """
+    Run the fake site in a separate process so its CPU is not counted by the client
+    Args:
+        options: Command line options of this module without dashes, e.g. {'entries': 100, 'latency': 20}
+    Returns: (process, root folder URL)
+    """
+    port = free_port()
+    args = [sys.executable, '-m', 'benchmarks.fake_visuales', '--port', str(port), '--quiet']
+    for name, value in options.items():
+        flag = '--' + name.replace('_', '-')
+        if value is True:
+            args.append(flag)
+        elif value not in (None, False):
+            args += [flag, str(value)]
+    
+    process = subprocess.Popen(args, cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL)
+    for _ in range(200):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError("fake server exited before accepting connections")
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}{urllib.parse.quote(ROOT_PATH)}"
+
+
+def main():
+    """Serve the fake site until interrupted"""
+    parser = argparse.ArgumentParser(description="Servidor local que imita el autoindex de visuales.ucv.cu")
+    parser.add_argument('--port', type=int, default=8765, help='Puerto local')
+    parser.add_argument('--entries', type=int, default=50, help='Archivos por carpeta')
+    parser.add_argument('--depth', type=int, default=0, help='Niveles de subcarpetas')
+    parser.add_argument('--dirs', type=int, default=2, help='Subcarpetas por carpeta')
+    parser.add_argument('--file-size', type=int, default=1024, help='Tamaño de cada video en KB')
+    parser.add_argument('--latency', type=float, default=0, help='Latencia añadida por respuesta en ms')
+    parser.add_argument('--bandwidth', type=float, default=0, help='Límite por conexión en KB/s (0 = sin límite)')
+    parser.add_argument('--no-ranges', action='store_true', help='Ignorar cabeceras Range')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fracción de descargas que responden con error')
+    parser.add_argument('--error-status', type=int, default=503, help='Código HTTP de los errores inyectados')
+    parser.add_argument('--truncate-rate', type=float, default=0, help='Fracción de descargas cortadas a la mitad')
+    parser.add_argument('--seed', type=int, default=1, help='Semilla de los fallos inyectados')
+    parser.add_argument('--quiet', action='store_true', help='No mostrar el resumen al arrancar')
+    args = parser.parse_args()
+    
+    layout = SiteLayout(args.entries, args.depth, args.dirs, args.file_size * 1024)
+    server = FakeVisualesServer(args.port, layout, args.latency / 1000, args.bandwidth * 1024,
+                                not args.no_ranges, args.error_rate, args.error_status,
+                                args.truncate_rate, args.seed)
+    if not args.quiet:
+        count, size = layout.total_files()
+        print(f"🌐 Sitio falso en {server.root_url} ({count} archivos, {size / 1024 ** 2:.1f} MB)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,19 @@
 """
 CLI module for UCLV Downloader
 Contains command line interface
+
+The interactive CLI and the batch commands are imported on first use, so
+`main.py --help` does not load the download engine.
 """
 
-from .interface import CLIInterface
+from core.lazy_imports import lazy_exports
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'CLIInterface': '.interface',
+    'BatchCLI': '.batch'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = ['CLIInterface']
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
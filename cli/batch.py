@@ -0,0 +1,626 @@
+"""
+Non-interactive batch commands for scripted and headless runs
+"""
+
+import argparse
+import contextlib
+import fnmatch
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from core import URLUtils, FileUtils
+from core.downloaders import (BandwidthLimiter, BandwidthSchedule, CancellationToken, DownloadQueue,
+                              JSONLinesSink, QueueWorker, parse_rate)
+
+if TYPE_CHECKING:
+    from core import UCLVDownloader
+
+
+class BatchCLI:
+    """Subcommands list/download/mirror/queue on top of UCLVDownloader"""
+    
+    # Exit codes (argparse already exits with 2 on usage errors)
+    EXIT_OK = 0
+    EXIT_FAILED = 1
+    EXIT_USAGE = 2
+    EXIT_NO_FILES = 3
+    EXIT_LISTING_ERROR = 4
+    EXIT_NO_SPACE = 5
+    EXIT_INTERRUPTED = 130
+    # 128 + SIGPIPE, what shells report for tools killed by a closed pipe
+    EXIT_BROKEN_PIPE = 141
+    
+    FILE_TYPES = ('video', 'subtitle', 'image', 'info')
+    
+    EXIT_CODES_HELP = """
+Códigos de salida:
+  0    Todo correcto
+  1    Algún archivo falló
+  2    Argumentos inválidos
+  3    No se encontraron archivos
+  4    No se pudo leer el listado
+  5    Espacio en disco insuficiente
+  130  Interrumpido (Ctrl+C o SIGTERM)
+  141  La salida se cerró antes de terminar (p. ej. | head)
+"""
+    
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.json_output = getattr(args, 'json', False)
+        # Machine-readable output owns stdout; engine messages go to stderr meanwhile
+        self.out = sys.stdout
+        # Engine events arrive from the download workers
+        self._emit_lock = threading.Lock()
+        # --events log files opened by _create_downloader, closed when the command ends
+        self.event_logs: List[JSONLinesSink] = []
+    
+    @classmethod
+    def add_commands(cls, subparsers):
+        """Register the batch subcommands on an argparse subparsers object"""
+        output = argparse.ArgumentParser(add_help=False)
+        output.add_argument('--json', action='store_true',
+                            help='Salida en líneas JSON (un evento por línea)')
+        
+        filters = argparse.ArgumentParser(add_help=False)
+        filters.add_argument('-t', '--types', type=cls._parse_types, default=['video', 'subtitle'],
+                             help=f"Tipos separados por coma: {','.join(cls.FILE_TYPES)} (por defecto video,subtitle)")
+        filters.add_argument('-i', '--include', action='append', default=[], metavar='GLOB',
+                             help='Solo archivos que coincidan con el patrón (repetible)')
+        filters.add_argument('-x', '--exclude', action='append', default=[], metavar='GLOB',
+                             help='Omitir archivos que coincidan con el patrón (repetible)')
+        filters.add_argument('--depth', type=int, default=5,
+                             help='Profundidad máxima de subcarpetas (por defecto 5)')
+        
+        target = argparse.ArgumentParser(add_help=False)
+        target.add_argument('-o', '--output', type=Path,
+                            help='Carpeta de destino (por defecto descarga/<carpeta>)')
+        target.add_argument('--force', action='store_true',
+                            help='Descargar aunque no haya espacio suficiente')
+        target.add_argument('--progress-interval', type=float, default=1.0, metavar='SEG',
+                            help='Segundos entre eventos de progreso con --json')
+        
+        engine = argparse.ArgumentParser(add_help=False)
+        engine.add_argument('-j', '--concurrency', type=int, default=4,
+                            help='Descargas simultáneas (por defecto 4)')
+        engine.add_argument('--rate-limit', type=float, metavar='REQ/S',
+                            help='Peticiones nuevas por segundo y servidor, 0 = sin límite '
+                                 '(por defecto 2 mientras no se use --limit, --host-limit ni --schedule)')
+        engine.add_argument('--limit', type=cls._parse_rate, default=0, metavar='VELOCIDAD',
+                            help='Velocidad máxima total, p. ej. 200K o 1.5M (por defecto sin límite)')
+        engine.add_argument('--host-limit', type=cls._parse_rate, default=0, metavar='VELOCIDAD',
+                            help='Velocidad máxima por servidor')
+        engine.add_argument('--schedule', type=cls._parse_schedule, metavar='REGLAS',
+                            help="Límites por horario, p. ej. '00:00-07:00=0,07:00-23:59=200K'")
+        engine.add_argument('--retries', type=int, default=3,
+                            help='Intentos por archivo (por defecto 3)')
+        engine.add_argument('--segments', type=int, default=1,
+                            help='Conexiones por archivo grande (por defecto 1)')
+        engine.add_argument('--events', type=Path, metavar='RUTA',
+                            help='Añadir cada evento de descarga (tiempos, reintentos, fallos) '
+                                 'como una línea JSON a este archivo')
+        
+        list_parser = subparsers.add_parser('list', parents=[filters, output],
+                                            help='Listar los archivos de una carpeta')
+        list_parser.add_argument('url', help='URL de la carpeta')
+        list_parser.add_argument('-r', '--recursive', action='store_true', help='Incluir subcarpetas')
+        list_parser.add_argument('--sizes', action='store_true',
+                                 help='Obtener los tamaños que el listado no indica (HEAD)')
+        
+        download_parser = subparsers.add_parser('download', parents=[filters, target, engine, output],
+                                                help='Descargar los archivos de una carpeta')
+        download_parser.add_argument('url', help='URL de la carpeta')
+        download_parser.add_argument('-r', '--recursive', action='store_true', help='Incluir subcarpetas')
+        
+        mirror_parser = subparsers.add_parser('mirror', parents=[filters, target, engine, output],
+                                              help='Replicar una carpeta con todas sus subcarpetas')
+        mirror_parser.add_argument('url', help='URL de la carpeta')
+        mirror_parser.add_argument('--prune', action='store_true',
+                                   help='Borrar archivos locales que ya no están en el servidor')
+        mirror_parser.add_argument('-n', '--dry-run', action='store_true',
+                                   help='Solo mostrar los cambios, sin descargar ni borrar')
+        mirror_parser.set_defaults(recursive=True)
+        
+        queue_parser = subparsers.add_parser('queue', help='Gestionar la cola persistente de descargas')
+        queue_parser.add_argument('--db', type=Path, help='Base de datos de la cola')
+        queue_commands = queue_parser.add_subparsers(dest='queue_command', metavar='ACCIÓN')
+        queue_commands.required = True
+        
+        queue_add = queue_commands.add_parser('add', parents=[output],
+                                              help='Añadir carpetas (URL terminada en /) o archivos')
+        queue_add.add_argument('urls', nargs='+', metavar='url')
+        queue_add.add_argument('-o', '--output', type=Path,
+                               help='Carpeta de destino (por defecto descarga/<carpeta>)')
+        queue_add.add_argument('-t', '--types', type=cls._parse_types, default=['video', 'subtitle'],
+                               help='Tipos separados por coma (por defecto video,subtitle)')
+        queue_add.add_argument('-r', '--recursive', action='store_true', help='Incluir subcarpetas')
+        queue_add.add_argument('-p', '--priority', type=int, default=0,
+                               help='Prioridad (mayor primero)')
+        
+        queue_commands.add_parser('list', parents=[output], help='Mostrar la cola')
+        
+        queue_run = queue_commands.add_parser('run', parents=[engine, output],
+                                              help='Procesar la cola en primer plano')
+        queue_run.add_argument('--watch', action='store_true',
+                               help='Seguir esperando nuevos elementos al vaciarse la cola')
+        queue_run.add_argument('--metrics', type=cls._parse_address, metavar='[HOST:]PUERTO',
+                               help='Publicar métricas de Prometheus en http://HOST:PUERTO/metrics '
+                                    '(HOST por defecto 127.0.0.1)')
+        
+        queue_move = queue_commands.add_parser('move', parents=[output], help='Mover un elemento a otra posición')
+        queue_move.add_argument('id', type=int)
+        queue_move.add_argument('index', type=int, help='Nueva posición (0 = primero)')
+        
+        queue_priority = queue_commands.add_parser('priority', parents=[output],
+                                                   help='Cambiar la prioridad de un elemento')
+        queue_priority.add_argument('id', type=int)
+        queue_priority.add_argument('priority', type=int)
+        
+        queue_remove = queue_commands.add_parser('remove', parents=[output], help='Quitar un elemento')
+        queue_remove.add_argument('id', type=int)
+        
+        queue_commands.add_parser('retry', parents=[output], help='Reintentar los elementos fallidos')
+        queue_commands.add_parser('clear', parents=[output], help='Quitar los elementos completados')
+    
+    @classmethod
+    def _parse_types(cls, value: str) -> List[str]:
+        """Parse a comma separated list of file types"""
+        types = [part.strip().lower() for part in value.split(',') if part.strip()]
+        unknown = [file_type for file_type in types if file_type not in cls.FILE_TYPES]
+        if unknown or not types:
+            raise argparse.ArgumentTypeError(
+                f"tipos inválidos: {value} (usa {','.join(cls.FILE_TYPES)})"
+            )
+        return types
+    
+    @staticmethod
+    def _parse_rate(value: str) -> float:
+        """Parse a bandwidth value for argparse"""
+        try:
+            return parse_rate(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"velocidad inválida: {value} (usa 500K, 1.5M o 0)")
+    
+    @staticmethod
+    def _parse_address(value: str) -> Tuple[str, int]:
+        """Parse [host:]port for argparse"""
+        host, _, port = value.rpartition(':')
+        if not port.isdigit() or int(port) > 65535:
+            raise argparse.ArgumentTypeError(f"dirección inválida: {value} (usa 9464 o 0.0.0.0:9464)")
+        return host or '127.0.0.1', int(port)
+    
+    @staticmethod
+    def _parse_schedule(value: str) -> BandwidthSchedule:
+        """Parse schedule rules for argparse"""
+        try:
+            return BandwidthSchedule.parse(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    
+    def run(self) -> int:
+        """Run the selected subcommand and return its exit code"""
+        handler = getattr(self, f"cmd_{self.args.command}")
+        redirect = contextlib.redirect_stdout(sys.stderr) if self.json_output else contextlib.nullcontext()
+        try:
+            with redirect:
+                return handler()
+        except KeyboardInterrupt:
+            self.emit('interrupted')
+            print("\n⏹️ Interrumpido por el usuario", file=sys.stderr)
+            return self.EXIT_INTERRUPTED
+        except BrokenPipeError:
+            # The reader went away (e.g. `| head`): stop quietly like other line-oriented tools.
+            # Whatever is still buffered would fail again at exit, so stdout now goes nowhere.
+            try:
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.__stdout__.fileno())
+            except (OSError, ValueError, AttributeError):
+                pass
+            return self.EXIT_BROKEN_PIPE
+        finally:
+            for sink in self.event_logs:
+                sink.close()
+    
+    def emit(self, event: str, **data):
+        """Write one JSON line event (only with --json)"""
+        if self.json_output:
+            data['event'] = event
+            line = json.dumps(data, ensure_ascii=False, default=str) + '\n'
+            with self._emit_lock:
+                self.out.write(line)
+                self.out.flush()
+    
+    def _create_downloader(self) -> 'UCLVDownloader':
+        """Create the engine from the --concurrency/--rate-limit/--retries options"""
+        # Imported here so --help and the queue commands start without the HTTP stack
+        from core import UCLVDownloader
+        
+        rate_limit = getattr(self.args, 'rate_limit', None)
+        if rate_limit is None:
+            download_delay = None
+        else:
+            download_delay = 1.0 / rate_limit if rate_limit > 0 else 0
+        downloader = UCLVDownloader(
+            download_delay=download_delay,
+            max_retries=max(1, getattr(self.args, 'retries', 3)),
+            max_workers=max(1, getattr(self.args, 'concurrency', 4)),
+            segments=max(1, getattr(self.args, 'segments', 1)),
+            bandwidth=BandwidthLimiter(getattr(self.args, 'limit', 0), getattr(self.args, 'host_limit', 0),
+                                       getattr(self.args, 'schedule', None))
+        )
+        
+        events_path = getattr(self.args, 'events', None)
+        if events_path:
+            sink = JSONLinesSink(events_path)
+            self.event_logs.append(sink)
+            downloader.events.add_sink(sink)
+        if self.json_output:
+            # Engine events join the command's own JSON lines on stdout
+            downloader.events.add_sink(lambda record: self.emit(**record))
+        return downloader
+    
+    def _matches(self, filename: str) -> bool:
+        """Apply --include/--exclude globs to the relative path and to the bare name"""
+        names = (filename, filename.rsplit('/', 1)[-1])
+        
+        def matches_any(patterns):
+            return any(fnmatch.fnmatch(name, pattern) for pattern in patterns for name in names)
+        
+        if self.args.include and not matches_any(self.args.include):
+            return False
+        return not matches_any(self.args.exclude)
+    
+    def _collect_files(self, downloader: 'UCLVDownloader') -> Optional[List[Tuple[str, str, str]]]:
+        """List and filter the files of the URL argument (None if the listing failed)"""
+        if not URLUtils.is_valid_url(self.args.url):
+            print(f"❌ URL inválida: {self.args.url}", file=sys.stderr)
+            self.emit('error', message=f"Invalid URL: {self.args.url}")
+            return None
+        
+        try:
+            return [
+                file_info for file_info in downloader.iter_file_list(
+                    self.args.url, self.args.recursive, self.args.depth, file_types=self.args.types
+                )
+                if self._matches(file_info[0])
+            ]
+        except Exception as e:
+            print(f"❌ Error al leer el listado: {e}", file=sys.stderr)
+            self.emit('error', message=str(e))
+            return None
+    
+    def cmd_list(self) -> int:
+        """List matching files with their sizes"""
+        downloader = self._create_downloader()
+        files = self._collect_files(downloader)
+        if files is None:
+            return self.EXIT_LISTING_ERROR
+        
+        if self.args.sizes:
+            downloader.resolve_sizes(files)
+        
+        total_size = 0
+        for filename, file_url, file_type in files:
+            size = downloader.size_resolver.get(file_url)
+            if size is not None:
+                total_size += size[0]
+            self.emit('file', name=filename, url=file_url, type=file_type,
+                      size=size[0] if size else None, size_exact=size[1] if size else None)
+            if not self.json_output:
+                size_text = FileUtils.format_file_size(size[0]) if size else '?'
+                print(f"{file_type:<9} {size_text:>10}  {filename}")
+        
+        self.emit('summary', count=len(files), total_size=total_size)
+        if not self.json_output:
+            print(f"\n📊 {len(files)} archivos, {FileUtils.format_file_size(total_size)}")
+        
+        return self.EXIT_OK if files else self.EXIT_NO_FILES
+    
+    def cmd_download(self) -> int:
+        """Download the matching files of a folder"""
+        downloader = self._create_downloader()
+        files = self._collect_files(downloader)
+        if files is None:
+            return self.EXIT_LISTING_ERROR
+        if not files:
+            print("❌ No se encontraron archivos para descargar")
+            self.emit('summary', count=0, total_size=0)
+            return self.EXIT_NO_FILES
+        
+        download_path = self.args.output or Path("descarga") / URLUtils.extract_folder_name(self.args.url)
+        downloader.resolve_sizes(files)
+        usage = downloader.estimate_disk_usage(files, download_path)
+        self.emit('plan', count=len(files), download_path=str(download_path), **usage)
+        print(f"📊 {len(files)} archivos, {FileUtils.format_file_size(usage['total_size'])}")
+        if not usage['fits'] and not self.args.force:
+            print("❌ No hay suficiente espacio libre (usa --force para descargar de todas formas)")
+            return self.EXIT_NO_SPACE
+        
+        cancel_token = CancellationToken()
+        with self._cancel_on_sigterm(cancel_token), self._report_progress(downloader):
+            result = downloader.download_selected_files(files, self.args.url, download_path,
+                                                        cancel_token=cancel_token)
+        
+        self.emit('result', **result)
+        self._print_result(result)
+        
+        if result.get('interrupted') or result.get('cancelled'):
+            return self.EXIT_INTERRUPTED
+        return self.EXIT_OK if result['success'] else self.EXIT_FAILED
+    
+    def cmd_mirror(self) -> int:
+        """Bring a local copy of a folder tree up to date using its mirror manifest"""
+        if not URLUtils.is_valid_url(self.args.url):
+            print(f"❌ URL inválida: {self.args.url}", file=sys.stderr)
+            self.emit('error', message=f"Invalid URL: {self.args.url}")
+            return self.EXIT_LISTING_ERROR
+        
+        from core.downloaders import MirrorSync
+        
+        downloader = self._create_downloader()
+        mirror = MirrorSync(downloader)
+        download_path = self.args.output or Path("descarga") / URLUtils.extract_folder_name(self.args.url)
+        try:
+            plan = mirror.plan(self.args.url, download_path, True, self.args.depth,
+                               self.args.types, self._matches)
+        except Exception as e:
+            print(f"❌ Error al leer el listado: {e}", file=sys.stderr)
+            self.emit('error', message=str(e))
+            return self.EXIT_LISTING_ERROR
+        
+        changes = {key: plan[key] for key in ('new', 'changed', 'missing', 'removed', 'unreadable_dirs')}
+        self.emit('plan', download_path=str(download_path), unchanged=len(plan['unchanged']), **changes)
+        print(f"🔁 Nuevos: {len(plan['new'])} | Modificados: {len(plan['changed'])} | "
+              f"Faltantes: {len(plan['missing'])} | Eliminados en el servidor: {len(plan['removed'])} | "
+              f"Sin cambios: {len(plan['unchanged'])}")
+        if not plan['entries'] and not plan['removed']:
+            print("❌ No se encontraron archivos para replicar")
+            return self.EXIT_NO_FILES
+        if self.args.dry_run:
+            for label, key in (('➕', 'new'), ('✏️', 'changed'), ('🩹', 'missing'), ('🗑️', 'removed')):
+                for relative_path in plan[key]:
+                    print(f"   {label} {relative_path}")
+            return self.EXIT_OK
+        
+        to_fetch = [(path, plan['entries'][path]['url'], plan['entries'][path]['type'])
+                    for path in plan['new'] + plan['changed'] + plan['missing']]
+        if to_fetch:
+            downloader.resolve_sizes(to_fetch)
+            usage = downloader.estimate_disk_usage(to_fetch, download_path)
+            if not usage['fits'] and not self.args.force:
+                print("❌ No hay suficiente espacio libre (usa --force para descargar de todas formas)")
+                self.emit('error', message='Not enough free disk space', **usage)
+                return self.EXIT_NO_SPACE
+        
+        cancel_token = CancellationToken()
+        with self._cancel_on_sigterm(cancel_token), self._report_progress(downloader):
+            summary = mirror.apply(plan, self.args.prune, cancel_token=cancel_token)
+        
+        result = summary.pop('result')
+        self.emit('result', **summary, transfer=result)
+        if result:
+            self._print_result(result)
+        if summary['pruned']:
+            print(f"🗑️  {len(summary['pruned'])} archivos locales eliminados")
+        if summary['unreadable_dirs']:
+            print(f"⚠️  Carpetas sin leer: {', '.join(summary['unreadable_dirs'])}")
+        print(f"✅ Sincronizados: {len(summary['synced'])} | 💾 Manifiesto: {download_path}")
+        
+        if result and (result.get('interrupted') or result.get('cancelled')):
+            return self.EXIT_INTERRUPTED
+        return self.EXIT_OK if summary['success'] else self.EXIT_FAILED
+    
+    @contextlib.contextmanager
+    def _cancel_on_sigterm(self, cancel_token: CancellationToken):
+        """Turn SIGTERM (cron timeouts, service stop) into a clean cancellation"""
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: cancel_token.cancel())
+        try:
+            yield
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+    
+    @contextlib.contextmanager
+    def _report_progress(self, downloader: 'UCLVDownloader'):
+        """Emit periodic progress events from a snapshot of the tracker while downloading"""
+        if not self.json_output:
+            yield
+            return
+        
+        stop = threading.Event()
+        
+        def report():
+            version = None
+            while not stop.wait(self.args.progress_interval):
+                snapshot = downloader.progress.snapshot()
+                if snapshot['version'] == version:
+                    continue
+                version = snapshot['version']
+                active = snapshot.pop('active_files')
+                snapshot['active_files'] = {name: [max(done, 0), total] for name, (done, total) in active.items()}
+                self.emit('progress', **snapshot)
+        
+        thread = threading.Thread(target=report, name='uclv-progress', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+    
+    def _print_result(self, result: Dict[str, Any]):
+        """Print a short human readable summary of a batch result"""
+        print("\n" + "=" * 60)
+        print(f"📊 Total: {result.get('total', 0)} | ✅ Exitosos: {result.get('completed', 0)} | "
+              f"❌ Fallidos: {len(result.get('failed', []))} | ⏱️ {result.get('duration', 0):.1f}s")
+        if result.get('download_path'):
+            print(f"📂 Archivos guardados en: {result['download_path']}")
+        retry_stats = result.get('retry_stats') or {}
+        if retry_stats.get('retries') or retry_stats.get('deferred'):
+            print(f"🔁 Reintentos: {retry_stats['retries']} ({retry_stats['wait_s']:.1f}s de espera) | "
+                  f"Reintentados al final: {retry_stats['deferred']} | Recuperados: {retry_stats['recovered']}")
+        metrics = result.get('metrics') or {}
+        if metrics.get('throughput_mb_s'):
+            ttfb = metrics.get('ttfb_s')
+            ttfb_text = f" | TTFB p95 {ttfb['p95'] * 1000:.0f} ms" if ttfb else ''
+            print(f"📈 {metrics['throughput_mb_s']['p50']:.1f} MB/s por archivo (mediana) | "
+                  f"p95 {metrics['throughput_mb_s']['p95']:.1f} MB/s{ttfb_text}")
+        for failed in result.get('failed', []):
+            print(f"   • {failed}")
+    
+    def cmd_queue(self) -> int:
+        """Dispatch the queue actions"""
+        queue = DownloadQueue(self.args.db)
+        try:
+            return getattr(self, f"queue_{self.args.queue_command}")(queue)
+        finally:
+            queue.close()
+    
+    def queue_add(self, queue: DownloadQueue) -> int:
+        """Add folder URLs (ending with /) or single file URLs"""
+        for url in self.args.urls:
+            if not URLUtils.is_valid_url(url):
+                print(f"❌ URL inválida: {url}", file=sys.stderr)
+                self.emit('error', message=f"Invalid URL: {url}")
+                return self.EXIT_USAGE
+        
+        for url in self.args.urls:
+            path = urllib.parse.urlparse(url).path
+            if path.endswith('/'):
+                download_path = self.args.output or Path("descarga") / URLUtils.extract_folder_name(url)
+                item_id = queue.add_folder(url, str(download_path), self.args.recursive,
+                                           self.args.types, self.args.priority)
+                print(f"➕ Carpeta #{item_id}: {url}")
+                self.emit('queued', id=item_id, kind='folder', url=url)
+            else:
+                filename = urllib.parse.unquote(path.rsplit('/', 1)[-1])
+                download_path = self.args.output or Path("descarga")
+                ids = queue.add_files([(filename, url, FileUtils.get_file_type(filename))],
+                                      str(download_path), self.args.priority)
+                if ids:
+                    print(f"➕ Archivo #{ids[0]}: {filename}")
+                else:
+                    print(f"ℹ️  Ya estaba en la cola: {filename}")
+                self.emit('queued', id=ids[0] if ids else None, kind='file', url=url)
+        
+        return self.EXIT_OK
+    
+    def queue_list(self, queue: DownloadQueue) -> int:
+        """Show every item in processing order"""
+        icons = {
+            DownloadQueue.PENDING: '⏳',
+            DownloadQueue.ACTIVE: '📥',
+            DownloadQueue.PARTIAL: '⏸️',
+            DownloadQueue.DONE: '✅',
+            DownloadQueue.FAILED: '❌'
+        }
+        for item in queue.list_items():
+            self.emit('item', **item)
+            if not self.json_output:
+                name = item['filename'] or item['url']
+                line = f"{icons[item['state']]} #{item['id']:<5} [{item['priority']:>2}] {item['state']:<8} {name}"
+                if item['error']:
+                    line += f"  ({item['error']})"
+                print(line)
+        
+        counts = queue.counts()
+        self.emit('summary', **counts)
+        if not self.json_output:
+            print("\n📋 " + ", ".join(f"{state}: {count}" for state, count in counts.items()))
+        return self.EXIT_OK
+    
+    def queue_run(self, queue: DownloadQueue) -> int:
+        """Drain the queue in the foreground"""
+        failed = []
+        
+        def on_item_changed(item):
+            if item['state'] in (DownloadQueue.DONE, DownloadQueue.FAILED, DownloadQueue.PARTIAL):
+                self.emit('item', **item)
+            if item['state'] == DownloadQueue.FAILED:
+                failed.append(item['id'])
+        
+        downloader = self._create_downloader()
+        worker = QueueWorker(downloader, queue, on_item_changed=on_item_changed)
+        metrics_server = None
+        if self.args.metrics:
+            # Imported here like the engine, only when asked for
+            from core.downloaders import MetricsCollector, MetricsServer
+            
+            host, port = self.args.metrics
+            metrics_server = MetricsServer(MetricsCollector(downloader, queue), host, port)
+            try:
+                metrics_server.start()
+            except OSError as e:
+                print(f"❌ No se pudo abrir el puerto de métricas {host}:{port}: {e}")
+                self.emit('error', message=f"Cannot serve metrics on {host}:{port}: {e}")
+                return self.EXIT_USAGE
+            print(f"📈 Métricas en {metrics_server.url}")
+            self.emit('metrics', url=metrics_server.url)
+        
+        # start() creates the token, so SIGTERM is hooked up afterwards
+        worker.start(exit_when_empty=not self.args.watch)
+        try:
+            with self._cancel_on_sigterm(worker.cancel_token):
+                while worker.is_running:
+                    time.sleep(0.2)
+        except KeyboardInterrupt:
+            worker.stop()
+            raise
+        finally:
+            if metrics_server:
+                metrics_server.stop()
+        interrupted = worker.cancel_token.is_cancelled
+        worker.stop()
+        
+        counts = queue.counts()
+        self.emit('summary', **counts)
+        print("\n📋 " + ", ".join(f"{state}: {count}" for state, count in counts.items()))
+        if interrupted:
+            return self.EXIT_INTERRUPTED
+        return self.EXIT_FAILED if failed else self.EXIT_OK
+    
+    def queue_move(self, queue: DownloadQueue) -> int:
+        """Move a waiting item"""
+        try:
+            queue.move(self.args.id, self.args.index)
+        except (KeyError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            self.emit('error', message=str(e))
+            return self.EXIT_USAGE
+        self.emit('moved', id=self.args.id, index=self.args.index)
+        return self.EXIT_OK
+    
+    def queue_priority(self, queue: DownloadQueue) -> int:
+        """Change the priority of an item"""
+        queue.set_priority(self.args.id, self.args.priority)
+        self.emit('priority', id=self.args.id, priority=self.args.priority)
+        return self.EXIT_OK
+    
+    def queue_remove(self, queue: DownloadQueue) -> int:
+        """Remove an item"""
+        queue.remove(self.args.id)
+        self.emit('removed', id=self.args.id)
+        return self.EXIT_OK
+    
+    def queue_retry(self, queue: DownloadQueue) -> int:
+        """Requeue failed items"""
+        count = queue.retry_failed()
+        print(f"🔄 {count} elementos de nuevo en cola")
+        self.emit('retried', count=count)
+        return self.EXIT_OK
+    
+    def queue_clear(self, queue: DownloadQueue) -> int:
+        """Remove finished items"""
+        count = queue.clear_finished()
+        print(f"🧹 {count} elementos completados eliminados")
+        self.emit('cleared', count=count)
+        return self.EXIT_OK
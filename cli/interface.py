@@ -14,6 +14,8 @@ class CLIInterface:
     
     def __init__(self):
         self.downloader = UCLVDownloader()
+        self.recursive = False
+        self.files = []
         
     def print_banner(self):
         """Print application banner"""
@@ -44,6 +46,7 @@ class CLIInterface:
         subtitles = self._ask_yes_no("📝 ¿Descargar subtítulos?", default=True)
         images = self._ask_yes_no("🖼️ ¿Descargar imágenes?", default=False)
         info = self._ask_yes_no("📄 ¿Descargar archivos de información (.nfo)?", default=False)
+        self.recursive = self._ask_yes_no("📂 ¿Incluir subcarpetas (temporadas)?", default=False)
         
         self.downloader.configure_downloads(
             videos=videos,
@@ -60,6 +63,8 @@ class CLIInterface:
         if info: enabled_types.append("Info")
         
         print(f"\n✅ Configuración: {', '.join(enabled_types)}")
+        if self.recursive:
+            print("📂 Se recorrerán también las subcarpetas")
     
     def _ask_yes_no(self, question: str, default: bool = True) -> bool:
         """Ask yes/no question with default"""
@@ -75,7 +80,14 @@ class CLIInterface:
         """Preview files before downloading"""
         try:
             print("\n🔍 Analizando URL...")
-            files = self.downloader.get_file_list(url)
+            files = []
+            # Files stream in while subfolders are still being crawled
+            for file_info in self.downloader.iter_file_list(url, recursive=self.recursive):
+                files.append(file_info)
+                print(f"\r   🔎 {len(files)} archivos encontrados...", end='', flush=True)
+            if files:
+                print()
+            self.files = files
             
             if not files:
                 print("❌ No se encontraron archivos para descargar")
@@ -102,6 +114,9 @@ class CLIInterface:
                     print(f"   ... y {len(filenames) - preview_count} más")
                 print()
             
+            if not self._show_size_estimate(files, url):
+                return False
+            
             # Ask for confirmation
             return self._ask_yes_no("¿Continuar con la descarga?", default=True)
             
@@ -109,6 +124,27 @@ class CLIInterface:
             print(f"❌ Error al analizar la URL: {e}")
             return False
     
+    def _show_size_estimate(self, files, url: str) -> bool:
+        """Show total download size against free disk space"""
+        print("📏 Calculando tamaño total...", end='', flush=True)
+        self.downloader.resolve_sizes(files)
+        download_path = Path("descarga") / URLUtils.extract_folder_name(url)
+        usage = self.downloader.estimate_disk_usage(files, download_path)
+        
+        size_text = FileUtils.format_file_size(usage['total_size'])
+        if usage['unknown']:
+            size_text += f" ({usage['unknown']} sin tamaño conocido)"
+        print(f"\r💾 Tamaño total: {size_text}")
+        
+        if usage['free_space'] is not None:
+            print(f"🗄️  Espacio libre: {FileUtils.format_file_size(usage['free_space'])}")
+        
+        if not usage['fits']:
+            print("⚠️  No hay suficiente espacio libre para todos los archivos")
+            return self._ask_yes_no("¿Descargar de todas formas?", default=False)
+        
+        return True
+    
     def _get_type_icon(self, file_type: str) -> str:
         """Get icon for file type"""
         icons = {
@@ -170,7 +206,7 @@ class CLIInterface:
             
             # Start download
             print("\n🚀 Iniciando descarga...")
-            result = self.downloader.download_from_url(url)
+            result = self.downloader.download_selected_files(self.files, url)
             
             # Show results
             self.show_download_progress(result)
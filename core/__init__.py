@@ -1,9 +1,21 @@
 """
 Core module for UCLV Downloader
 Contains the main downloading logic and utilities
+
+Names are imported on first use, so `main.py --version` and the light batch
+commands do not load requests/urllib3 at startup.
 """
 
-from .downloader import UCLVDownloader
-from .utils import FileUtils, URLUtils
+from .lazy_imports import lazy_exports
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'UCLVDownloader': '.downloader',
+    'FileUtils': '.utils',
+    'URLUtils': '.utils',
+    'SessionFactory': '.http_session'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = ['UCLVDownloader', 'FileUtils', 'URLUtils'] 
\ No newline at end of file
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
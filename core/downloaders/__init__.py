@@ -1,15 +1,55 @@
 """
 Download components for UCLV Downloader
+
+Each class is imported from its module on first use; importing one light piece
+(e.g. parse_rate or DownloadQueue) does not pull in requests and the HTTP engine.
 """
 
-from .progress_tracker import DownloadProgress
-from .file_downloader import FileDownloader
-from .batch_downloader import BatchDownloader
-from .main_downloader import UCLVDownloader
-
-__all__ = [
-    'DownloadProgress',
-    'FileDownloader',
-    'BatchDownloader', 
-    'UCLVDownloader'
-] 
\ No newline at end of file
+from ..lazy_imports import lazy_exports
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'DownloadProgress': '.progress_tracker',
+    'SpeedMeter': '.progress_tracker',
+    'TokenBucket': '.rate_limiter',
+    'HostRateLimiter': '.rate_limiter',
+    'BandwidthLimiter': '.bandwidth',
+    'BandwidthSchedule': '.bandwidth',
+    'ScheduleRule': '.bandwidth',
+    'parse_rate': '.bandwidth',
+    'CancellationToken': '.cancellation',
+    'DownloadCancelled': '.cancellation',
+    'RetryPolicy': '.retry_policy',
+    'DownloadFailed': '.retry_policy',
+    'EventLog': '.events',
+    'ConsoleSink': '.events',
+    'JSONLinesSink': '.events',
+    'MemorySink': '.events',
+    'TransferMetrics': '.events',
+    'StreamHasher': '.integrity',
+    'ChecksumManifest': '.integrity',
+    'HashIndex': '.integrity',
+    'IntegrityError': '.integrity',
+    'SegmentedDownloader': '.segmented_downloader',
+    'FileDownloader': '.file_downloader',
+    'BatchDownloader': '.batch_downloader',
+    'ListingCache': '.listing_cache',
+    'AutoindexParser': '.autoindex_parser',
+    'ListingFetcher': '.listing_fetcher',
+    'DirectoryCrawler': '.directory_crawler',
+    'SizeResolver': '.size_resolver',
+    'UCLVDownloader': '.main_downloader',
+    'DownloadQueue': '.download_queue',
+    'QueueWorker': '.download_queue',
+    'MetricsCollector': '.metrics_server',
+    'MetricsServer': '.metrics_server',
+    'MirrorManifest': '.mirror_sync',
+    'MirrorSync': '.mirror_sync',
+    'AsyncHTTPClient': '.async_http',
+    'AsyncHTTPError': '.async_http',
+    'AsyncUCLVDownloader': '.async_downloader'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,468 @@
+"""
+asyncio download core for UCLV Downloader
+"""
+
+import asyncio
+import functools
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from ..utils import URLUtils
+from .async_http import AsyncHTTPClient, AsyncHTTPError, AsyncResponse
+from .bandwidth import BandwidthLimiter
+from .cancellation import CancellationToken, DownloadCancelled
+from .directory_crawler import DirectoryCrawler
+from .events import EventLog, TransferMetrics
+from .file_downloader import FileDownloader
+from .integrity import ChecksumManifest
+from .listing_cache import ListingCache
+from .listing_fetcher import ListingFetcher
+from .progress_tracker import DownloadProgress
+from .rate_limiter import HostRateLimiter
+from .retry_policy import RetryPolicy
+
+
+async def _run_blocking(func: Callable, *args) -> Any:
+    """asyncio.to_thread for Python 3.8: keep disk-bound work (hashing, renames) off the loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+
+class AsyncUCLVDownloader:
+    """
+    Runs listings and downloads as asyncio tasks on a single thread
+    Meant for headless jobs with many small transfers; shares the listing cache,
+    the .part resume format and the progress tracker with UCLVDownloader.
+    
+    Example:
+        async with AsyncUCLVDownloader() as downloader:
+            files = await downloader.get_file_list(url, recursive=True)
+            task = asyncio.ensure_future(downloader.download_selected_files(files, url))
+            async for snapshot in downloader.iter_progress(task):
+                print(snapshot['percentage'])
+            result = task.result()
+    """
+    
+    def __init__(self, max_concurrency: int = 32, max_connections_per_host: int = 8,
+                 max_retries: int = 3, download_delay: Optional[float] = None, timeout: float = 30,
+                 listing_cache: Optional[ListingCache] = None,
+                 client: Optional[AsyncHTTPClient] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 events: Optional[EventLog] = None):
+        self.client = client or AsyncHTTPClient(max_connections_per_host, timeout)
+        self.max_concurrency = max(1, max_concurrency)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries)
+        self.max_retries = self.retry_policy.max_retries
+        self.progress = DownloadProgress()
+        self.events = events or EventLog()
+        self.listing_cache = listing_cache if listing_cache is not None else ListingCache()
+        # Only used for parsing; all requests go through the async client
+        self.listing_fetcher = ListingFetcher(None, cache=self.listing_cache)
+        
+        self.bandwidth = bandwidth or BandwidthLimiter()
+        # Politeness: same download_delay rules as BatchDownloader (None = default spacing
+        # until a bandwidth cap or schedule is set)
+        self.rate_limiter = HostRateLimiter.for_delay(download_delay, self.bandwidth)
+        # Never opens a connection here: it supplies the resume, retry and verification rules
+        # and the hash index, so both engines treat .part files and completed downloads alike
+        self.file_downloader = FileDownloader(retry_policy=self.retry_policy, bandwidth=self.bandwidth,
+                                              events=self.events)
+        
+        # Filtros configurables
+        self.download_videos = True
+        self.download_subtitles = True
+        self.download_images = False
+        self.download_info = False
+        
+        # Verify downloads against SFV/SHA256SUMS/.md5 files found next to them
+        self.verify_checksums = True
+    
+    def configure_downloads(self, videos=True, subtitles=True, images=False, info=False):
+        """Configure which file types to download"""
+        self.download_videos = videos
+        self.download_subtitles = subtitles
+        self.download_images = images
+        self.download_info = info
+    
+    def _should_download_file_type(self, file_type: str) -> bool:
+        """Check if file type should be downloaded based on configuration"""
+        return {
+            "video": self.download_videos,
+            "subtitle": self.download_subtitles,
+            "image": self.download_images,
+            "info": self.download_info
+        }.get(file_type, False)
+    
+    @staticmethod
+    def _get_encoding(response: AsyncResponse) -> str:
+        """Get the charset declared in Content-Type (utf-8 by default)"""
+        for param in response.headers.get('content-type', '').split(';')[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return 'utf-8'
+    
+    async def fetch_listing(self, url: str, revalidate: bool = True) -> List[Dict[str, Any]]:
+        """Fetch and parse a directory listing (same cache semantics as ListingFetcher.fetch)"""
+        cached = self.listing_cache.get(url)
+        if cached is not None and not revalidate:
+            return cached['entries']
+        
+        headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        try:
+            async with await self.client.get(url, headers) as response:
+                if response.status == 304 and cached is not None:
+                    self.listing_cache.touch(url)
+                    return cached['entries']
+                response.raise_for_status()
+                content = await response.read()
+        except AsyncHTTPError as e:
+            raise Exception(f"Error accessing URL: {e}")
+        
+        entries = self.listing_fetcher.parse(content, url, self._get_encoding(response))
+        self.listing_cache.put(url, entries,
+                               response.headers.get('etag'),
+                               response.headers.get('last-modified'))
+        return entries
+    
+    async def iter_file_list(self, url: str, recursive: bool = False, max_depth: int = 5,
+                             revalidate: bool = True) -> AsyncIterator[Tuple[str, str, str]]:
+        """
+        Stream files as listings arrive; subdirectories are fetched concurrently when recursive
+        Yields: (filename, full_url, file_type) with relative paths in recursive mode
+        """
+        if not recursive:
+            max_depth = 0
+        root = DirectoryCrawler.normalize_url(url)
+        visited = {root}
+        pending = {asyncio.ensure_future(self.fetch_listing(url, revalidate)): (url, '', 0)}
+        
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    dir_url, prefix, depth = pending.pop(task)
+                    try:
+                        entries = task.result()
+                    except Exception as e:
+                        # The root must be readable; broken subdirectories are only reported
+                        if depth == 0:
+                            raise
+                        self.events.emit('listing_failed', folder=prefix or dir_url, url=dir_url, error=str(e))
+                        continue
+                    
+                    directories, files = DirectoryCrawler.split_listing(root, entries, prefix, depth,
+                                                                        max_depth, visited)
+                    for child in directories:
+                        pending[asyncio.ensure_future(self.fetch_listing(child[0], revalidate))] = child
+                    for relative_path, entry in files:
+                        if self._should_download_file_type(entry['type']):
+                            yield (relative_path, entry['url'], entry['type'])
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def get_file_list(self, url: str, recursive: bool = False, max_depth: int = 5,
+                            revalidate: bool = True) -> List[Tuple[str, str, str]]:
+        """
+        Get list of files from the webpage
+        Returns: List of (filename, full_url, file_type)
+        """
+        return [file_info async for file_info in self.iter_file_list(url, recursive, max_depth, revalidate)]
+    
+    @staticmethod
+    async def _checkpoint(cancel_token: Optional[CancellationToken]):
+        """Event-loop friendly CancellationToken.checkpoint"""
+        if cancel_token is None:
+            return
+        while cancel_token.is_paused:
+            await asyncio.sleep(0.1)
+        if cancel_token.is_cancelled:
+            raise DownloadCancelled("Download cancelled by user")
+    
+    async def download_file(self, filename: str, url: str, download_path: Path,
+                            progress_callback: Optional[Callable] = None,
+                            cancel_token: Optional[CancellationToken] = None,
+                            overwrite: bool = False) -> bool:
+        """
+        Download a single file with retry logic, resuming from an existing .part file
+        Same rules as FileDownloader.download_file (size/checksum verification, hash index, overwrite)
+        """
+        file_path = download_path / filename
+        
+        # Completed files only appear through the final rename, so they are never partial
+        if file_path.exists() and not overwrite:
+            self.events.emit('file_exists', filename=filename, url=url)
+            return True
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        started = time.perf_counter()
+        for attempt in range(1, self.retry_policy.max_retries + 1):
+            timings: Dict[str, Any] = {}
+            try:
+                await self._download_file_attempt(filename, url, file_path, progress_callback,
+                                                  cancel_token, timings)
+            except (AsyncHTTPError, requests.RequestException) as e:
+                delay = self.file_downloader._attempt_failed(filename, url, attempt, e)
+                if cancel_token:
+                    await cancel_token.sleep_async(delay)
+                else:
+                    await asyncio.sleep(delay)
+            else:
+                self.file_downloader._attempt_succeeded(filename, url, attempt, started, timings)
+                return True
+        
+        return False
+    
+    async def _download_file_attempt(self, filename: str, url: str, file_path: Path,
+                                     progress_callback: Optional[Callable] = None,
+                                     cancel_token: Optional[CancellationToken] = None,
+                                     timings: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Single download attempt using the same .part/.part.json files and checks as FileDownloader
+        timings receives the same keys as in FileDownloader._download_file_attempt
+        """
+        if timings is None:
+            timings = {}
+        await self._checkpoint(cancel_token)
+        downloader = self.file_downloader
+        part_path = downloader.get_part_path(file_path)
+        meta, resume_from, headers = downloader._prepare_resume(file_path, url)
+        
+        requested = time.perf_counter()
+        async with await self.client.get(url, headers) as response:
+            headers_received = time.perf_counter()
+            # Hashes the kept part of a resumed .part file, which can take a while for big files
+            mode, resume_from, total_size, hasher = await _run_blocking(
+                downloader._accept_response, filename, file_path, url, meta, resume_from, response.status, response
+            )
+            downloaded = resume_from
+            if mode is not None:
+                # Local disk writes are fast enough to stay on the loop for the small files this targets
+                with open(part_path, mode) as file:
+                    async for chunk in response.iter_chunks():
+                        await self._checkpoint(cancel_token)
+                        delay = self.bandwidth.reserve(url, len(chunk))
+                        if delay:
+                            await asyncio.sleep(delay)
+                        file.write(chunk)
+                        hasher.update(chunk)
+                        downloaded += len(chunk)
+                        if progress_callback:
+                            progress_callback(downloaded, total_size, filename)
+        
+        if total_size and downloaded < total_size:
+            raise AsyncHTTPError(
+                f"Connection closed after {downloaded} of {total_size} bytes for {filename}", kind='connection'
+            )
+        
+        streamed = time.perf_counter()
+        await _run_blocking(downloader._complete, file_path, url, hasher, total_size)
+        timings.update(size=total_size or downloaded, bytes=downloaded - resume_from, resumed_from=resume_from,
+                       segmented=False, ttfb_s=headers_received - requested,
+                       transfer_s=streamed - headers_received if mode else None,
+                       verify_s=time.perf_counter() - streamed)
+        return True
+    
+    async def load_checksums(self, selected_files: List[Tuple[str, str, str]]) -> Dict[str, Tuple[str, str]]:
+        """Async UCLVDownloader.load_checksums: expected checksums from the manifests next to the files"""
+        folders = ChecksumManifest.group_by_folder(file_url for _, file_url, _ in selected_files)
+        checksums = {}
+        for folder_url, file_urls in folders.items():
+            try:
+                entries = await self.fetch_listing(folder_url, revalidate=False)
+            except Exception:
+                continue
+            
+            for entry in entries:
+                algorithm = None if entry['is_dir'] else ChecksumManifest.algorithm_for(entry['name'])
+                if algorithm is None:
+                    continue
+                try:
+                    async with await self.client.get(entry['url']) as response:
+                        response.raise_for_status()
+                        content = await response.read()
+                except AsyncHTTPError:
+                    continue
+                if len(content) > ChecksumManifest.MAX_SIZE:
+                    continue
+                manifest = ChecksumManifest.parse(content.decode('utf-8', errors='replace'), algorithm, entry['name'])
+                for file_url in file_urls:
+                    digest = ChecksumManifest.digest_for(manifest, file_url)
+                    if digest:
+                        checksums[file_url] = (algorithm, digest)
+        
+        return checksums
+    
+    async def download_selected_files(self, selected_files: List[Tuple[str, str, str]],
+                                      url: str, download_path: Optional[Path] = None,
+                                      progress_callback: Optional[Callable] = None,
+                                      cancel_token: Optional[CancellationToken] = None,
+                                      overwrite: bool = False) -> Dict[str, Any]:
+        """
+        Download files concurrently (up to max_concurrency transfers) on the running loop
+        Returns the same statistics dictionary as UCLVDownloader.download_selected_files
+        With overwrite=True existing files are replaced once the new copy is complete
+        """
+        if not selected_files:
+            return {'success': False, 'message': 'No files selected for download'}
+        
+        if download_path is None:
+            download_path = Path("descarga") / URLUtils.extract_folder_name(url)
+        elif isinstance(download_path, str):
+            download_path = Path(download_path)
+        download_path.mkdir(parents=True, exist_ok=True)
+        
+        if cancel_token is None:
+            cancel_token = CancellationToken()
+        
+        self.file_downloader.checksums = await self.load_checksums(selected_files) if self.verify_checksums else {}
+        if self.file_downloader.checksums:
+            self.events.emit('checksums_loaded', count=len(self.file_downloader.checksums))
+        
+        self.progress.reset()
+        self.progress.update(total_files=len(selected_files))
+        self.retry_policy.reset_stats()
+        metrics = TransferMetrics()
+        self.events.add_sink(metrics)
+        self.events.emit('batch_started', total=len(selected_files), download_path=str(download_path))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total_files = len(selected_files)
+        
+        async def download_job(index: int, filename: str, file_url: str) -> bool:
+            """Download one file once a concurrency slot is free"""
+            async with semaphore:
+                await self._checkpoint(cancel_token)
+                await asyncio.sleep(self.rate_limiter.reserve(file_url))
+                await self._checkpoint(cancel_token)
+                self.progress.start_file(filename)
+                self.events.emit('file_started', filename=filename, url=file_url, position=index + 1,
+                                 total=total_files)
+                
+                def file_progress_callback(downloaded, total, fname):
+                    self.progress.update_file(fname, downloaded, total)
+                    if progress_callback:
+                        progress_callback(downloaded, total, fname)
+                
+                return await self.download_file(filename, file_url, download_path,
+                                                file_progress_callback, cancel_token, overwrite)
+        
+        successful_downloads = 0
+        failed_downloads = []
+        cancelled_downloads = []
+        errors: Dict[str, str] = {}
+        jobs = [(i, filename, file_url) for i, (filename, file_url, _) in enumerate(selected_files)]
+        retry_pass = False
+        
+        while jobs:
+            tasks = [asyncio.ensure_future(download_job(*job)) for job in jobs]
+            try:
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            except asyncio.CancelledError:
+                # The caller cancelled us: stop every transfer, keeping .part files
+                self.events.remove_sink(metrics)
+                cancel_token.cancel()
+                for task in tasks:
+                    task.cancel()
+                self.file_downloader.flush_hashes()
+                raise
+            
+            # Files that ran out of retries on a transient error get one more go after the rest
+            deferred = []
+            for job, result in zip(jobs, results):
+                _, filename, file_url = job
+                if isinstance(result, DownloadCancelled):
+                    cancelled_downloads.append(filename)
+                    self.progress.discard_file(filename)
+                    continue
+                if isinstance(result, BaseException):
+                    if (self.retry_policy.deferred_retry and not retry_pass
+                            and self.retry_policy.is_retryable(result) and not cancel_token.is_cancelled):
+                        deferred.append(job)
+                        self.progress.discard_file(filename)
+                        continue
+                    failed_downloads.append(f"{filename}: {result}")
+                    errors[filename] = str(result)
+                    self.events.emit('file_failed', filename=filename, url=file_url,
+                                     reason=self.retry_policy.classify(result), error=str(result))
+                    self.progress.finish_file(filename, False)
+                elif result:
+                    successful_downloads += 1
+                    if retry_pass:
+                        self.retry_policy.record('recovered')
+                    self.progress.finish_file(filename, True)
+                else:
+                    failed_downloads.append(filename)
+                    errors[filename] = 'Download failed'
+                    self.progress.finish_file(filename, False)
+            
+            jobs = []
+            if deferred and not cancel_token.is_cancelled:
+                self.events.emit('deferred_retry', count=len(deferred))
+                self.retry_policy.record('deferred', len(deferred))
+                jobs = deferred
+                retry_pass = True
+        
+        cancelled = cancel_token.is_cancelled
+        success = len(failed_downloads) == 0 and not cancelled
+        if cancelled:
+            message = 'Download cancelled by user'
+        elif success:
+            message = 'Download completed successfully'
+        else:
+            message = f'Download completed with {len(failed_downloads)} errors'
+        
+        self.file_downloader.flush_hashes()
+        duration = self.progress.get_elapsed_time()
+        self.events.emit('batch_finished', completed=successful_downloads, failed=len(failed_downloads),
+                         cancelled=cancelled, duration=duration)
+        self.events.remove_sink(metrics)
+        return {
+            'success': success,
+            'message': message,
+            'completed': successful_downloads,
+            'failed': failed_downloads,
+            'cancelled': cancelled,
+            'skipped': cancelled_downloads,
+            'errors': errors,
+            'total': total_files,
+            'download_path': str(download_path.absolute()),
+            'duration': duration,
+            'retry_stats': self.retry_policy.get_stats(),
+            'metrics': metrics.summary()
+        }
+    
+    async def iter_progress(self, task: 'asyncio.Future', interval: float = 0.1) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield progress snapshots (see DownloadProgress.snapshot) until task finishes
+        Only changed snapshots are yielded; the final state is always yielded last
+        """
+        last_version = None
+        while not task.done():
+            snapshot = self.progress.snapshot()
+            if snapshot['version'] != last_version:
+                last_version = snapshot['version']
+                yield snapshot
+            await asyncio.wait({task}, timeout=interval)
+        
+        yield self.progress.snapshot()
+    
+    async def close(self):
+        """Close pooled connections"""
+        await self.client.close()
+    
+    async def __aenter__(self) -> 'AsyncUCLVDownloader':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,312 @@
+"""
+Minimal asyncio HTTP/1.1 client for the async download core
+"""
+
+import asyncio
+import ssl
+import urllib.parse
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from requests.utils import requote_uri
+
+from ..http_session import DEFAULT_USER_AGENT
+
+
+class AsyncHTTPError(Exception):
+    """Connection, protocol or timeout failure in the async client"""
+    
+    def __init__(self, message: str, response: Optional['AsyncResponse'] = None, kind: str = 'protocol'):
+        super().__init__(message)
+        # Set for HTTP error statuses so callers can look at the status and headers
+        self.response = response
+        # 'timeout', 'connection' or 'protocol' (see RetryPolicy.classify)
+        self.kind = kind
+
+
+class AsyncResponse:
+    """Streaming HTTP response bound to a pooled connection until released"""
+    
+    def __init__(self, client: 'AsyncHTTPClient', key: Tuple[str, str, int],
+                 reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 method: str, url: str, status: int, reason: str,
+                 headers: Dict[str, str], keep_alive: bool):
+        self.client = client
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._key = key
+        self._reader = reader
+        self._writer = writer
+        self._keep_alive = keep_alive
+        self._released = False
+        
+        self._chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        self._remaining: Optional[int] = None
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            self._remaining = 0
+        elif not self._chunked and headers.get('content-length', '').isdigit():
+            self._remaining = int(headers['content-length'])
+        self._chunk_left = 0
+        # Bodies delimited by connection close can never be reused
+        self._done = self._remaining == 0
+        if self._remaining is None and not self._chunked:
+            self._keep_alive = False
+    
+    def raise_for_status(self):
+        """Raise AsyncHTTPError for 4xx/5xx statuses"""
+        if self.status >= 400:
+            raise AsyncHTTPError(f"{self.status} {self.reason} for url: {self.url}", response=self)
+    
+    async def _read(self, size: int) -> bytes:
+        """Read up to size bytes with the client timeout"""
+        return await asyncio.wait_for(self._reader.read(size), self.client.timeout)
+    
+    async def _readline(self) -> bytes:
+        """Read one line with the client timeout"""
+        return await asyncio.wait_for(self._reader.readline(), self.client.timeout)
+    
+    async def _read_chunked(self, chunk_size: int) -> bytes:
+        """Read the next piece of a chunked body (b'' at the end)"""
+        if self._chunk_left == 0:
+            line = await self._readline()
+            try:
+                self._chunk_left = int(line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise AsyncHTTPError(f"Invalid chunk header from {self.url}")
+            if self._chunk_left == 0:
+                # Skip optional trailers up to the terminating blank line
+                while (await self._readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''
+        
+        data = await self._read(min(chunk_size, self._chunk_left))
+        if not data:
+            raise AsyncHTTPError(f"Connection closed inside a chunk from {self.url}", kind='connection')
+        self._chunk_left -= len(data)
+        if self._chunk_left == 0:
+            await self._readline()
+        return data
+    
+    async def iter_chunks(self, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Yield the body as it arrives"""
+        try:
+            while not self._done:
+                if self._chunked:
+                    data = await self._read_chunked(chunk_size)
+                    if not data:
+                        self._done = True
+                        break
+                elif self._remaining is not None:
+                    data = await self._read(min(chunk_size, self._remaining))
+                    if not data:
+                        raise AsyncHTTPError(
+                            f"Connection closed with {self._remaining} bytes left from {self.url}",
+                            kind='connection'
+                        )
+                    self._remaining -= len(data)
+                    self._done = self._remaining == 0
+                else:
+                    data = await self._read(chunk_size)
+                    if not data:
+                        self._done = True
+                        break
+                yield data
+        except asyncio.TimeoutError:
+            raise AsyncHTTPError(f"Read timed out from {self.url}", kind='timeout')
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise AsyncHTTPError(f"Connection error from {self.url}: {e}", kind='connection')
+    
+    async def read(self) -> bytes:
+        """Read the whole body"""
+        return b''.join([chunk async for chunk in self.iter_chunks()])
+    
+    def release(self):
+        """Return the connection to the pool (or close it if the body was not fully read)"""
+        if self._released:
+            return
+        self._released = True
+        if self._done and self._keep_alive:
+            self.client._put_connection(self._key, self._reader, self._writer)
+        else:
+            self._writer.close()
+        self.client._semaphore(self._key).release()
+    
+    async def __aenter__(self) -> 'AsyncResponse':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class AsyncHTTPClient:
+    """Keep-alive connection pool on asyncio streams with a per-host connection limit"""
+    
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+    
+    def __init__(self, max_connections_per_host: int = 8, timeout: float = 30,
+                 headers: Optional[Dict[str, str]] = None):
+        self.max_connections_per_host = max(1, max_connections_per_host)
+        self.timeout = timeout
+        self.headers = {
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Accept-Encoding': 'identity',
+            'Connection': 'keep-alive'
+        }
+        if headers:
+            self.headers.update(headers)
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._semaphores: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+    
+    def _semaphore(self, key: Tuple[str, str, int]) -> asyncio.Semaphore:
+        """Get (or create) the connection limit for a host"""
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_connections_per_host)
+            self._semaphores[key] = semaphore
+        return semaphore
+    
+    def _put_connection(self, key: Tuple[str, str, int], reader: asyncio.StreamReader,
+                        writer: asyncio.StreamWriter):
+        """Keep a connection for the next request to the same host"""
+        self._idle.setdefault(key, []).append((reader, writer))
+    
+    async def _get_connection(self, key: Tuple[str, str, int]):
+        """Reuse an idle connection or open a new one; returns (reader, writer, reused)"""
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer, True
+            writer.close()
+        
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == 'https':
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl_context), self.timeout
+            )
+        except asyncio.TimeoutError:
+            raise AsyncHTTPError(f"Connection to {host}:{port} timed out", kind='timeout')
+        except OSError as e:
+            raise AsyncHTTPError(f"Cannot connect to {host}:{port}: {e}", kind='connection')
+        return reader, writer, False
+    
+    async def _read_head(self, reader: asyncio.StreamReader):
+        """Read the status line and headers"""
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+        if not status_line:
+            raise AsyncHTTPError("Connection closed before the response", kind='connection')
+        
+        parts = status_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            raise AsyncHTTPError(f"Invalid status line: {status_line!r}")
+        version, status = parts[0], int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ''
+        
+        headers: Dict[str, str] = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if line in (b'\r\n', b'\n'):
+                break
+            if not line:
+                raise AsyncHTTPError("Connection closed inside the response headers", kind='connection')
+            name, _, value = line.decode('latin-1').partition(':')
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = f"{headers[name]}, {value}" if name in headers else value
+        
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        return status, reason, headers, keep_alive
+    
+    async def _send(self, method: str, url: str, headers: Optional[Dict[str, str]]) -> AsyncResponse:
+        """Send one request and read the response head"""
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+            raise AsyncHTTPError(f"Unsupported URL: {url}")
+        default_port = 443 if parsed.scheme == 'https' else 80
+        port = parsed.port or default_port
+        key = (parsed.scheme, parsed.hostname, port)
+        
+        path = parsed.path or '/'
+        if parsed.query:
+            path += '?' + parsed.query
+        # Same quoting as requests, so both engines ask for the same resource (the line must be ASCII)
+        path = requote_uri(path)
+        request_headers = dict(self.headers)
+        request_headers['Host'] = parsed.hostname if port == default_port else f"{parsed.hostname}:{port}"
+        if headers:
+            request_headers.update(headers)
+        request_line = f"{method} {path} HTTP/1.1\r\n".encode('ascii')
+        head = ''.join(f"{name}: {value}\r\n" for name, value in request_headers.items())
+        payload = request_line + (head + "\r\n").encode('latin-1')
+        
+        semaphore = self._semaphore(key)
+        await semaphore.acquire()
+        try:
+            # An idle connection the server already dropped gets one retry on a fresh one
+            for attempt in range(2):
+                reader, writer, reused = await self._get_connection(key)
+                try:
+                    writer.write(payload)
+                    await asyncio.wait_for(writer.drain(), self.timeout)
+                    status, reason, response_headers, keep_alive = await self._read_head(reader)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, AsyncHTTPError) as e:
+                    writer.close()
+                    if reused and attempt == 0:
+                        continue
+                    if isinstance(e, AsyncHTTPError):
+                        raise
+                    kind = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'connection'
+                    raise AsyncHTTPError(f"Request to {url} failed: {e!r}", kind=kind)
+                
+                return AsyncResponse(self, key, reader, writer, method, url,
+                                     status, reason, response_headers, keep_alive)
+        except BaseException:
+            semaphore.release()
+            raise
+    
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      max_redirects: int = 5) -> AsyncResponse:
+        """
+        Send a request, following redirects
+        The returned response holds a connection until released (use it as an async context manager)
+        """
+        for _ in range(max_redirects + 1):
+            response = await self._send(method, url, headers)
+            location = response.headers.get('location')
+            if response.status not in self.REDIRECT_STATUSES or not location:
+                return response
+            
+            response.release()
+            url = urllib.parse.urljoin(url, location)
+            if response.status == 303:
+                method = 'GET'
+        
+        raise AsyncHTTPError(f"Too many redirects for {url}")
+    
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncResponse:
+        """Send a GET request"""
+        return await self.request('GET', url, headers)
+    
+    async def head(self, url: str, headers: Optional[Dict[str, str]] = None) -> AsyncResponse:
+        """Send a HEAD request"""
+        return await self.request('HEAD', url, headers)
+    
+    async def close(self):
+        """Close every idle connection"""
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+    
+    async def __aenter__(self) -> 'AsyncHTTPClient':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
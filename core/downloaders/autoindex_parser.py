@@ -0,0 +1,108 @@
+"""
+Streaming parser for Apache/nginx autoindex listings
+"""
+
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+
+class AutoindexParser(HTMLParser):
+    """
+    Extracts (href, size, mtime, size_exact) from autoindex pages without building a DOM
+    Understands Apache FancyIndexing (<pre> and <table> layouts) and nginx autoindex
+    """
+    
+    # Text that follows a link up to the end of its row: "05-Jan-2023 12:34   1.2G"
+    DATE_PATTERN = re.compile(
+        r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}(?::\d{2})?|\d{1,2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2}(?::\d{2})?)'
+        r'\s+(\d+(?:\.\d+)?[KMGTP]?|-)'
+    )
+    DATE_FORMATS = ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%d-%b-%Y %H:%M', '%d-%b-%Y %H:%M:%S')
+    SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4, 'P': 1024 ** 5}
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: List[Tuple[str, Optional[int], Optional[str], bool]] = []
+        self._current_href: Optional[str] = None
+        self._tail: List[str] = []
+        self._in_anchor = False
+        self._in_row = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            # A new link closes the row of the previous one
+            self._flush()
+            href = dict(attrs).get('href')
+            if href:
+                self._current_href = href
+                self._in_anchor = True
+        elif tag == 'tr':
+            self._flush()
+            self._in_row = True
+    
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            self._in_anchor = False
+        elif tag in ('tr', 'pre', 'table', 'body'):
+            self._flush()
+            self._in_row = False
+    
+    def handle_data(self, data):
+        if self._current_href is None or self._in_anchor:
+            return
+        
+        # In <pre> listings every entry ends at a line break, in tables at </tr>
+        newline = -1 if self._in_row else data.find('\n')
+        if newline >= 0:
+            self._tail.append(data[:newline])
+            self._flush()
+        else:
+            self._tail.append(data)
+    
+    def close(self):
+        super().close()
+        self._flush()
+    
+    def _flush(self):
+        """Store the pending link with the metadata found after it"""
+        if self._current_href is None:
+            return
+        
+        size, mtime, size_exact = self.parse_metadata(' '.join(self._tail))
+        self.links.append((self._current_href, size, mtime, size_exact))
+        self._current_href = None
+        self._tail = []
+        self._in_anchor = False
+    
+    @classmethod
+    def parse_metadata(cls, text: str) -> Tuple[Optional[int], Optional[str], bool]:
+        """
+        Extract size in bytes and ISO mtime from the text of a listing row
+        size_exact is False for human readable sizes such as '1.2G'
+        """
+        match = cls.DATE_PATTERN.search(text)
+        if not match:
+            return None, None, False
+        
+        raw_date, raw_size = match.groups()
+        mtime = None
+        for date_format in cls.DATE_FORMATS:
+            try:
+                mtime = datetime.strptime(raw_date, date_format).isoformat()
+                break
+            except ValueError:
+                continue
+        
+        return cls.parse_size(raw_size), mtime, raw_size.isdigit()
+    
+    @classmethod
+    def parse_size(cls, raw_size: str) -> Optional[int]:
+        """Convert '123456', '1.2G' or '-' into bytes (None when unknown)"""
+        if raw_size == '-':
+            return None
+        unit = raw_size[-1]
+        if unit in cls.SIZE_UNITS:
+            return int(float(raw_size[:-1]) * cls.SIZE_UNITS[unit])
+        return int(raw_size)
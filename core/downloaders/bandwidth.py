@@ -0,0 +1,168 @@
+"""
+Bandwidth limiting with time-window schedules
+"""
+
+import re
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+from .cancellation import CancellationToken
+from .rate_limiter import TokenBucket
+
+
+def parse_rate(text: str) -> float:
+    """Parse '200K', '1.5M', '250000' or '0'/'unlimited' into bytes per second (0 = no limit)"""
+    value = text.strip().upper().replace('B/S', '').replace('/S', '').replace('B', '')
+    if value in ('', '0', 'UNLIMITED', 'NONE', 'OFF'):
+        return 0.0
+    
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([KMG]?)', value)
+    if not match:
+        raise ValueError(f"Invalid rate: {text}")
+    number, unit = match.groups()
+    return float(number) * {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}[unit]
+
+
+class ScheduleRule(NamedTuple):
+    """Bandwidth limit for a daily time window (minutes since midnight, end exclusive)"""
+    start: int
+    end: int
+    limit: float
+    
+    def matches(self, minute: int) -> bool:
+        """Check if a minute of the day falls inside the window (windows may wrap midnight)"""
+        if self.start <= self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+
+class BandwidthSchedule:
+    """Ordered time-window rules; the first matching rule wins"""
+    
+    RULE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)')
+    
+    def __init__(self, rules: List[ScheduleRule]):
+        self.rules = rules
+    
+    @classmethod
+    def parse(cls, spec: str) -> 'BandwidthSchedule':
+        """
+        Parse rules such as '00:00-07:00=0,07:00-23:00=200K'
+        Outside every window the limiter's base limit applies
+        """
+        rules = []
+        for part in spec.split(','):
+            if not part.strip():
+                continue
+            match = cls.RULE_PATTERN.fullmatch(part.strip())
+            if not match:
+                raise ValueError(f"Invalid schedule rule: {part.strip()}")
+            start_h, start_m, end_h, end_m, rate = match.groups()
+            start = int(start_h) * 60 + int(start_m)
+            end = int(end_h) * 60 + int(end_m)
+            if start > 24 * 60 or end > 24 * 60 or int(start_m) > 59 or int(end_m) > 59:
+                raise ValueError(f"Invalid time in schedule rule: {part.strip()}")
+            rules.append(ScheduleRule(start, end, parse_rate(rate)))
+        return cls(rules)
+    
+    def limit_at(self, when: datetime) -> Optional[float]:
+        """Get the limit of the first rule matching a moment (None if no rule matches)"""
+        minute = when.hour * 60 + when.minute
+        for rule in self.rules:
+            if rule.matches(minute):
+                return rule.limit
+        return None
+
+
+class BandwidthLimiter:
+    """
+    Caps the combined transfer rate of every download sharing it, optionally also per host
+    Limits are bytes per second (0 = unlimited) and can be changed while downloads run.
+    """
+    
+    # Longest single sleep, so limit changes and cancellation apply promptly
+    MAX_WAIT = 0.25
+    # How often the schedule is re-evaluated
+    SCHEDULE_INTERVAL = 1.0
+    
+    def __init__(self, limit: float = 0, per_host_limit: float = 0,
+                 schedule: Optional[BandwidthSchedule] = None):
+        self.limit = limit
+        self.per_host_limit = per_host_limit
+        self.schedule = schedule
+        self._bucket = TokenBucket(0)
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._refresh(force=True)
+    
+    @property
+    def enabled(self) -> bool:
+        """Check if any limit or schedule is configured"""
+        return bool(self.limit > 0 or self.per_host_limit > 0 or self.schedule)
+    
+    @property
+    def current_limit(self) -> float:
+        """Global limit in effect right now (schedule included)"""
+        self._refresh()
+        return self._bucket.rate
+    
+    def set_limit(self, limit: float, per_host_limit: Optional[float] = None):
+        """Change the base limit (and optionally the per-host limit) at runtime"""
+        with self._lock:
+            self.limit = limit
+            if per_host_limit is not None:
+                self.per_host_limit = per_host_limit
+                for bucket in self._host_buckets.values():
+                    bucket.set_rate(per_host_limit)
+        self._refresh(force=True)
+    
+    def set_schedule(self, schedule: Optional[BandwidthSchedule]):
+        """Replace the time-window rules at runtime"""
+        self.schedule = schedule
+        self._refresh(force=True)
+    
+    def _refresh(self, force: bool = False):
+        """Apply the schedule rule of the current time to the global bucket"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.SCHEDULE_INTERVAL:
+            return
+        self._checked_at = now
+        
+        limit = self.schedule.limit_at(datetime.now()) if self.schedule else None
+        rate = self.limit if limit is None else limit
+        if rate != self._bucket.rate:
+            self._bucket.set_rate(rate)
+    
+    def _host_bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the host of a URL"""
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._host_buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.per_host_limit)
+                self._host_buckets[host] = bucket
+            return bucket
+    
+    def consume(self, url: str, size: int, cancel_token: Optional[CancellationToken] = None):
+        """Wait until size bytes from url fit in the limits (cancellable through cancel_token)"""
+        if not self.enabled:
+            return
+        self._refresh()
+        sleep = cancel_token.sleep if cancel_token else time.sleep
+        self._bucket.acquire(size, sleep, self.MAX_WAIT)
+        if self.per_host_limit > 0:
+            self._host_bucket(url).acquire(size, sleep, self.MAX_WAIT)
+    
+    def reserve(self, url: str, size: int) -> float:
+        """Take size bytes now and return how long the caller must wait (for event loops)"""
+        if not self.enabled:
+            return 0.0
+        self._refresh()
+        delay = self._bucket.reserve(size)
+        if self.per_host_limit > 0:
+            delay = max(delay, self._host_bucket(url).reserve(size))
+        return delay
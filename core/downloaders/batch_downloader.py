@@ -2,106 +2,204 @@
 Batch Downloader for multiple files
 """
 
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import List, Tuple, Optional, Callable, Dict, Any
 
+import requests
+
+from .bandwidth import BandwidthLimiter
+from .cancellation import CancellationToken, DownloadCancelled
+from .events import EventLog, TransferMetrics
 from .file_downloader import FileDownloader
 from .progress_tracker import DownloadProgress
+from .rate_limiter import HostRateLimiter
+from .retry_policy import RetryPolicy
 
 
 class BatchDownloader:
-    """Handles batch downloading of multiple files"""
+    """Handles batch downloading of multiple files on a bounded worker pool"""
     
-    def __init__(self, download_delay: float = 0.5, max_retries: int = 3):
+    def __init__(self, download_delay: Optional[float] = None, max_retries: int = 3, max_workers: int = 4,
+                 segments: int = 1, min_segment_size: int = 8 * 1024 * 1024,
+                 session: Optional[requests.Session] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 events: Optional[EventLog] = None):
         self.download_delay = download_delay
+        self.max_workers = max(1, max_workers)
         self.progress = DownloadProgress()
-        self.file_downloader = FileDownloader(max_retries=max_retries)
+        self.file_downloader = FileDownloader(session, max_retries=max_retries, segments=segments,
+                                              min_segment_size=min_segment_size, bandwidth=bandwidth,
+                                              retry_policy=retry_policy, events=events)
+        self.retry_policy = self.file_downloader.retry_policy
+        self.events = self.file_downloader.events
+        
+        # Politeness: new file requests per host are spaced by download_delay, or by
+        # HostRateLimiter.DEFAULT_DELAY until a bandwidth cap or schedule takes over (None)
+        self.rate_limiter = HostRateLimiter.for_delay(download_delay, self.file_downloader.bandwidth)
     
     def download_files(self, selected_files: List[Tuple[str, str, str]], 
                       download_path: Path,
-                      progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                      progress_callback: Optional[Callable] = None,
+                      cancel_token: Optional[CancellationToken] = None,
+                      overwrite: bool = False) -> Dict[str, Any]:
         """
         Download multiple files with progress tracking
         Args:
             selected_files: List of (filename, file_url, file_type) tuples
             download_path: Target download directory
             progress_callback: Progress callback function
-        Returns: Dictionary with download statistics
+            cancel_token: Token to pause/resume or cancel the batch from another thread
+            overwrite: Download files that already exist again (replaced atomically when done)
+        Returns: Dictionary with download statistics (per-file timings under 'metrics')
         """
         if not selected_files:
             return {'success': False, 'message': 'No files selected for download'}
         
+        # Ctrl+C cancels through the same token the workers already check
+        if cancel_token is None:
+            cancel_token = CancellationToken()
+        
         # Setup progress tracking
         self.progress.reset()
         self.progress.update(total_files=len(selected_files))
+        self.retry_policy.reset_stats()
+        metrics = TransferMetrics()
+        self.events.add_sink(metrics)
         
         # Create download directory
         download_path.mkdir(parents=True, exist_ok=True)
+        self.events.emit('batch_started', total=len(selected_files), download_path=str(download_path))
         
         # Download files
         successful_downloads = 0
         failed_downloads = []
+        cancelled_downloads = []
+        errors: Dict[str, str] = {}
+        total_files = len(selected_files)
+        
+        def download_job(index: int, filename: str, file_url: str) -> bool:
+            """Download one file inside a worker thread"""
+            # Queued files wait here while paused and are skipped once cancelled
+            cancel_token.checkpoint()
+            self.rate_limiter.acquire(file_url)
+            cancel_token.checkpoint()
+            self.progress.start_file(filename)
+            self.events.emit('file_started', filename=filename, url=file_url, position=index + 1, total=total_files)
+            
+            # Enhanced progress callback for this specific file
+            def file_progress_callback(downloaded, total, fname):
+                self.progress.update_file(fname, downloaded, total)
+                if progress_callback:
+                    progress_callback(downloaded, total, fname)
+            
+            return self.file_downloader.download_file(filename, file_url, download_path,
+                                                      file_progress_callback, cancel_token, overwrite)
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, total_files),
+                                      thread_name_prefix='uclv-download')
+        futures = {
+            executor.submit(download_job, i, filename, file_url): (i, filename, file_url)
+            for i, (filename, file_url, _) in enumerate(selected_files)
+        }
+        # Files that ran out of retries on a transient error get one more go after the rest
+        deferred = []
+        retry_pass = False
         
         try:
-            for i, (filename, file_url, file_type) in enumerate(selected_files):
-                self.progress.update(current_file=filename, current_progress=i)
-                print(f"📥 Descargando ({i+1}/{len(selected_files)}): {filename}")
-                
-                # Enhanced progress callback for this specific file
-                def file_progress_callback(downloaded, total, fname):
-                    self.progress.update(
-                        downloaded_bytes=downloaded,
-                        total_bytes=total
-                    )
-                    if progress_callback:
-                        progress_callback(downloaded, total, fname)
-                
-                try:
-                    if self.file_downloader.download_file(filename, file_url, download_path, file_progress_callback):
-                        successful_downloads += 1
-                        self.progress.update(completed_files=successful_downloads)
-                    else:
-                        failed_downloads.append(filename)
-                        self.progress.update(failed_files=len(failed_downloads))
-                        
-                except Exception as e:
-                    error_msg = f"{filename}: {str(e)}"
-                    failed_downloads.append(error_msg)
-                    self.progress.update(failed_files=len(failed_downloads))
-                    print(f"❌ Error descargando {filename}: {e}")
-                
-                # Delay between downloads
-                if i < len(selected_files) - 1:
-                    time.sleep(self.download_delay)
+            while futures:
+                # Results are aggregated only in this thread, so the counters need no locking
+                for future in as_completed(futures):
+                    index, filename, file_url = futures[future]
+                    try:
+                        success = future.result()
+                        if success:
+                            successful_downloads += 1
+                            if retry_pass:
+                                self.retry_policy.record('recovered')
+                        else:
+                            failed_downloads.append(filename)
+                            errors[filename] = 'Download failed'
                     
+                    except DownloadCancelled:
+                        cancelled_downloads.append(filename)
+                        self.progress.discard_file(filename)
+                        continue
+                    except Exception as e:
+                        if (self.retry_policy.deferred_retry and not retry_pass
+                                and self.retry_policy.is_retryable(e) and not cancel_token.is_cancelled):
+                            deferred.append((index, filename, file_url))
+                            self.progress.discard_file(filename)
+                            continue
+                        success = False
+                        error_msg = f"{filename}: {str(e)}"
+                        failed_downloads.append(error_msg)
+                        errors[filename] = str(e)
+                        self.events.emit('file_failed', filename=filename, url=file_url,
+                                         reason=self.retry_policy.classify(e), error=str(e))
+                    
+                    self.progress.finish_file(filename, success)
+                
+                futures = {}
+                if deferred and not cancel_token.is_cancelled:
+                    self.events.emit('deferred_retry', count=len(deferred))
+                    self.retry_policy.record('deferred', len(deferred))
+                    futures = {executor.submit(download_job, *job): job for job in deferred}
+                    deferred = []
+                    retry_pass = True
+        
         except KeyboardInterrupt:
-            print("\n⚠️  Descarga interrumpida por el usuario")
+            self.events.emit('batch_interrupted')
+            cancel_token.cancel()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.file_downloader.flush_hashes()
+            self.events.remove_sink(metrics)
             return {
                 'success': False,
                 'message': 'Download interrupted by user',
                 'completed': successful_downloads,
                 'failed': failed_downloads,
-                'total': len(selected_files),
-                'interrupted': True
+                'errors': errors,
+                'total': total_files,
+                'interrupted': True,
+                'retry_stats': self.retry_policy.get_stats(),
+                'metrics': metrics.summary()
             }
         
+        executor.shutdown(wait=True)
+        self.file_downloader.flush_hashes()
+        
         # Return statistics
-        success = len(failed_downloads) == 0
-        message = 'Download completed successfully' if success else f'Download completed with {len(failed_downloads)} errors'
+        cancelled = cancel_token.is_cancelled
+        success = len(failed_downloads) == 0 and not cancelled
+        if cancelled:
+            message = 'Download cancelled by user'
+        elif success:
+            message = 'Download completed successfully'
+        else:
+            message = f'Download completed with {len(failed_downloads)} errors'
         
-        print(f"\n🎉 ¡Descarga completada!")
-        print(f"✅ Exitosos: {successful_downloads}")
-        print(f"❌ Fallidos: {len(failed_downloads)}")
+        duration = self.progress.get_elapsed_time()
+        self.events.emit('batch_finished', completed=successful_downloads, failed=len(failed_downloads),
+                         cancelled=cancelled, duration=duration)
+        self.events.remove_sink(metrics)
         
         return {
             'success': success,
             'message': message,
             'completed': successful_downloads,
             'failed': failed_downloads,
+            'cancelled': cancelled,
+            'skipped': cancelled_downloads,
+            'errors': errors,
             'total': len(selected_files),
             'download_path': str(download_path.absolute()),
-            'duration': self.progress.get_elapsed_time()
+            'duration': duration,
+            'retry_stats': self.retry_policy.get_stats(),
+            'metrics': metrics.summary()
         }
     
     def get_file_statistics(self, files: List[Tuple[str, str, str]]) -> Dict[str, int]:
@@ -110,7 +208,7 @@ class BatchDownloader:
         
         for _, _, file_type in files:
             stats[file_type] = stats.get(file_type, 0) + 1
-            
+        
         return stats
     
     def add_progress_callback(self, callback: Callable):
@@ -0,0 +1,86 @@
+"""
+Cooperative cancellation and pause control for running downloads
+"""
+
+import asyncio
+import threading
+from typing import Callable, List
+
+
+class DownloadCancelled(Exception):
+    """Raised inside download workers once the user cancels; partial files are kept"""
+
+
+class CancellationToken:
+    """Shared flag checked by download workers between chunks"""
+    
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        # Wake-up callbacks of coroutines in sleep_async
+        self._wakers: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        """Check if cancellation was requested"""
+        return self._cancelled.is_set()
+    
+    @property
+    def is_paused(self) -> bool:
+        """Check if workers are asked to pause"""
+        return not self._running.is_set()
+    
+    def cancel(self):
+        """Request cancellation (also wakes paused workers so they can stop)"""
+        self._cancelled.set()
+        self._running.set()
+        with self._lock:
+            wakers = list(self._wakers)
+        for wake in wakers:
+            wake()
+    
+    def pause(self):
+        """Ask workers to block at their next checkpoint"""
+        if not self.is_cancelled:
+            self._running.clear()
+    
+    def resume(self):
+        """Let paused workers continue"""
+        self._running.set()
+    
+    def checkpoint(self):
+        """Block while paused and raise DownloadCancelled if cancelled"""
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise DownloadCancelled("Download cancelled by user")
+    
+    def sleep(self, seconds: float):
+        """Sleep that returns early (raising DownloadCancelled) when cancelled"""
+        if self._cancelled.wait(seconds):
+            raise DownloadCancelled("Download cancelled by user")
+    
+    async def sleep_async(self, seconds: float):
+        """Event-loop counterpart of sleep: cancel() from any thread ends the wait at once"""
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+        
+        def wake():
+            try:
+                loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+            except RuntimeError:
+                # The loop is already closed; nobody is waiting anymore
+                pass
+        
+        with self._lock:
+            self._wakers.append(wake)
+        try:
+            if not self.is_cancelled:
+                await asyncio.wait_for(woken, seconds)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            with self._lock:
+                self._wakers.remove(wake)
+        raise DownloadCancelled("Download cancelled by user")
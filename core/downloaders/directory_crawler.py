@@ -0,0 +1,118 @@
+"""
+Recursive crawler for autoindex directory trees
+"""
+
+import posixpath
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator, List, Tuple, Set, Dict, Any, Callable, Optional
+
+from .events import EventLog
+from .listing_fetcher import ListingFetcher
+
+
+class DirectoryCrawler:
+    """Walks a remote directory tree, fetching sibling directories concurrently"""
+    
+    def __init__(self, fetcher: ListingFetcher, max_workers: int = 4, events: Optional[EventLog] = None):
+        self.fetcher = fetcher
+        self.max_workers = max(1, max_workers)
+        # Unreadable subdirectories are reported as listing_failed events
+        self.events = events or EventLog()
+    
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Normalize a directory URL for de-duplication ('.' and '..' segments resolved after unquoting)"""
+        parsed = urllib.parse.urlparse(url)
+        # Servers resolve %2E%2E/ like ../, so the comparison must see it the same way
+        path = urllib.parse.quote(posixpath.normpath(urllib.parse.unquote(parsed.path) or '/'))
+        if not path.endswith('/'):
+            path += '/'
+        return f"{parsed.scheme}://{parsed.netloc.lower()}{path}"
+    
+    @staticmethod
+    def is_child_url(root: str, url: str) -> bool:
+        """Only follow links that stay below the (normalized) root directory"""
+        normalized = DirectoryCrawler.normalize_url(url)
+        return normalized != root and normalized.startswith(root)
+    
+    @classmethod
+    def split_listing(cls, root: str, entries: List[Dict[str, Any]], prefix: str, depth: int,
+                      max_depth: int, visited: Set[str]
+                      ) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Sort one listing of the walk into subdirectories still to visit and files (also used by the async engine)
+        visited is updated with the returned subdirectories.
+        Returns: ([(url, relative prefix, depth)], [(relative_path, entry)])
+        """
+        directories = []
+        files = []
+        for entry in entries:
+            # Listings cached by older versions were not filtered when parsed
+            if not ListingFetcher.is_safe_name(entry['name']):
+                continue
+            if entry['is_dir']:
+                child = cls.normalize_url(entry['url'])
+                if depth < max_depth and child not in visited and cls.is_child_url(root, entry['url']):
+                    visited.add(child)
+                    directories.append((entry['url'], f"{prefix}{entry['name']}/", depth + 1))
+            else:
+                files.append((f"{prefix}{entry['name']}", entry))
+        return directories, files
+    
+    def crawl(self, url: str, max_depth: int = 5,
+              entry_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+              revalidate: bool = True) -> Iterator[Tuple[str, str, str]]:
+        """
+        Walk the tree below url, yielding files as soon as each listing arrives
+        Args:
+            url: Root directory URL
+            max_depth: Maximum subdirectory depth (0 lists only the root)
+            entry_filter: Optional predicate deciding which file entries are yielded
+            revalidate: Revalidate cached listings with the server (see ListingFetcher.fetch)
+        Yields: (relative_path, url, type) tuples; relative_path mirrors the remote tree
+        """
+        for relative_path, entry in self.crawl_entries(url, max_depth, entry_filter, revalidate):
+            yield (relative_path, entry['url'], entry['type'])
+    
+    def crawl_entries(self, url: str, max_depth: int = 5,
+                      entry_filter: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                      revalidate: bool = True,
+                      on_error: Optional[Callable[[str, Exception], None]] = None
+                      ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Same walk as crawl, yielding (relative_path, listing entry) so size and mtime are kept
+        on_error is called with the relative prefix of every subdirectory that could not be read
+        """
+        root = self.normalize_url(url)
+        visited: Set[str] = {root}
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='uclv-crawl')
+        pending = {executor.submit(self.fetcher.fetch, url, revalidate): (url, '', 0)}
+        
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dir_url, prefix, depth = pending.pop(future)
+                    try:
+                        entries = future.result()
+                    except Exception as e:
+                        # The root must be readable; broken subdirectories are only reported
+                        if depth == 0:
+                            raise
+                        self.events.emit('listing_failed', folder=prefix or dir_url, url=dir_url, error=str(e))
+                        if on_error:
+                            on_error(prefix, e)
+                        continue
+                    
+                    directories, files = self.split_listing(root, entries, prefix, depth, max_depth, visited)
+                    for child in directories:
+                        pending[executor.submit(self.fetcher.fetch, child[0], revalidate)] = child
+                    for relative_path, entry in files:
+                        if entry_filter is None or entry_filter(entry):
+                            yield (relative_path, entry)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
@@ -0,0 +1,389 @@
+"""
+Persistent download queue backed by SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .cancellation import CancellationToken, DownloadCancelled
+
+
+class DownloadQueue:
+    """
+    Durable queue of folder URLs and single files with per-item state
+    Folder items are expanded into file items by the QueueWorker when they reach the front.
+    """
+    
+    PENDING = 'pending'
+    ACTIVE = 'active'
+    PARTIAL = 'partial'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATES = (PENDING, ACTIVE, PARTIAL, DONE, FAILED)
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            url TEXT NOT NULL,
+            filename TEXT,
+            file_type TEXT,
+            download_path TEXT NOT NULL,
+            recursive INTEGER NOT NULL DEFAULT 0,
+            file_types TEXT,
+            parent_id INTEGER,
+            priority INTEGER NOT NULL DEFAULT 0,
+            position REAL NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            added_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS items_order ON items (state, priority DESC, position);
+    """
+    
+    def __init__(self, db_path: Optional[Path] = None):
+        if db_path is None:
+            base_dir = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+            db_path = Path(base_dir) / 'ucvl-downloader' / 'queue.sqlite3'
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(self.SCHEMA)
+        
+        self.recover()
+    
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._conn.close()
+    
+    def recover(self) -> int:
+        """Mark items left active by a crashed or closed session as partial"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = ?, updated_at = ? WHERE state = ?",
+                (self.PARTIAL, time.time(), self.ACTIVE)
+            )
+            return cursor.rowcount
+    
+    def _next_position(self) -> float:
+        """Position after the last item"""
+        row = self._conn.execute("SELECT MAX(position) FROM items").fetchone()
+        return (row[0] or 0) + 1
+    
+    def _insert(self, kind: str, url: str, download_path: str, filename: Optional[str] = None,
+                file_type: Optional[str] = None, recursive: bool = False,
+                file_types: Optional[Iterable[str]] = None, parent_id: Optional[int] = None,
+                priority: int = 0, position: Optional[float] = None) -> int:
+        """Insert one item (caller holds the lock and transaction)"""
+        now = time.time()
+        cursor = self._conn.execute(
+            """INSERT INTO items (kind, url, filename, file_type, download_path, recursive,
+                                  file_types, parent_id, priority, position, state, added_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (kind, url, filename, file_type, str(download_path), int(recursive),
+             ','.join(file_types) if file_types is not None else None, parent_id, priority,
+             position if position is not None else self._next_position(), self.PENDING, now, now)
+        )
+        return cursor.lastrowid
+    
+    def add_folder(self, url: str, download_path: str, recursive: bool = False,
+                   file_types: Optional[Iterable[str]] = None, priority: int = 0) -> int:
+        """
+        Enqueue a whole folder URL
+        Args:
+            url: Folder URL
+            download_path: Target directory for its files
+            recursive: Include subfolders
+            file_types: Types to download (None uses the downloader's configuration)
+            priority: Higher priorities are processed first
+        Returns: Item id
+        """
+        with self._lock, self._conn:
+            return self._insert('folder', url, download_path, recursive=recursive,
+                                file_types=file_types, priority=priority)
+    
+    def add_files(self, files: List[tuple], download_path: str, priority: int = 0,
+                  parent_id: Optional[int] = None) -> List[int]:
+        """Enqueue (filename, url, file_type) tuples, skipping files already queued and not failed"""
+        ids = []
+        with self._lock, self._conn:
+            # Children of an expanded folder take its place in the queue
+            position = None
+            if parent_id is not None:
+                row = self._conn.execute("SELECT position FROM items WHERE id = ?", (parent_id,)).fetchone()
+                position = row['position'] if row else None
+            
+            for index, (filename, file_url, file_type) in enumerate(files):
+                existing = self._conn.execute(
+                    "SELECT id FROM items WHERE kind = 'file' AND url = ? AND download_path = ? AND state != ?",
+                    (file_url, str(download_path), self.FAILED)
+                ).fetchone()
+                if existing:
+                    continue
+                child_position = position + (index + 1) / (len(files) + 1) if position is not None else None
+                ids.append(self._insert('file', file_url, download_path, filename, file_type,
+                                        parent_id=parent_id, priority=priority, position=child_position))
+        return ids
+    
+    def get(self, item_id: int) -> Optional[Dict[str, Any]]:
+        """Get one item as a dict"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM items WHERE id = ?", (item_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def list_items(self, states: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Get items in processing order, optionally filtered by state"""
+        query = "SELECT * FROM items"
+        params: List[Any] = []
+        if states is not None:
+            states = list(states)
+            query += f" WHERE state IN ({','.join('?' * len(states))})"
+            params.extend(states)
+        query += " ORDER BY priority DESC, position"
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+    
+    def counts(self) -> Dict[str, int]:
+        """Get the number of items in each state"""
+        counts = {state: 0 for state in self.STATES}
+        with self._lock:
+            for row in self._conn.execute("SELECT state, COUNT(*) FROM items GROUP BY state"):
+                counts[row[0]] = row[1]
+        return counts
+    
+    def has_work(self) -> bool:
+        """Check if there are pending or partial items"""
+        counts = self.counts()
+        return counts[self.PENDING] + counts[self.PARTIAL] > 0
+    
+    def claim_next(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """
+        Mark the next items as active and return them
+        A folder is always claimed alone; files are claimed together (up to limit) while they
+        share the download path of the first one, so they can run as a single batch.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT * FROM items WHERE state IN (?, ?) ORDER BY priority DESC, position LIMIT ?",
+                (self.PENDING, self.PARTIAL, max(1, limit))
+            ).fetchall()
+            if not rows:
+                return []
+            
+            claimed = [rows[0]]
+            if rows[0]['kind'] == 'file':
+                for row in rows[1:]:
+                    if row['kind'] != 'file' or row['download_path'] != rows[0]['download_path']:
+                        break
+                    claimed.append(row)
+            
+            ids = [row['id'] for row in claimed]
+            self._conn.execute(
+                f"UPDATE items SET state = ?, updated_at = ? WHERE id IN ({','.join('?' * len(ids))})",
+                [self.ACTIVE, time.time()] + ids
+            )
+        return [dict(row, state=self.ACTIVE) for row in claimed]
+    
+    def set_state(self, item_id: int, state: str, error: Optional[str] = None):
+        """Update the state of an item (failures also count an attempt)"""
+        if state not in self.STATES:
+            raise ValueError(f"Unknown queue state: {state}")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE items SET state = ?, error = ?, attempts = attempts + ?, updated_at = ? WHERE id = ?",
+                (state, error, int(state == self.FAILED), time.time(), item_id)
+            )
+    
+    def set_priority(self, item_id: int, priority: int):
+        """Change the priority of an item"""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE items SET priority = ?, updated_at = ? WHERE id = ?",
+                               (priority, time.time(), item_id))
+    
+    def move(self, item_id: int, index: int):
+        """Move a waiting item to a new index among the waiting items of the same priority"""
+        with self._lock, self._conn:
+            item = self._conn.execute("SELECT priority FROM items WHERE id = ?", (item_id,)).fetchone()
+            if item is None:
+                raise KeyError(f"Queue item {item_id} not found")
+            
+            ids = [row['id'] for row in self._conn.execute(
+                "SELECT id FROM items WHERE state IN (?, ?) AND priority = ? ORDER BY position",
+                (self.PENDING, self.PARTIAL, item['priority'])
+            )]
+            if item_id not in ids:
+                raise ValueError(f"Queue item {item_id} is not waiting")
+            
+            ids.remove(item_id)
+            ids.insert(max(0, min(index, len(ids))), item_id)
+            positions = sorted(row['position'] for row in self._conn.execute(
+                f"SELECT position FROM items WHERE id IN ({','.join('?' * len(ids))})", ids
+            ))
+            # Reuse the same slots so the order relative to other items is preserved
+            for queue_id, position in zip(ids, positions):
+                self._conn.execute("UPDATE items SET position = ? WHERE id = ?", (position, queue_id))
+    
+    def retry_failed(self) -> int:
+        """Put every failed item back in the queue"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE items SET state = ?, error = NULL, updated_at = ? WHERE state = ?",
+                (self.PENDING, time.time(), self.FAILED)
+            )
+            return cursor.rowcount
+    
+    def remove(self, item_id: int):
+        """Remove an item (and the files expanded from it) unless it is running"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM items WHERE (id = ? OR parent_id = ?) AND state != ?",
+                               (item_id, item_id, self.ACTIVE))
+    
+    def clear_finished(self) -> int:
+        """Remove every item that is done"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM items WHERE state = ?", (self.DONE,))
+            return cursor.rowcount
+
+
+class QueueWorker:
+    """Background thread that drains a DownloadQueue with a UCLVDownloader"""
+    
+    def __init__(self, downloader, queue: DownloadQueue, batch_size: int = 20,
+                 on_item_changed: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 idle_wait: float = 2.0):
+        """
+        Args:
+            downloader: UCLVDownloader used for listings and transfers
+            queue: Queue to drain
+            batch_size: Files of the same folder downloaded together (in parallel)
+            on_item_changed: Called from the worker thread with each item after its state changes
+            idle_wait: Seconds between checks for new items while the queue is empty
+        """
+        self.downloader = downloader
+        self.queue = queue
+        self.batch_size = max(1, batch_size)
+        self.on_item_changed = on_item_changed
+        self.idle_wait = idle_wait
+        self.cancel_token = CancellationToken()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._exit_when_empty = False
+    
+    @property
+    def is_running(self) -> bool:
+        """Check if the worker thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self, exit_when_empty: bool = False):
+        """Start processing in a daemon thread"""
+        if self.is_running:
+            return
+        self.cancel_token = CancellationToken()
+        self._exit_when_empty = exit_when_empty
+        self._thread = threading.Thread(target=self.run, name='uclv-queue', daemon=True)
+        self._thread.start()
+    
+    def wake(self):
+        """Check for new items right away"""
+        self._wake.set()
+    
+    def pause(self):
+        """Pause transfers between chunks"""
+        self.cancel_token.pause()
+    
+    def resume(self):
+        """Resume paused transfers"""
+        self.cancel_token.resume()
+    
+    def stop(self, wait: bool = True, timeout: Optional[float] = None):
+        """Stop the worker; running files are left partial for the next session"""
+        self.cancel_token.cancel()
+        self._wake.set()
+        if wait and self._thread is not None:
+            self._thread.join(timeout)
+    
+    def run(self):
+        """Process items until stopped (or until the queue is empty with exit_when_empty)"""
+        while True:
+            try:
+                # Waits here while paused
+                self.cancel_token.checkpoint()
+            except DownloadCancelled:
+                return
+            
+            items = self.queue.claim_next(self.batch_size)
+            if not items:
+                if self._exit_when_empty:
+                    return
+                self._wake.wait(self.idle_wait)
+                self._wake.clear()
+                continue
+            
+            if items[0]['kind'] == 'folder':
+                self._expand_folder(items[0])
+            else:
+                self._download_files(items)
+    
+    def _notify(self, item_id: int):
+        """Report an item state change"""
+        if self.on_item_changed:
+            item = self.queue.get(item_id)
+            if item:
+                self.on_item_changed(item)
+    
+    def _expand_folder(self, item: Dict[str, Any]):
+        """Replace a folder item with one item per file found in it"""
+        self._notify(item['id'])
+        file_types = item['file_types'].split(',') if item['file_types'] is not None else None
+        try:
+            files = self.downloader.get_file_list(item['url'], bool(item['recursive']),
+                                                  file_types=file_types)
+        except Exception as e:
+            self.queue.set_state(item['id'], DownloadQueue.FAILED, str(e))
+            self._notify(item['id'])
+            return
+        
+        self.queue.add_files(files, item['download_path'], item['priority'], parent_id=item['id'])
+        self.queue.set_state(item['id'], DownloadQueue.DONE)
+        self._notify(item['id'])
+    
+    def _download_files(self, items: List[Dict[str, Any]]):
+        """Download a group of file items that share a target directory"""
+        for item in items:
+            self._notify(item['id'])
+        
+        selected_files = [(item['filename'], item['url'], item['file_type']) for item in items]
+        try:
+            result = self.downloader.download_selected_files(
+                selected_files, items[0]['url'], Path(items[0]['download_path']),
+                cancel_token=self.cancel_token
+            )
+        except Exception as e:
+            for item in items:
+                self.queue.set_state(item['id'], DownloadQueue.FAILED, str(e))
+                self._notify(item['id'])
+            return
+        
+        errors = result.get('errors', {})
+        skipped = set(result.get('skipped', []))
+        for item in items:
+            if item['filename'] in skipped:
+                # Cancelled mid-way: the .part file is resumed next time
+                self.queue.set_state(item['id'], DownloadQueue.PARTIAL)
+            elif item['filename'] in errors:
+                self.queue.set_state(item['id'], DownloadQueue.FAILED, errors[item['filename']])
+            else:
+                self.queue.set_state(item['id'], DownloadQueue.DONE)
+            self._notify(item['id'])
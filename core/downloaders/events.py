@@ -0,0 +1,221 @@
+"""
+Structured engine events: one dict per event, delivered to pluggable sinks
+"""
+
+import json
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Union
+
+
+Sink = Callable[[Dict[str, Any]], None]
+
+
+class EventLog:
+    """
+    Fans engine events out to sinks
+    An event is a dict with 'event' (its name), 'time' (epoch seconds) and the event fields.
+    Sinks are plain callables; by default the log prints through a ConsoleSink.
+    """
+    
+    def __init__(self, sinks: Optional[Iterable[Sink]] = None):
+        # Replaced, never mutated, so emit() can iterate without a lock
+        self._sinks = tuple(sinks) if sinks is not None else (ConsoleSink(),)
+        self._lock = threading.Lock()
+    
+    @property
+    def sinks(self) -> List[Sink]:
+        """Currently attached sinks"""
+        return list(self._sinks)
+    
+    def add_sink(self, sink: Sink):
+        """Start delivering events to a sink"""
+        with self._lock:
+            self._sinks = self._sinks + (sink,)
+    
+    def remove_sink(self, sink: Sink):
+        """Stop delivering events to a sink (no-op if it is not attached)"""
+        with self._lock:
+            self._sinks = tuple(s for s in self._sinks if s is not sink)
+    
+    def emit(self, event: str, **fields):
+        """Deliver an event to every sink (called from any worker thread)"""
+        record = {'event': event, 'time': round(time.time(), 3)}
+        record.update(fields)
+        for sink in self._sinks:
+            try:
+                sink(record)
+            except OSError:
+                # A full disk or closed pipe on a log must not fail the download
+                pass
+
+
+class ConsoleSink:
+    """Prints events as the one-line messages the CLI has always shown"""
+    
+    MESSAGES = {
+        'file_exists': "✅ Archivo ya existe: {filename}",
+        'file_started': "📥 Descargando ({position}/{total}): {filename}",
+        'file_completed': "✅ Descargado: {filename}",
+        'retry': "⚠️  Intento {attempt} falló para {filename} ({reason}), reintentando en {delay:.1f}s...",
+        'listing_failed': "⚠️  No se pudo leer la carpeta {folder}: {error}",
+        'checksums_loaded': "🔐 Sumas de verificación encontradas para {count} archivos",
+        'checksum_verified': "🔐 Verificado ({algorithm}): {filename}",
+        'checksum_mismatch': "❌ Suma de verificación incorrecta ({algorithm}): {filename}",
+        'hash_index_error': "⚠️  No se pudieron guardar los hashes en {folder}: {error}",
+        'file_failed': "❌ Error descargando {filename}: {error}",
+        'deferred_retry': "\n🔁 Reintentando {count} archivos fallidos al final del lote",
+        'batch_interrupted': "\n⚠️  Descarga interrumpida por el usuario"
+    }
+    
+    def __init__(self, stream: Optional[TextIO] = None):
+        """
+        Args:
+            stream: Where to print (sys.stdout at the time of each event if omitted)
+        """
+        self.stream = stream
+        self._lock = threading.Lock()
+    
+    def render(self, record: Dict[str, Any]) -> Optional[str]:
+        """Message for an event, or None for events that are not shown"""
+        event = record['event']
+        if event == 'download_failed':
+            if record['fatal']:
+                return f"❌ Error no recuperable para {record['filename']}: {record['error']}"
+            return f"❌ Falló descarga después de {record['attempts']} intentos: {record['filename']}"
+        if event == 'batch_finished':
+            title = "\n⏹️ Descarga cancelada" if record['cancelled'] else "\n🎉 ¡Descarga completada!"
+            return f"{title}\n✅ Exitosos: {record['completed']}\n❌ Fallidos: {record['failed']}"
+        
+        template = self.MESSAGES.get(event)
+        return template.format(**record) if template else None
+    
+    def __call__(self, record: Dict[str, Any]):
+        message = self.render(record)
+        if message is not None:
+            stream = self.stream or sys.stdout
+            # One write per line so messages from concurrent workers do not run together
+            with self._lock:
+                stream.write(message + '\n')
+                stream.flush()
+
+
+class JSONLinesSink:
+    """Writes every event as one JSON line to a file or an open text stream"""
+    
+    def __init__(self, target: Union[str, Path, TextIO]):
+        """
+        Args:
+            target: File path (appended to) or a text stream such as sys.stdout
+        """
+        if isinstance(target, (str, Path)):
+            self.stream = open(target, 'a', encoding='utf-8')
+            self._owns_stream = True
+        else:
+            self.stream = target
+            self._owns_stream = False
+        self._lock = threading.Lock()
+    
+    def __call__(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+    
+    def close(self):
+        """Close the file if this sink opened it"""
+        if self._owns_stream:
+            self.stream.close()
+
+
+class MemorySink:
+    """Keeps events in a list (tests and benchmarks)"""
+    
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+    
+    def __call__(self, record: Dict[str, Any]):
+        with self._lock:
+            self.events.append(record)
+    
+    def of_type(self, *events: str) -> List[Dict[str, Any]]:
+        """Recorded events with one of the given names"""
+        with self._lock:
+            return [record for record in self.events if record['event'] in events]
+    
+    def clear(self):
+        """Forget the recorded events"""
+        with self._lock:
+            self.events = []
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+class TransferMetrics:
+    """Aggregates the events of one batch into the 'metrics' section of its result"""
+    
+    # Upper bounds (MB/s) of the throughput histogram buckets; the last bucket is open
+    THROUGHPUT_BUCKETS = (1, 5, 20, 100)
+    TIMINGS = ('ttfb_s', 'transfer_s', 'verify_s', 'total_s')
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.completed: List[Dict[str, Any]] = []
+        self.retries: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+    
+    def __call__(self, record: Dict[str, Any]):
+        event = record['event']
+        with self._lock:
+            if event == 'file_completed':
+                self.completed.append(record)
+            elif event == 'retry':
+                self.retries[record['reason']] = self.retries.get(record['reason'], 0) + 1
+            elif event == 'file_failed':
+                self.failures[record['reason']] = self.failures.get(record['reason'], 0) + 1
+    
+    @classmethod
+    def _histogram(cls, rates: List[float]) -> Dict[str, int]:
+        """Count of files per throughput bucket ('0-1', '1-5', ... '>=100')"""
+        bounds = (0,) + cls.THROUGHPUT_BUCKETS
+        labels = [f"{lower}-{upper}" for lower, upper in zip(bounds, bounds[1:])] + [f">={bounds[-1]}"]
+        histogram = dict.fromkeys(labels, 0)
+        for rate in rates:
+            index = next((i for i, upper in enumerate(cls.THROUGHPUT_BUCKETS) if rate < upper), len(labels) - 1)
+            histogram[labels[index]] += 1
+        return histogram
+    
+    def summary(self) -> Dict[str, Any]:
+        """Totals, timing percentiles (seconds) and a throughput histogram (MB/s) per file"""
+        with self._lock:
+            completed = list(self.completed)
+            retries = dict(self.retries)
+            failures = dict(self.failures)
+        
+        summary: Dict[str, Any] = {
+            'files': len(completed),
+            'bytes': sum(record.get('bytes', 0) for record in completed),
+            'resumed_bytes': sum(record.get('resumed_from', 0) for record in completed),
+            'attempts': sum(record.get('attempts', 1) for record in completed),
+            'retries': sum(retries.values()),
+            'retry_reasons': retries,
+            'failures': failures
+        }
+        for name in self.TIMINGS:
+            values = [record[name] for record in completed if record.get(name) is not None]
+            if values:
+                summary[name] = {'p50': percentile(values, 0.5), 'p95': percentile(values, 0.95),
+                                 'max': max(values)}
+        
+        rates = [record['mb_per_s'] for record in completed if record.get('mb_per_s') is not None]
+        summary['throughput_mb_s'] = {'p50': percentile(rates, 0.5), 'p95': percentile(rates, 0.95)} if rates else {}
+        summary['throughput_histogram'] = self._histogram(rates)
+        return summary
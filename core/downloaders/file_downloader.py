@@ -2,27 +2,79 @@
 Single File Downloader component
 """
 
+import http.client
+import json
+import os
+import threading
 import time
 import requests
+import urllib3
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any
-from tqdm import tqdm
+from typing import Optional, Callable, Dict, Any, BinaryIO, Tuple
 
+from ..http_session import SessionFactory, DEFAULT_USER_AGENT
 from ..utils import FileUtils
+from .bandwidth import BandwidthLimiter
+from .cancellation import CancellationToken
+from .events import EventLog
+from .integrity import HashIndex, IntegrityError, StreamHasher
+from .retry_policy import DownloadFailed, RetryPolicy
+from .segmented_downloader import SegmentedDownloader
 
 
 class FileDownloader:
-    """Handles downloading of individual files with retry logic"""
+    """Handles downloading of individual files with retry logic and resume support"""
     
-    def __init__(self, session: Optional[requests.Session] = None, max_retries: int = 3):
-        self.session = session or requests.Session()
-        self.max_retries = max_retries
+    PART_SUFFIX = '.part'
+    META_SUFFIX = '.part.json'
+    # Read sizes adapt so that one read takes about this long
+    TARGET_READ_TIME = 0.05
+    # Byte ranges, Content-Length and the size check all refer to the unencoded file
+    TRANSFER_HEADERS = {'Accept-Encoding': 'identity'}
+    
+    def __init__(self, session: Optional[requests.Session] = None, max_retries: int = 3,
+                 segments: int = 1, min_segment_size: int = 8 * 1024 * 1024,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 chunk_size: int = 64 * 1024, max_chunk_size: int = 1024 * 1024,
+                 progress_interval: float = 0.1, retry_policy: Optional[RetryPolicy] = None,
+                 events: Optional[EventLog] = None):
+        """
+        Args:
+            retry_policy: Backoff and error classification between attempts (max_retries if omitted)
+            events: Where per-file events and timings go (printed to the console if omitted)
+            chunk_size: Smallest (and first) read size
+            max_chunk_size: Largest read size on fast links (size of the reusable buffer)
+            progress_interval: Minimum seconds between progress callbacks (0 = every read)
+        """
+        self.session = session or SessionFactory.create_session(max_retries=max_retries)
+        # File GETs skip the connection-level retries of the shared session; retry_policy handles them
+        self.transfer_session = SessionFactory.create_transfer_session(self.session)
+        self.retry_policy = retry_policy or RetryPolicy(max_retries)
+        self.max_retries = self.retry_policy.max_retries
+        self.chunk_size = max(1, chunk_size)
+        self.max_chunk_size = max(self.chunk_size, max_chunk_size)
+        self.progress_interval = progress_interval
+        self.events = events or EventLog()
+        # Shared by every transfer (and segment) of this downloader; unlimited by default
+        self.bandwidth = bandwidth or BandwidthLimiter()
+        
+        # Optional multi-connection mode for large files (disabled with segments=1)
+        self.segmented_downloader = SegmentedDownloader(self.transfer_session, segments, min_segment_size,
+                                                        bandwidth=self.bandwidth)
+        
+        # When set to a dict, the validators of every completed download are stored by URL
+        self.validators: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # Expected checksums (url -> (algorithm, hex digest)) verified before a download is kept
+        self.checksums: Dict[str, Tuple[str, str]] = {}
+        # SHA-256 of completed downloads is kept per folder until flush_hashes()
+        self.record_hashes = True
+        self._hash_indexes: Dict[Path, HashIndex] = {}
+        self._hash_lock = threading.Lock()
         
         # Set default headers if session doesn't have them
         if 'User-Agent' not in self.session.headers:
-            self.session.headers.update({
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            })
+            self.session.headers.update({'User-Agent': DEFAULT_USER_AGENT})
     
     def get_file_info(self, url: str) -> Dict[str, Any]:
         """Get file information without downloading"""
@@ -37,70 +89,431 @@ class FileDownloader:
                 'size': size,
                 'size_formatted': FileUtils.format_file_size(size),
                 'content_type': content_type,
-                'url': url
+                'url': url,
+                'accept_ranges': response.headers.get('accept-ranges', '').lower() == 'bytes',
+                'etag': response.headers.get('etag'),
+                'last_modified': response.headers.get('last-modified')
             }
         except requests.RequestException:
-            return {'size': 0, 'size_formatted': '0 B', 'content_type': 'unknown', 'url': url}
+            return {'size': 0, 'size_formatted': '0 B', 'content_type': 'unknown', 'url': url,
+                    'accept_ranges': False, 'etag': None, 'last_modified': None}
     
-    def download_file(self, filename: str, url: str, download_path: Path, 
-                     progress_callback: Optional[Callable] = None) -> bool:
-        """Download a single file with retry logic and progress tracking"""
+    def download_file(self, filename: str, url: str, download_path: Path,
+                     progress_callback: Optional[Callable] = None,
+                     cancel_token: Optional[CancellationToken] = None,
+                     overwrite: bool = False) -> bool:
+        """
+        Download a single file with retry logic and progress tracking
+        With a cancel_token the transfer pauses/stops between chunks; stopping raises
+        DownloadCancelled and leaves the .part file for a later resume.
+        With overwrite=True an existing file is kept until the new copy replaces it.
+        Raises DownloadFailed when the retries run out or the error is not worth retrying.
+        """
         file_path = download_path / filename
         
-        # Check if file already exists
-        if file_path.exists():
-            print(f"✅ Archivo ya existe: {filename}")
+        # Completed files only appear through the final rename, so they are never partial
+        if file_path.exists() and not overwrite:
+            self.events.emit('file_exists', filename=filename, url=url)
             return True
         
         # Create directory if it doesn't exist
-        download_path.mkdir(parents=True, exist_ok=True)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        for attempt in range(self.max_retries):
+        started = time.perf_counter()
+        for attempt in range(1, self.retry_policy.max_retries + 1):
+            timings: Dict[str, Any] = {}
             try:
-                return self._download_file_attempt(filename, url, file_path, progress_callback)
+                self._download_file_attempt(filename, url, file_path, progress_callback, cancel_token, timings)
             except requests.RequestException as e:
-                if attempt == self.max_retries - 1:
-                    print(f"❌ Falló descarga después de {self.max_retries} intentos: {filename}")
-                    raise Exception(f"Failed to download {filename} after {self.max_retries} attempts: {e}")
+                # The .part file stays, so the next attempt resumes from the last byte received
+                delay = self._attempt_failed(filename, url, attempt, e)
+                if cancel_token:
+                    cancel_token.sleep(delay)
                 else:
-                    print(f"⚠️  Intento {attempt + 1} falló para {filename}, reintentando...")
-                    time.sleep(1)  # Wait before retry
+                    time.sleep(delay)
+            else:
+                self._attempt_succeeded(filename, url, attempt, started, timings)
+                return True
         
         return False
     
-    def _download_file_attempt(self, filename: str, url: str, file_path: Path,
-                              progress_callback: Optional[Callable] = None) -> bool:
-        """Single download attempt"""
-        response = self.session.get(url, stream=True, timeout=30)
-        response.raise_for_status()
+    def _attempt_failed(self, filename: str, url: str, attempt: int, error: Exception) -> float:
+        """
+        Record a failed attempt and get the wait before the next one (shared with the async engine)
+        Raises DownloadFailed when the error is not worth retrying or the attempts ran out
+        """
+        policy = self.retry_policy
+        reason = policy.classify(error)
+        if not policy.is_retryable(error):
+            policy.record('fatal')
+            self.events.emit('download_failed', filename=filename, url=url, attempts=attempt,
+                             reason=reason, fatal=True, error=str(error))
+            raise DownloadFailed(f"Failed to download {filename}: {error}", retryable=False,
+                                 attempts=attempt, reason=reason)
+        if attempt >= policy.max_retries:
+            self.events.emit('download_failed', filename=filename, url=url, attempts=attempt,
+                             reason=reason, fatal=False, error=str(error))
+            raise DownloadFailed(f"Failed to download {filename} after {attempt} attempts: {error}",
+                                 retryable=True, attempts=attempt, reason=reason)
+        
+        delay = policy.get_delay(attempt, error)
+        policy.record_retry(error, delay)
+        self.events.emit('retry', filename=filename, url=url, attempt=attempt, reason=reason,
+                         delay=delay, error=str(error))
+        return delay
+    
+    def _attempt_succeeded(self, filename: str, url: str, attempt: int, started: float, timings: Dict[str, Any]):
+        """Report a completed file with the timings of its last attempt"""
+        transfer_s = timings.get('transfer_s')
+        self.events.emit('file_completed', filename=filename, url=url, attempts=attempt,
+                         total_s=time.perf_counter() - started,
+                         mb_per_s=timings['bytes'] / 1024 ** 2 / transfer_s if transfer_s else None,
+                         **timings)
+    
+    @classmethod
+    def get_part_path(cls, file_path: Path) -> Path:
+        """Get the path of the partial download sidecar for a file"""
+        return file_path.with_name(file_path.name + cls.PART_SUFFIX)
+    
+    @classmethod
+    def get_meta_path(cls, file_path: Path) -> Path:
+        """Get the path of the resume metadata for a file"""
+        return file_path.with_name(file_path.name + cls.META_SUFFIX)
+    
+    @classmethod
+    def _load_part_meta(cls, file_path: Path, url: str) -> Dict[str, Any]:
+        """Load resume metadata, ignoring it if it belongs to another URL"""
+        meta_path = cls.get_meta_path(file_path)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+        return meta if meta.get('url') == url else {}
+    
+    @classmethod
+    def _save_part_meta(cls, file_path: Path, url: str, response: requests.Response, total_size: int):
+        """Store the validators needed to safely resume this download later"""
+        meta = {
+            'url': url,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'content_length': total_size
+        }
+        with open(cls.get_meta_path(file_path), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    
+    @classmethod
+    def _discard_partial(cls, file_path: Path):
+        """Remove partial data that can no longer be resumed"""
+        for path in (cls.get_part_path(file_path), cls.get_meta_path(file_path)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    @classmethod
+    def _finalize(cls, file_path: Path):
+        """Atomically move a completed partial download to its final name"""
+        os.replace(cls.get_part_path(file_path), file_path)
+        try:
+            cls.get_meta_path(file_path).unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _new_hasher(self, url: str) -> StreamHasher:
+        """Hasher for SHA-256 plus the algorithm of the expected checksum, if any"""
+        algorithms = {'sha256'}
+        if url in self.checksums:
+            algorithms.add(self.checksums[url][0])
+        return StreamHasher(algorithms)
+    
+    def _complete(self, file_path: Path, url: str, hasher: StreamHasher, total_size: int = 0):
+        """
+        Verify a finished .part file and move it to its final name
+        Raises IntegrityError after discarding the partial data if the size or the expected
+        checksum does not match, so the next attempt starts over.
+        """
+        if total_size and hasher.size != total_size:
+            self._discard_partial(file_path)
+            raise IntegrityError(f"Got {hasher.size} of {total_size} bytes for {file_path.name}")
+        
+        expected = self.checksums.get(url)
+        if expected:
+            algorithm, digest = expected
+            actual = hasher.hexdigest(algorithm)
+            if actual != digest:
+                self._discard_partial(file_path)
+                self.events.emit('checksum_mismatch', filename=file_path.name, url=url, algorithm=algorithm)
+                raise IntegrityError(f"{algorithm} mismatch for {file_path.name}: expected {digest}, got {actual}")
+            self.events.emit('checksum_verified', filename=file_path.name, url=url, algorithm=algorithm)
+        
+        sha256 = hasher.hexdigest('sha256')
+        if self.validators is not None:
+            meta = self._load_part_meta(file_path, url)
+            self.validators[url] = {'etag': meta.get('etag'), 'last_modified': meta.get('last_modified'),
+                                    'sha256': sha256}
+        self._finalize(file_path)
+        
+        if self.record_hashes:
+            self._get_hash_index(file_path.parent).set(file_path.name, sha256)
+    
+    def _get_hash_index(self, folder: Path) -> HashIndex:
+        """Get the (cached) hash index of a download folder"""
+        with self._hash_lock:
+            index = self._hash_indexes.get(folder)
+            if index is None:
+                index = self._hash_indexes[folder] = HashIndex.load(folder)
+            return index
+    
+    def flush_hashes(self):
+        """Write the hash indexes of the folders downloaded into since the last flush"""
+        with self._hash_lock:
+            indexes = list(self._hash_indexes.values())
+            self._hash_indexes.clear()
+        
+        for index in indexes:
+            try:
+                index.save()
+            except OSError as e:
+                self.events.emit('hash_index_error', folder=str(index.folder), error=str(e))
+    
+    @staticmethod
+    def _parse_content_range(value: str):
+        """Parse 'bytes start-end/total' into (start, total); total is 0 if unknown"""
+        try:
+            _, _, spec = value.partition(' ')
+            byte_range, _, total = spec.partition('/')
+            start = int(byte_range.split('-')[0])
+            return start, int(total) if total.isdigit() else 0
+        except (ValueError, IndexError):
+            return None, 0
+    
+    @staticmethod
+    def _get_reader(response: requests.Response) -> Callable[[memoryview], int]:
+        """
+        Pick the cheapest way to read the body into a buffer
+        Unencoded bodies are read straight from the socket (http.client readinto, no copies);
+        gzip/deflate bodies go through urllib3, which decodes them
+        """
+        raw = response.raw
+        fp = getattr(raw, '_fp', None)
+        encoding = response.headers.get('content-encoding', 'identity').lower()
+        if encoding == 'identity' and isinstance(fp, http.client.HTTPResponse):
+            return fp.readinto
+        
+        def read_decoded(view: memoryview) -> int:
+            data = raw.read(len(view), decode_content=True)
+            view[:len(data)] = data
+            return len(data)
+        
+        return read_decoded
+    
+    def _stream_to_file(self, response: requests.Response, file: BinaryIO, url: str, downloaded: int,
+                        report: Callable[[int], None],
+                        cancel_token: Optional[CancellationToken] = None,
+                        hasher: Optional[StreamHasher] = None) -> int:
+        """
+        Copy the response body into file through one reusable buffer
+        The read size doubles while reads (bandwidth waits included) finish quickly and halves
+        when they stall, so slow or throttled links still report progress and notice
+        cancellation often. Progress is reported at most every progress_interval seconds.
+        Every chunk also goes through hasher while it is still in memory.
+        Returns: Bytes in the file (downloaded + body)
+        """
+        buffer = memoryview(bytearray(self.max_chunk_size))
+        read_into = self._get_reader(response)
+        chunk_size = self.chunk_size
+        last_report = time.monotonic()
+        reported = downloaded
+        
+        while True:
+            if cancel_token:
+                cancel_token.checkpoint()
+            started = time.monotonic()
+            try:
+                count = read_into(buffer[:chunk_size])
+            except (http.client.HTTPException, urllib3.exceptions.HTTPError, OSError) as e:
+                raise requests.ConnectionError(f"Connection error while reading {url}: {e!r}")
+            if not count:
+                break
+            
+            self.bandwidth.consume(url, count, cancel_token)
+            file.write(buffer[:count])
+            if hasher is not None:
+                hasher.update(buffer[:count])
+            downloaded += count
+            
+            now = time.monotonic()
+            elapsed = now - started
+            if count == chunk_size and elapsed < self.TARGET_READ_TIME / 2:
+                chunk_size = min(chunk_size * 2, self.max_chunk_size)
+            elif elapsed > self.TARGET_READ_TIME * 2:
+                chunk_size = max(chunk_size // 2, self.chunk_size)
+            
+            if now - last_report >= self.progress_interval:
+                report(downloaded)
+                reported = downloaded
+                last_report = now
         
-        total_size = int(response.headers.get('content-length', 0))
-        
-        # Create progress bar for CLI or use callback for GUI
-        if progress_callback:
-            # GUI mode - use callback
-            downloaded = 0
-            with open(file_path, 'wb') as file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        file.write(chunk)
-                        downloaded += len(chunk)
-                        progress_callback(downloaded, total_size, filename)
+        if downloaded != reported:
+            report(downloaded)
+        # The body was read past urllib3; hand the (idle) connection back to the pool
+        response.raw.release_conn()
+        return downloaded
+    
+    def _prepare_resume(self, file_path: Path, url: str) -> Tuple[Dict[str, Any], int, Dict[str, str]]:
+        """
+        Work out how a file GET can continue an existing .part file (shared with the async engine)
+        Returns: (resume metadata, bytes already in the .part file, request headers)
+        """
+        meta = self._load_part_meta(file_path, url)
+        if meta.get('segments'):
+            # A preallocated segmented .part cannot be continued as a single stream
+            meta = {}
+        
+        part_path = self.get_part_path(file_path)
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        headers = dict(self.TRANSFER_HEADERS)
+        if resume_from > 0 and meta:
+            headers['Range'] = f'bytes={resume_from}-'
+            # If-Range makes the server send the full file when it changed since the first attempt
+            validator = meta.get('etag') or meta.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
         else:
-            # CLI mode - use tqdm
-            with tqdm(
-                total=total_size,
-                unit='B',
-                unit_scale=True,
-                unit_divisor=1024,
-                desc=filename[:50],
-                leave=False
-            ) as pbar:
-                with open(file_path, 'wb') as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            file.write(chunk)
-                            pbar.update(len(chunk))
-        
-        print(f"✅ Descargado: {filename}")
-        return True 
\ No newline at end of file
+            resume_from = 0
+        return meta, resume_from, headers
+    
+    def _accept_response(self, filename: str, file_path: Path, url: str, meta: Dict[str, Any],
+                         resume_from: int, status: int, response) -> Tuple[Optional[str], int, int, StreamHasher]:
+        """
+        Check the response to a _prepare_resume request against the .part file
+        response may come from requests or the async client (headers and raise_for_status are used).
+        Raises requests.RequestException after discarding the .part file when it cannot be continued.
+        Returns: (open mode for the .part file or None if it is already complete,
+                  bytes kept from the .part file, expected size (0 if unknown), hasher fed with the kept bytes)
+        """
+        part_path = self.get_part_path(file_path)
+        hasher = self._new_hasher(url)
+        
+        if status == 416 and resume_from:
+            # Nothing left to fetch if the partial file already has every byte
+            if meta.get('content_length') == resume_from:
+                hasher.update_from_file(part_path)
+                return None, resume_from, resume_from, hasher
+            self._discard_partial(file_path)
+            raise requests.RequestException(f"Cannot resume {filename}: range not satisfiable")
+        
+        response.raise_for_status()
+        
+        if status == 206:
+            start, total_size = self._parse_content_range(response.headers.get('content-range', ''))
+            expected_size = meta.get('content_length')
+            etag = response.headers.get('etag')
+            if (start != resume_from
+                    or (expected_size and total_size and total_size != expected_size)
+                    or (etag and meta.get('etag') and etag != meta.get('etag'))):
+                self._discard_partial(file_path)
+                raise requests.RequestException(f"Remote file changed, restarting {filename}")
+            # The digests cover the whole file, so the resumed part is read back once
+            hasher.update_from_file(part_path)
+            return 'ab', resume_from, total_size or expected_size or 0, hasher
+        
+        # Full response: either a fresh download or the server refused to resume
+        total_size = int(response.headers.get('content-length', 0) or 0)
+        if response.headers.get('content-encoding', 'identity').lower() != 'identity':
+            # Sent compressed anyway: Content-Length counts encoded bytes, not the file
+            total_size = 0
+        self._save_part_meta(file_path, url, response, total_size)
+        return 'wb', 0, total_size, hasher
+    
+    def _download_file_attempt(self, filename: str, url: str, file_path: Path,
+                              progress_callback: Optional[Callable] = None,
+                              cancel_token: Optional[CancellationToken] = None,
+                              timings: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Single download attempt, resuming from an existing .part file when possible
+        timings receives the size, the bytes transferred and the seconds spent waiting for the
+        response headers (ttfb_s, which includes DNS and connect on a new connection),
+        streaming the body (transfer_s) and verifying/renaming the file (verify_s)
+        """
+        if timings is None:
+            timings = {}
+        part_path = self.get_part_path(file_path)
+        if cancel_token:
+            cancel_token.checkpoint()
+        
+        # Large files go through parallel byte ranges when the server supports them
+        if self.segmented_downloader.segments > 1:
+            file_info = self.get_file_info(url)
+            if self.segmented_downloader.can_segment(file_info):
+                started = time.perf_counter()
+                self.segmented_downloader.download(
+                    filename, url, part_path, self.get_meta_path(file_path), file_info,
+                    progress_callback, cancel_token
+                )
+                finished = time.perf_counter()
+                # Segments arrive out of order, so this path hashes the finished file
+                hasher = self._new_hasher(url)
+                hasher.update_from_file(part_path)
+                self._complete(file_path, url, hasher, file_info['size'])
+                timings.update(size=file_info['size'], bytes=file_info['size'], resumed_from=0, segmented=True,
+                               ttfb_s=None, transfer_s=finished - started,
+                               verify_s=time.perf_counter() - finished)
+                return True
+        
+        meta, resume_from, headers = self._prepare_resume(file_path, url)
+        requested = time.perf_counter()
+        response = self.transfer_session.get(url, stream=True, timeout=30, headers=headers)
+        headers_received = time.perf_counter()
+        
+        with response:
+            mode, resume_from, total_size, hasher = self._accept_response(
+                filename, file_path, url, meta, resume_from, response.status_code, response
+            )
+            downloaded = resume_from
+            
+            # Create progress bar for CLI or use callback for GUI (nothing to read if already complete)
+            if mode is None:
+                pass
+            elif progress_callback:
+                # GUI mode - use callback
+                with open(part_path, mode) as file:
+                    downloaded = self._stream_to_file(
+                        response, file, url, resume_from,
+                        lambda done: progress_callback(done, total_size, filename), cancel_token, hasher
+                    )
+            else:
+                # CLI mode - use tqdm (imported on first use; the GUI never needs it)
+                from tqdm import tqdm
+                
+                with tqdm(
+                    total=total_size,
+                    initial=resume_from,
+                    unit='B',
+                    unit_scale=True,
+                    unit_divisor=1024,
+                    desc=filename[:50],
+                    leave=False
+                ) as pbar:
+                    with open(part_path, mode) as file:
+                        downloaded = self._stream_to_file(
+                            response, file, url, resume_from,
+                            lambda done: pbar.update(done - pbar.n), cancel_token, hasher
+                        )
+        
+        # Keep the .part file for the next attempt if the stream ended early
+        if total_size and downloaded < total_size:
+            raise requests.ConnectionError(
+                f"Connection closed after {downloaded} of {total_size} bytes for {filename}"
+            )
+        
+        streamed = time.perf_counter()
+        self._complete(file_path, url, hasher, total_size)
+        timings.update(size=total_size or downloaded, bytes=downloaded - resume_from, resumed_from=resume_from,
+                       segmented=False, ttfb_s=headers_received - requested,
+                       transfer_s=streamed - headers_received if mode else None,
+                       verify_s=time.perf_counter() - streamed)
+        return True
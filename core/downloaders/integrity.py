@@ -0,0 +1,238 @@
+"""
+Download integrity: streaming hashes, checksum manifests and a persistent hash index
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import urllib.parse
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+
+class IntegrityError(requests.RequestException):
+    """A completed download does not match its advertised size or checksum"""
+
+
+class StreamHasher:
+    """Feeds every byte of a download to one or more digests while it is written"""
+    
+    ALGORITHMS = ('sha256', 'sha1', 'md5', 'crc32')
+    
+    def __init__(self, algorithms: Iterable[str] = ('sha256',)):
+        algorithms = set(algorithms)
+        self._digests = {name: hashlib.new(name) for name in algorithms if name != 'crc32'}
+        self._crc32 = 0 if 'crc32' in algorithms else None
+        self.size = 0
+    
+    def update(self, data):
+        """Add a chunk (bytes or memoryview)"""
+        for digest in self._digests.values():
+            digest.update(data)
+        if self._crc32 is not None:
+            self._crc32 = zlib.crc32(data, self._crc32)
+        self.size += len(data)
+    
+    def update_from_file(self, path: Path, chunk_size: int = 1024 * 1024):
+        """Add the content of a file already on disk (the resumed part of a download)"""
+        buffer = memoryview(bytearray(chunk_size))
+        with open(path, 'rb') as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                self.update(buffer[:count])
+    
+    def hexdigest(self, algorithm: str) -> str:
+        """Hex digest of one of the algorithms this hasher was created with"""
+        if algorithm == 'crc32':
+            return f"{self._crc32:08x}"
+        return self._digests[algorithm].hexdigest()
+    
+    @classmethod
+    def hash_file(cls, path: Path, algorithm: str = 'sha256') -> str:
+        """Hex digest of a local file"""
+        hasher = cls((algorithm,))
+        hasher.update_from_file(path)
+        return hasher.hexdigest(algorithm)
+
+
+class ChecksumManifest:
+    """Parses SFV, sha256sum/md5sum and BSD-style checksum files published next to the downloads"""
+    
+    EXTENSIONS = {'.sfv': 'crc32', '.sha256': 'sha256', '.sha1': 'sha1', '.md5': 'md5'}
+    NAMES = {'sha256sums': 'sha256', 'sha1sums': 'sha1', 'md5sums': 'md5'}
+    # Checksum files are a few KB; anything bigger is not one
+    MAX_SIZE = 1024 * 1024
+    
+    _BSD_LINE = re.compile(r'^(?:SHA256|SHA1|MD5) ?\((.+)\) ?= ?([0-9A-Fa-f]+)$')
+    _DIGEST_LENGTHS = {'crc32': 8, 'sha256': 64, 'sha1': 40, 'md5': 32}
+    
+    @classmethod
+    def algorithm_for(cls, filename: str) -> Optional[str]:
+        """Get the algorithm of a checksum file from its name (None if it is not one)"""
+        lowered = filename.lower()
+        if lowered in cls.NAMES:
+            return cls.NAMES[lowered]
+        return cls.EXTENSIONS.get(os.path.splitext(lowered)[1])
+    
+    @staticmethod
+    def group_by_folder(file_urls: Iterable[str]) -> Dict[str, List[str]]:
+        """Group file URLs by the remote folder whose checksum files may list them"""
+        folders: Dict[str, List[str]] = {}
+        for file_url in file_urls:
+            folders.setdefault(file_url.rsplit('/', 1)[0] + '/', []).append(file_url)
+        return folders
+    
+    @staticmethod
+    def digest_for(checksums: Dict[str, str], file_url: str) -> Optional[str]:
+        """Look up a file URL in the result of parse (entries are keyed by file name)"""
+        return checksums.get(urllib.parse.unquote(file_url.rsplit('/', 1)[1]))
+    
+    @classmethod
+    def parse(cls, text: str, algorithm: str, filename: str = '') -> Dict[str, str]:
+        """
+        Parse a checksum file
+        Args:
+            text: File content
+            algorithm: Algorithm from algorithm_for
+            filename: Name of the checksum file; a bare digest in 'video.mkv.sha256' belongs to 'video.mkv'
+        Returns: Dict of {filename: lowercase hex digest}
+        """
+        digest_length = cls._DIGEST_LENGTHS[algorithm]
+        checksums = {}
+        for line in text.splitlines():
+            line = line.strip()
+            if not line or line.startswith((';', '#')):
+                continue
+            
+            match = cls._BSD_LINE.match(line)
+            if match:
+                name, digest = match.groups()
+            elif algorithm == 'crc32':
+                # SFV: "<name> <crc32>", the name may contain spaces
+                name, _, digest = line.rpartition(' ')
+            else:
+                # sha256sum: "<digest>  <name>" or "<digest> *<name>" (binary mode)
+                digest, _, name = line.partition(' ')
+                name = name.lstrip(' ').lstrip('*')
+                if not name and filename:
+                    name = os.path.splitext(filename)[0]
+            
+            name = name.strip().replace('\\', '/').split('/')[-1]
+            if name and len(digest) == digest_length and all(c in '0123456789abcdefABCDEF' for c in digest):
+                checksums[name] = digest.lower()
+        return checksums
+    
+    @classmethod
+    def fetch(cls, session: requests.Session, url: str, filename: str, algorithm: str,
+              timeout: float = 15) -> Dict[str, str]:
+        """Download and parse a remote checksum file (empty if it is too big to be one)"""
+        with session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            content = response.raw.read(cls.MAX_SIZE + 1, decode_content=True)
+        if len(content) > cls.MAX_SIZE:
+            return {}
+        return cls.parse(content.decode('utf-8', errors='replace'), algorithm, filename)
+
+
+class HashIndex:
+    """
+    SHA-256 of the files downloaded into one folder, stored next to them
+    A record is only trusted while the file keeps the size and mtime it had when hashed,
+    so mirrors and duplicate checks can skip re-reading unchanged files.
+    """
+    
+    FILENAME = '.uclv-hashes.json'
+    VERSION = 1
+    
+    def __init__(self, folder: Path, files: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.folder = Path(folder)
+        # name -> sha256, size, mtime_ns, hashed_at
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+        self.dirty = False
+        self._lock = threading.Lock()
+    
+    @property
+    def path(self) -> Path:
+        """Location of the index file"""
+        return self.folder / self.FILENAME
+    
+    @classmethod
+    def load(cls, folder: Path) -> 'HashIndex':
+        """Load the index of a folder (empty if there is none yet)"""
+        index = cls(folder)
+        try:
+            with open(index.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        
+        if data.get('version') == cls.VERSION:
+            index.files = data.get('files', {})
+        return index
+    
+    @classmethod
+    def lookup(cls, path: Path) -> Optional[str]:
+        """SHA-256 of a file from the index of its folder, if still current"""
+        path = Path(path)
+        return cls.load(path.parent).get(path.name)
+    
+    def get(self, name: str) -> Optional[str]:
+        """SHA-256 of a file in this folder, or None if unknown or modified since"""
+        with self._lock:
+            record = self.files.get(name)
+        if record is None:
+            return None
+        try:
+            stat = (self.folder / name).stat()
+        except OSError:
+            return None
+        if stat.st_size != record.get('size') or stat.st_mtime_ns != record.get('mtime_ns'):
+            return None
+        return record.get('sha256')
+    
+    def set(self, name: str, sha256: str):
+        """Record the hash of a file that is already in place"""
+        stat = (self.folder / name).stat()
+        with self._lock:
+            self.files[name] = {
+                'sha256': sha256,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hashed_at': time.time()
+            }
+            self.dirty = True
+    
+    def discard(self, name: str):
+        """Forget a file that was removed from the folder"""
+        with self._lock:
+            if self.files.pop(name, None) is not None:
+                self.dirty = True
+    
+    def save(self):
+        """Atomically write the index if anything changed"""
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {'version': self.VERSION, 'files': dict(self.files)}
+            self.dirty = False
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.uclv-hashes', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,103 @@
+"""
+On-disk cache for parsed directory listings
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class ListingCache:
+    """Caches parsed listing entries per URL together with their HTTP validators"""
+    
+    def __init__(self, cache_dir: Optional[Path] = None, persist: bool = True):
+        if cache_dir is None:
+            base_dir = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+            cache_dir = Path(base_dir) / 'ucvl-downloader' / 'listings'
+        self.cache_dir = Path(cache_dir)
+        self.persist = persist
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def _path_for(self, url: str) -> Path:
+        """Get the cache file for a URL"""
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get the cached record for a URL (entries, etag, last_modified, fetched_at)"""
+        with self._lock:
+            record = self._memory.get(url)
+        if record is not None or not self.persist:
+            return record
+        
+        try:
+            with open(self._path_for(url), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if record.get('url') != url:
+            return None
+        
+        with self._lock:
+            self._memory[url] = record
+        return record
+    
+    def put(self, url: str, entries: List[Dict[str, Any]],
+            etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store the parsed entries of a listing"""
+        record = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'entries': entries
+        }
+        with self._lock:
+            self._memory[url] = record
+        
+        if self.persist:
+            self._write(url, record)
+    
+    def touch(self, url: str):
+        """Mark a cached listing as freshly revalidated"""
+        record = self.get(url)
+        if record is not None:
+            record['fetched_at'] = time.time()
+    
+    def _write(self, url: str, record: Dict[str, Any]):
+        """Atomically write a record to disk (the cache is best effort)"""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self._path_for(url))
+        except OSError:
+            pass
+    
+    def invalidate(self, url: str):
+        """Drop a single listing from the cache"""
+        with self._lock:
+            self._memory.pop(url, None)
+        try:
+            self._path_for(url).unlink()
+        except OSError:
+            pass
+    
+    def clear(self):
+        """Drop every cached listing"""
+        with self._lock:
+            self._memory.clear()
+        if self.persist and self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
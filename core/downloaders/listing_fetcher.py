@@ -0,0 +1,147 @@
+"""
+Listing Fetcher for autoindex directory pages
+"""
+
+import codecs
+import threading
+import requests
+from typing import List, Dict, Any, Optional
+
+from ..utils import URLUtils, FileUtils
+from .autoindex_parser import AutoindexParser
+from .listing_cache import ListingCache
+
+
+class ListingFetcher:
+    """Fetches a directory listing page and parses its entries"""
+    
+    def __init__(self, session: requests.Session, timeout: float = 15,
+                 cache: Optional[ListingCache] = None):
+        self.session = session
+        self.timeout = timeout
+        self.cache = cache
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0}
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, key: str):
+        """Increment a cache statistic"""
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def fetch(self, url: str, revalidate: bool = True) -> List[Dict[str, Any]]:
+        """
+        Fetch and parse the listing of a remote directory
+        Args:
+            url: Directory URL
+            revalidate: Ask the server whether a cached listing is still current;
+                        with False a cached listing is returned without any request
+        Returns: List of entry dicts with name, url, type and is_dir
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached is not None and not revalidate:
+            self._count('hits')
+            return cached['entries']
+        
+        headers = {}
+        if cached is not None:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        
+        try:
+            with self.session.get(url, timeout=self.timeout, headers=headers, stream=True) as response:
+                if response.status_code == 304 and cached is not None:
+                    self._count('revalidated')
+                    self.cache.touch(url)
+                    return cached['entries']
+                response.raise_for_status()
+                entries = self._parse_stream(response, url)
+        except requests.RequestException as e:
+            raise Exception(f"Error accessing URL: {e}")
+        
+        self._count('misses')
+        
+        if self.cache is not None:
+            self.cache.put(url, entries,
+                           response.headers.get('etag'),
+                           response.headers.get('last-modified'))
+        
+        return entries
+    
+    def _parse_stream(self, response: requests.Response, base_url: str) -> List[Dict[str, Any]]:
+        """Feed the autoindex parser while the page is still arriving"""
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        parser = AutoindexParser()
+        raw_chunks = []
+        
+        try:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                raw_chunks.append(chunk)
+                parser.feed(decoder.decode(chunk))
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+        except requests.RequestException:
+            raise
+        except Exception:
+            # Malformed markup: let BeautifulSoup have a go at the whole page
+            raw_chunks.extend(response.iter_content(chunk_size=64 * 1024))
+            return self.parse_with_soup(b''.join(raw_chunks), base_url)
+        
+        return self._build_entries(base_url, parser.links)
+    
+    def parse(self, content: bytes, base_url: str, encoding: str = 'utf-8') -> List[Dict[str, Any]]:
+        """Parse listing HTML into entries (directories are flagged, not filtered)"""
+        try:
+            parser = AutoindexParser()
+            parser.feed(content.decode(encoding, errors='replace'))
+            parser.close()
+        except Exception:
+            return self.parse_with_soup(content, base_url)
+        
+        return self._build_entries(base_url, parser.links)
+    
+    def parse_with_soup(self, content: bytes, base_url: str) -> List[Dict[str, Any]]:
+        """Fallback parser for pages the autoindex parser cannot handle"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        links = [(link.get('href'), None, None, False) for link in soup.find_all('a', href=True)]
+        return self._build_entries(base_url, links)
+    
+    def _build_entries(self, base_url: str, links) -> List[Dict[str, Any]]:
+        """Turn (href, size, mtime, size_exact) links into entries, skipping sort and parent links"""
+        entries = []
+        
+        # Enlaces de archivos y carpetas
+        for href, size, mtime, size_exact in links:
+            if not href or href.startswith('?') or href == '../':
+                continue
+            
+            entry = self.build_entry(base_url, href, size, mtime, size_exact)
+            if self.is_safe_name(entry['name']):
+                entries.append(entry)
+        
+        return entries
+    
+    @staticmethod
+    def is_safe_name(name: str) -> bool:
+        """Check that an entry name is a single path component (no '', '.', '..' or separators)"""
+        return name not in ('', '.', '..') and '/' not in name and '\\' not in name
+    
+    @staticmethod
+    def build_entry(base_url: str, href: str, size: Optional[int] = None,
+                    mtime: Optional[str] = None, size_exact: bool = False) -> Dict[str, Any]:
+        """Build a listing entry from a link found in the page"""
+        is_dir = href.endswith('/')
+        filename = FileUtils.clean_filename(href.rstrip('/') if is_dir else href)
+        
+        return {
+            'name': filename,
+            'url': URLUtils.build_full_url(base_url, href),
+            'type': 'directory' if is_dir else FileUtils.get_file_type(filename),
+            'is_dir': is_dir,
+            'size': None if is_dir else size,
+            'size_exact': size_exact and not is_dir,
+            'mtime': mtime
+        }
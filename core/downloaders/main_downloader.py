@@ -4,32 +4,61 @@ Main downloader class for UCLV Downloader - Refactored version
 
 import requests
 from pathlib import Path
-from typing import List, Tuple, Optional, Callable, Dict, Any
-from bs4 import BeautifulSoup
+from typing import Iterable, Iterator, List, Tuple, Optional, Callable, Dict, Any
 
+from ..http_session import SessionFactory
 from ..utils import URLUtils, FileUtils
+from .bandwidth import BandwidthLimiter
 from .batch_downloader import BatchDownloader
-from .file_downloader import FileDownloader
+from .cancellation import CancellationToken
+from .directory_crawler import DirectoryCrawler
+from .events import EventLog
+from .integrity import ChecksumManifest
+from .listing_cache import ListingCache
+from .listing_fetcher import ListingFetcher
+from .retry_policy import RetryPolicy
+from .size_resolver import SizeResolver
 
 
 class UCLVDownloader:
     """Main downloader class with improved modularity using components"""
     
-    def __init__(self, download_delay: float = 0.5, max_retries: int = 3):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, download_delay: Optional[float] = None, max_retries: int = 3, max_workers: int = 4,
+                 segments: int = 1, min_segment_size: int = 8 * 1024 * 1024,
+                 session: Optional[requests.Session] = None,
+                 listing_cache: Optional[ListingCache] = None,
+                 bandwidth: Optional[BandwidthLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 events: Optional[EventLog] = None):
+        # One pooled session for listings, HEAD requests and every download worker/segment
+        if session is None:
+            pool_size = max(1, max_workers) * max(1, segments) + 2
+            session = SessionFactory.create_session(pool_size=pool_size, max_retries=max_retries)
+        self.session = session
+        
+        # One limiter for every transfer; pass the same instance to share a cap between downloaders
+        self.bandwidth = bandwidth or BandwidthLimiter()
         
         # Initialize components
-        self.batch_downloader = BatchDownloader(download_delay, max_retries)
-        self.file_downloader = FileDownloader(self.session, max_retries)
+        self.batch_downloader = BatchDownloader(download_delay, max_retries, max_workers,
+                                                segments, min_segment_size, self.session,
+                                                self.bandwidth, retry_policy, events)
+        self.file_downloader = self.batch_downloader.file_downloader
+        # Every engine message goes through here; attach sinks to log or collect them
+        self.events = self.batch_downloader.events
+        self.listing_cache = listing_cache if listing_cache is not None else ListingCache()
+        self.listing_fetcher = ListingFetcher(self.session, cache=self.listing_cache)
+        self.crawler = DirectoryCrawler(self.listing_fetcher, max_workers, self.events)
+        self.size_resolver = SizeResolver(self.file_downloader, max_workers)
         
         # Filtros configurables
         self.download_videos = True
         self.download_subtitles = True
         self.download_images = False
         self.download_info = False
+        
+        # Verify downloads against SFV/SHA256SUMS/.md5 files found next to them
+        self.verify_checksums = True
     
     def configure_downloads(self, videos=True, subtitles=True, images=False, info=False):
         """Configure which file types to download"""
@@ -38,39 +67,63 @@ class UCLVDownloader:
         self.download_images = images
         self.download_info = info
     
-    def get_file_list(self, url: str) -> List[Tuple[str, str, str]]:
+    def iter_file_list(self, url: str, recursive: bool = False, max_depth: int = 5,
+                       revalidate: bool = True,
+                       file_types: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, str, str]]:
+        """
+        Stream files from the webpage as they are discovered
+        With recursive=True subdirectories are crawled up to max_depth levels and
+        filenames are relative paths that mirror the remote tree.
+        With revalidate=False cached listings are filtered in memory without any request.
+        file_types overrides the types set with configure_downloads for this call only.
+        Yields: (filename, full_url, file_type)
+        """
+        for relative_path, entry in self.iter_entries(url, recursive, max_depth, revalidate, file_types):
+            yield (relative_path, entry['url'], entry['type'])
+    
+    def iter_entries(self, url: str, recursive: bool = False, max_depth: int = 5,
+                     revalidate: bool = True, file_types: Optional[Iterable[str]] = None,
+                     on_error: Optional[Callable[[str, Exception], None]] = None
+                     ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Stream (relative_path, listing entry) pairs for the accepted files
+        Entries keep the size and mtime reported by the listing; on_error receives the prefix of
+        every subfolder that could not be read during a recursive crawl
+        """
+        allowed = set(file_types) if file_types is not None else None
+        entry_filter = lambda entry: self._accept_entry(entry, allowed)
+        
+        # Depth 0 lists only the root, with the same entry checks as a recursive crawl
+        yield from self.crawler.crawl_entries(url, max_depth if recursive else 0, entry_filter,
+                                              revalidate, on_error)
+    
+    def get_file_list(self, url: str, recursive: bool = False, max_depth: int = 5,
+                      revalidate: bool = True,
+                      file_types: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str]]:
         """
         Get list of files from the webpage
         Returns: List of (filename, full_url, file_type)
         """
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-        except requests.RequestException as e:
-            raise Exception(f"Error accessing URL: {e}")
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        files = []
-        
-        # Buscar todos los enlaces de archivos
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            if not href or href.startswith('?') or href == '../':
-                continue
-            
-            # Obtener información del archivo
-            filename = FileUtils.clean_filename(href)
-            file_type = FileUtils.get_file_type(filename)
-            
-            # Aplicar filtros
-            if not self._should_download_file_type(file_type):
-                continue
-            
-            # Construir URL completa
-            full_url = URLUtils.build_full_url(url, href)
-            files.append((filename, full_url, file_type))
-        
-        return files
+        return list(self.iter_file_list(url, recursive, max_depth, revalidate, file_types))
+    
+    def _accept_entry(self, entry: Dict[str, Any], file_types: Optional[set] = None) -> bool:
+        """Filter a listing entry by type, keeping the size the listing reported for it"""
+        if file_types is not None:
+            if entry['type'] not in file_types:
+                return False
+        elif not self._should_download_file_type(entry['type']):
+            return False
+        self.size_resolver.remember(entry['url'], entry.get('size'), entry.get('size_exact', False))
+        return True
+    
+    def set_bandwidth_limit(self, limit: float, per_host_limit: Optional[float] = None):
+        """Change the bandwidth cap in bytes per second (0 = unlimited), also mid-download"""
+        self.bandwidth.set_limit(limit, per_host_limit)
+    
+    def get_enabled_file_types(self) -> set:
+        """Get the file types enabled with configure_downloads"""
+        return {file_type for file_type in ('video', 'subtitle', 'image', 'info')
+                if self._should_download_file_type(file_type)}
     
     def _should_download_file_type(self, file_type: str) -> bool:
         """Check if file type should be downloaded based on configuration"""
@@ -85,8 +138,42 @@ class UCLVDownloader:
         """Get file information without downloading"""
         return self.file_downloader.get_file_info(url)
     
+    def resolve_sizes(self, files: List[Tuple[str, str, str]],
+                      on_batch: Optional[Callable[[Dict[str, Tuple[int, bool]]], None]] = None,
+                      is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Tuple[int, bool]]:
+        """
+        Resolve file sizes from the listing or with concurrent HEAD requests
+        Returns: Dict of {url: (size, exact)} for every size that could be resolved
+        """
+        return self.size_resolver.resolve((file_url for _, file_url, _ in files), on_batch, is_cancelled)
+    
+    def estimate_disk_usage(self, files: List[Tuple[str, str, str]],
+                            download_path: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Compare the size of the given files with the free space of the target disk
+        Only sizes already resolved are counted; see resolve_sizes
+        """
+        total_size = 0
+        unknown = 0
+        for _, file_url, _ in files:
+            size = self.size_resolver.get(file_url)
+            if size is None:
+                unknown += 1
+            else:
+                total_size += size[0]
+        
+        free_space = FileUtils.get_free_space(download_path or Path("descarga"))
+        return {
+            'total_size': total_size,
+            'unknown': unknown,
+            'free_space': free_space,
+            'fits': free_space is None or total_size <= free_space
+        }
+    
     def download_from_url(self, url: str, download_path: Optional[Path] = None,
-                         progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                         progress_callback: Optional[Callable] = None,
+                         recursive: bool = False, max_depth: int = 5,
+                         cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
         """
         Main download function
         Returns: Dictionary with download statistics
@@ -95,17 +182,21 @@ class UCLVDownloader:
             raise ValueError("Invalid URL provided")
         
         # Get file list
-        files = self.get_file_list(url)
+        files = self.get_file_list(url, recursive, max_depth)
         if not files:
             return {'success': False, 'message': 'No files found to download'}
         
-        return self.download_selected_files(files, url, download_path, progress_callback)
+        return self.download_selected_files(files, url, download_path, progress_callback, cancel_token)
     
     def download_selected_files(self, selected_files: List[Tuple[str, str, str]], 
                                url: str, download_path: Optional[Path] = None,
-                               progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                               progress_callback: Optional[Callable] = None,
+                               cancel_token: Optional[CancellationToken] = None,
+                               overwrite: bool = False) -> Dict[str, Any]:
         """
         Download specific selected files using batch downloader
+        cancel_token pauses/resumes or cancels the batch; cancelled files keep their .part
+        With overwrite=True existing files are replaced once the new copy is complete
         """
         if not selected_files:
             return {'success': False, 'message': 'No files selected for download'}
@@ -117,9 +208,13 @@ class UCLVDownloader:
         elif isinstance(download_path, str):
             download_path = Path(download_path)
         
+        self.file_downloader.checksums = self.load_checksums(selected_files) if self.verify_checksums else {}
+        if self.file_downloader.checksums:
+            self.events.emit('checksums_loaded', count=len(self.file_downloader.checksums))
+        
         # Use batch downloader for the actual downloading
         result = self.batch_downloader.download_files(
-            selected_files, download_path, progress_callback
+            selected_files, download_path, progress_callback, cancel_token, overwrite
         )
         
         # Add file statistics
@@ -127,6 +222,35 @@ class UCLVDownloader:
         
         return result
     
+    def load_checksums(self, selected_files: List[Tuple[str, str, str]]) -> Dict[str, Tuple[str, str]]:
+        """
+        Find the expected checksums of files in the checksum files of their remote folders
+        Listings come from the cache when possible; unreadable folders or manifests are skipped.
+        Returns: Dict of {file_url: (algorithm, hex digest)}
+        """
+        folders = ChecksumManifest.group_by_folder(file_url for _, file_url, _ in selected_files)
+        checksums = {}
+        for folder_url, file_urls in folders.items():
+            try:
+                entries = self.listing_fetcher.fetch(folder_url, revalidate=False)
+            except Exception:
+                continue
+            
+            for entry in entries:
+                algorithm = None if entry['is_dir'] else ChecksumManifest.algorithm_for(entry['name'])
+                if algorithm is None:
+                    continue
+                try:
+                    manifest = ChecksumManifest.fetch(self.session, entry['url'], entry['name'], algorithm)
+                except requests.RequestException:
+                    continue
+                for file_url in file_urls:
+                    digest = ChecksumManifest.digest_for(manifest, file_url)
+                    if digest:
+                        checksums[file_url] = (algorithm, digest)
+        
+        return checksums
+    
     def add_progress_callback(self, callback: Callable):
         """Add progress callback to batch downloader"""
         self.batch_downloader.add_progress_callback(callback)
@@ -0,0 +1,214 @@
+"""
+Prometheus text-format metrics for long-running downloads, served over plain HTTP
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from .download_queue import DownloadQueue
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Integers without a trailing .0, everything else with full precision"""
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsCollector:
+    """
+    Engine counters and gauges in the Prometheus text format
+    Counters come from the downloader's events (the collector is one of its sinks), so they
+    keep growing across batches; gauges are read from the downloader and the queue on each scrape.
+    """
+    
+    def __init__(self, downloader, queue: Optional[DownloadQueue] = None):
+        """
+        Args:
+            downloader: UCLVDownloader whose events, progress, bandwidth limiter and listings are reported
+            queue: Persistent queue whose items are reported per state (optional)
+        """
+        self.downloader = downloader
+        self.queue = queue
+        self._lock = threading.Lock()
+        self.downloaded_bytes = 0
+        self.resumed_bytes = 0
+        self.files: Dict[str, int] = {'completed': 0, 'existing': 0, 'failed': 0}
+        self.retries: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.batches = 0
+        self.transfer_seconds = 0.0
+        downloader.events.add_sink(self)
+    
+    def close(self):
+        """Stop counting the downloader's events"""
+        self.downloader.events.remove_sink(self)
+    
+    def __call__(self, record: Dict[str, Any]):
+        event = record['event']
+        with self._lock:
+            if event == 'file_completed':
+                self.files['completed'] += 1
+                self.downloaded_bytes += record.get('bytes') or 0
+                self.resumed_bytes += record.get('resumed_from') or 0
+                self.transfer_seconds += record.get('transfer_s') or 0.0
+            elif event == 'file_exists':
+                self.files['existing'] += 1
+            elif event == 'retry':
+                self.retries[record['reason']] = self.retries.get(record['reason'], 0) + 1
+            elif event == 'file_failed':
+                self.files['failed'] += 1
+                self.failures[record['reason']] = self.failures.get(record['reason'], 0) + 1
+            elif event == 'batch_started':
+                self.batches += 1
+    
+    def collect(self) -> List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]:
+        """Current metrics as (name, type, help, [(labels, value)]) tuples"""
+        with self._lock:
+            files = dict(self.files)
+            retries = dict(self.retries)
+            failures = dict(self.failures)
+            counters = (self.downloaded_bytes, self.resumed_bytes, self.transfer_seconds, self.batches)
+        downloaded_bytes, resumed_bytes, transfer_seconds, batches = counters
+        
+        snapshot = self.downloader.progress.snapshot()
+        bandwidth = self.downloader.bandwidth
+        listing_stats = dict(self.downloader.listing_fetcher.stats)
+        listings = sum(listing_stats.values())
+        # Revalidated listings (304) are served from the cache too
+        cached = listing_stats['hits'] + listing_stats['revalidated']
+        
+        metrics = [
+            ('uclv_downloaded_bytes_total', 'counter', 'Bytes received for completed files',
+             [({}, downloaded_bytes)]),
+            ('uclv_resumed_bytes_total', 'counter', 'Bytes of completed files taken from earlier partial downloads',
+             [({}, resumed_bytes)]),
+            ('uclv_transfer_seconds_total', 'counter', 'Seconds spent streaming completed files',
+             [({}, transfer_seconds)]),
+            ('uclv_files_total', 'counter', 'Files processed by result',
+             [({'result': result}, count) for result, count in files.items()]),
+            ('uclv_retries_total', 'counter', 'Download attempts retried by cause',
+             [({'reason': reason}, count) for reason, count in sorted(retries.items())]),
+            ('uclv_failures_total', 'counter', 'Files that failed for good by cause',
+             [({'reason': reason}, count) for reason, count in sorted(failures.items())]),
+            ('uclv_batches_total', 'counter', 'Download batches started', [({}, batches)]),
+            ('uclv_active_transfers', 'gauge', 'Files being downloaded right now',
+             [({}, len(snapshot['active_files']))]),
+            ('uclv_download_speed_bytes_per_second', 'gauge', 'Recent download speed in bytes per second',
+             [({}, snapshot['speed'])]),
+            ('uclv_bandwidth_limit_bytes_per_second', 'gauge', 'Bandwidth limit in bytes per second (0 = unlimited)',
+             [({'scope': 'global'}, bandwidth.current_limit), ({'scope': 'host'}, bandwidth.per_host_limit)]),
+            ('uclv_listing_requests_total', 'counter', 'Directory listings by cache result',
+             [({'result': result}, count) for result, count in listing_stats.items()]),
+            ('uclv_listing_cache_hit_ratio', 'gauge', 'Share of listings answered from the cache',
+             [({}, cached / listings if listings else 0.0)]),
+        ]
+        if self.queue is not None:
+            metrics.append(('uclv_queue_items', 'gauge', 'Queue items by state',
+                            [({'state': state}, count) for state, count in self.queue.counts().items()]))
+        return metrics
+    
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for name, metric_type, description, samples in self.collect():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{name} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the collector output"""
+    
+    server: '_MetricsHTTPServer'
+    
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        try:
+            body = self.server.collector.render().encode('utf-8')
+        except Exception as e:
+            # A failing gauge (e.g. a locked queue database) must not kill the server thread
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the console
+        pass
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], collector: MetricsCollector):
+        super().__init__(address, _MetricsHandler)
+        self.collector = collector
+
+
+class MetricsServer:
+    """
+    Serves a MetricsCollector at http://host:port/metrics from a daemon thread
+    
+    Example:
+        server = MetricsServer(MetricsCollector(downloader, queue), port=9464)
+        server.start()
+        ...  # curl http://127.0.0.1:9464/metrics
+        server.stop()
+    """
+    
+    DEFAULT_PORT = 9464
+    
+    def __init__(self, collector: MetricsCollector, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+        """
+        Args:
+            collector: Source of the metrics
+            host: Interface to listen on (localhost only by default)
+            port: TCP port (0 picks a free one)
+        """
+        self.collector = collector
+        self.host = host
+        self.port = port
+        self._server: Optional[_MetricsHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Address of the metrics page"""
+        return f"http://{self.host}:{self.port}/metrics"
+    
+    def start(self):
+        """Bind the port and serve in the background (raises OSError if the port is taken)"""
+        if self._server is not None:
+            return
+        self._server = _MetricsHTTPServer((self.host, self.port), self.collector)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='uclv-metrics', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop serving and release the port"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,305 @@
+"""
+Incremental mirror of a remote folder tree driven by a local manifest
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .cancellation import CancellationToken
+from .integrity import HashIndex, StreamHasher
+
+
+class MirrorManifest:
+    """What was mirrored into a local folder: one record per relative path"""
+    
+    FILENAME = '.uclv-mirror.json'
+    VERSION = 1
+    
+    def __init__(self, root: Path, url: Optional[str] = None,
+                 files: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.root = Path(root)
+        self.url = url
+        # relative_path -> url, type, size (local bytes), remote_size, size_exact, mtime,
+        #                  etag, last_modified, sha256, synced_at
+        self.files: Dict[str, Dict[str, Any]] = files or {}
+    
+    @property
+    def path(self) -> Path:
+        """Location of the manifest file"""
+        return self.root / self.FILENAME
+    
+    @classmethod
+    def load(cls, root: Path) -> 'MirrorManifest':
+        """Load the manifest of a folder (empty if there is none yet)"""
+        manifest = cls(root)
+        try:
+            with open(manifest.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return manifest
+        
+        if data.get('version') == cls.VERSION:
+            manifest.url = data.get('url')
+            manifest.files = data.get('files', {})
+        return manifest
+    
+    def save(self):
+        """Atomically write the manifest next to the mirrored files"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        data = {'version': self.VERSION, 'url': self.url, 'updated_at': time.time(), 'files': self.files}
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.uclv-mirror', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+class MirrorSync:
+    """
+    Keeps a local folder in sync with a remote tree
+    The remote side is read from the (conditionally revalidated) listing cache, so an unchanged
+    tree costs one 304 per directory and no request per file.
+    """
+    
+    def __init__(self, downloader):
+        """
+        Args:
+            downloader: UCLVDownloader used for listings and transfers
+        """
+        self.downloader = downloader
+    
+    def plan(self, url: str, download_path: Path, recursive: bool = True, max_depth: int = 5,
+             file_types: Optional[List[str]] = None,
+             path_filter: Optional[Callable[[str], bool]] = None) -> Dict[str, Any]:
+        """
+        Diff the remote listing against the manifest without downloading anything
+        Args:
+            url: Remote folder URL
+            download_path: Local mirror folder (holds the manifest)
+            recursive: Include subfolders up to max_depth
+            file_types: Types to mirror (None uses the downloader's configuration)
+            path_filter: Optional predicate on relative paths (include/exclude rules)
+        Returns: Dict with new, changed, missing, removed and unchanged relative paths
+        """
+        download_path = Path(download_path)
+        manifest = MirrorManifest.load(download_path)
+        failed_dirs: List[str] = []
+        
+        entries: Dict[str, Dict[str, Any]] = {}
+        for relative_path, entry in self.downloader.iter_entries(
+                url, recursive, max_depth, file_types=file_types,
+                on_error=lambda prefix, error: failed_dirs.append(prefix)):
+            if path_filter is None or path_filter(relative_path):
+                entries[relative_path] = entry
+        
+        plan = {
+            'url': url,
+            'download_path': download_path,
+            'manifest': manifest,
+            'entries': entries,
+            'new': [],
+            'changed': [],
+            'missing': [],
+            'unchanged': [],
+            'adopted': [],
+            'removed': [],
+            'unreadable_dirs': failed_dirs
+        }
+        for relative_path, entry in entries.items():
+            status = self._compare(entry, manifest.files.get(relative_path), download_path / relative_path)
+            plan[status].append(relative_path)
+            if status == 'adopted':
+                plan['unchanged'].append(relative_path)
+        
+        # Only paths the listing could have shown count as removed upstream
+        allowed_types = set(file_types) if file_types is not None else self.downloader.get_enabled_file_types()
+        max_slashes = max_depth if recursive else 0
+        for relative_path, record in manifest.files.items():
+            if (relative_path in entries
+                    or any(relative_path.startswith(prefix) for prefix in failed_dirs)
+                    or relative_path.count('/') > max_slashes
+                    or record.get('type') not in allowed_types
+                    or (path_filter is not None and not path_filter(relative_path))):
+                continue
+            plan['removed'].append(relative_path)
+        
+        return plan
+    
+    @staticmethod
+    def _compare(entry: Dict[str, Any], record: Optional[Dict[str, Any]], local_path: Path) -> str:
+        """Classify one remote file as new, changed, missing, unchanged or adopted"""
+        try:
+            local_size = local_path.stat().st_size
+        except OSError:
+            local_size = None
+        
+        remote_size = entry.get('size')
+        size_exact = entry.get('size_exact', False)
+        
+        if record is None:
+            if local_size is None:
+                return 'new'
+            # Files downloaded before the first sync are trusted unless the listing says otherwise
+            if size_exact and remote_size is not None and remote_size != local_size:
+                return 'changed'
+            return 'adopted'
+        
+        if local_size is None:
+            return 'missing'
+        if record.get('size') is not None and local_size != record['size']:
+            return 'changed'
+        if entry.get('mtime') and record.get('mtime') and entry['mtime'] != record['mtime']:
+            return 'changed'
+        # Compare sizes only when both sides use the same precision
+        if (remote_size is not None and record.get('remote_size') is not None
+                and size_exact == record.get('size_exact', False)
+                and remote_size != record['remote_size']):
+            return 'changed'
+        return 'unchanged'
+    
+    def apply(self, plan: Dict[str, Any], prune: bool = False,
+              progress_callback: Optional[Callable] = None,
+              cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """
+        Download what a plan found new, changed or missing and update the manifest
+        Args:
+            plan: Result of plan()
+            prune: Delete local files that disappeared upstream
+            progress_callback: Passed to the batch download
+            cancel_token: Token to pause/resume or cancel the transfers
+        Returns: Change summary including the batch result (None when nothing was downloaded)
+        """
+        manifest: MirrorManifest = plan['manifest']
+        entries = plan['entries']
+        download_path: Path = plan['download_path']
+        manifest.url = plan['url']
+        
+        for relative_path in plan['adopted']:
+            local_path = download_path / relative_path
+            manifest.files[relative_path] = self._record(entries[relative_path], local_path,
+                                                         sha256=HashIndex.lookup(local_path))
+        
+        to_fetch = plan['new'] + plan['changed'] + plan['missing']
+        result = None
+        synced: List[str] = []
+        if to_fetch:
+            selected_files = [(path, entries[path]['url'], entries[path]['type']) for path in to_fetch]
+            file_downloader = self.downloader.file_downloader
+            file_downloader.validators = {}
+            try:
+                result = self.downloader.download_selected_files(
+                    selected_files, plan['url'], download_path, progress_callback, cancel_token,
+                    overwrite=True
+                )
+                validators = file_downloader.validators
+            finally:
+                file_downloader.validators = None
+            
+            # Without per-file outcomes (Ctrl+C) only files that did not exist before are trusted
+            unfinished = set(result.get('errors', {})) | set(result.get('skipped', []))
+            interrupted = result.get('interrupted', False)
+            for relative_path in to_fetch:
+                local_path = download_path / relative_path
+                if relative_path in unfinished or not local_path.exists():
+                    continue
+                if interrupted and relative_path in plan['changed']:
+                    continue
+                entry = entries[relative_path]
+                file_validators = validators.get(entry['url'], {})
+                # The hash computed while streaming saves reading the file back
+                sha256 = file_validators.get('sha256') or self.hash_file(local_path)
+                manifest.files[relative_path] = self._record(entry, local_path, file_validators, sha256)
+                synced.append(relative_path)
+        
+        pruned = []
+        if prune:
+            for relative_path in plan['removed']:
+                self._remove_local(download_path, relative_path)
+                manifest.files.pop(relative_path, None)
+                pruned.append(relative_path)
+        
+        manifest.save()
+        
+        return {
+            'url': plan['url'],
+            'download_path': str(download_path),
+            'new': plan['new'],
+            'changed': plan['changed'],
+            'missing': plan['missing'],
+            'removed': plan['removed'],
+            'pruned': pruned,
+            'unchanged': len(plan['unchanged']),
+            'synced': synced,
+            'unreadable_dirs': plan['unreadable_dirs'],
+            'success': len(synced) == len(to_fetch),
+            'result': result
+        }
+    
+    def sync(self, url: str, download_path: Path, recursive: bool = True, max_depth: int = 5,
+             file_types: Optional[List[str]] = None,
+             path_filter: Optional[Callable[[str], bool]] = None, prune: bool = False,
+             progress_callback: Optional[Callable] = None,
+             cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Plan and apply in one call"""
+        plan = self.plan(url, download_path, recursive, max_depth, file_types, path_filter)
+        return self.apply(plan, prune, progress_callback, cancel_token)
+    
+    @staticmethod
+    def _record(entry: Dict[str, Any], local_path: Path, validators: Optional[Dict[str, Any]] = None,
+                sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Build the manifest record of a local file"""
+        validators = validators or {}
+        return {
+            'url': entry['url'],
+            'type': entry['type'],
+            'size': local_path.stat().st_size,
+            'remote_size': entry.get('size'),
+            'size_exact': entry.get('size_exact', False),
+            'mtime': entry.get('mtime'),
+            'etag': validators.get('etag'),
+            'last_modified': validators.get('last_modified'),
+            'sha256': sha256,
+            'synced_at': time.time()
+        }
+    
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        """SHA-256 of a local file, from its folder's hash index when still current"""
+        return HashIndex.lookup(path) or StreamHasher.hash_file(path)
+    
+    @staticmethod
+    def _remove_local(root: Path, relative_path: str):
+        """Delete a mirrored file, its hash index entry and the folders it leaves empty"""
+        path = root / relative_path
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        
+        index = HashIndex.load(path.parent)
+        index.discard(path.name)
+        try:
+            index.save()
+        except OSError:
+            pass
+        
+        parent = path.parent
+        while parent != root and root in parent.parents:
+            # A folder holding nothing but its hash index counts as empty
+            try:
+                if [child.name for child in parent.iterdir()] == [HashIndex.FILENAME]:
+                    (parent / HashIndex.FILENAME).unlink()
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
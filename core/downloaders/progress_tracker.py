@@ -2,14 +2,55 @@
 Progress Tracker for download operations
 """
 
+import threading
 import time
-from typing import List, Callable
+from collections import deque
+from typing import Dict, List, Callable, Tuple, Any, Optional
+
+
+class SpeedMeter:
+    """Transfer rate over a sliding time window"""
+    
+    # Samples closer than this are merged so fast links do not grow the window unboundedly
+    SAMPLE_INTERVAL = 0.1
+    
+    def __init__(self, window: float = 5.0):
+        self.window = window
+        self.reset()
+    
+    def reset(self):
+        """Forget every sample"""
+        self.total_bytes = 0
+        self._samples = deque([(time.monotonic(), 0)])  # (timestamp, cumulative bytes)
+    
+    def add(self, nbytes: int):
+        """Record bytes received just now"""
+        now = time.monotonic()
+        self.total_bytes += nbytes
+        if len(self._samples) > 1 and now - self._samples[-2][0] < self.SAMPLE_INTERVAL:
+            self._samples[-1] = (now, self.total_bytes)
+        else:
+            self._samples.append((now, self.total_bytes))
+    
+    def get_speed(self) -> float:
+        """Bytes per second over the last `window` seconds"""
+        now = time.monotonic()
+        # Keep the newest sample older than the window as the reference point
+        while len(self._samples) > 1 and self._samples[1][0] <= now - self.window:
+            self._samples.popleft()
+        
+        start_time, start_bytes = self._samples[0]
+        elapsed = now - start_time
+        if elapsed <= 0:
+            return 0.0
+        return (self.total_bytes - start_bytes) / elapsed
 
 
 class DownloadProgress:
-    """Class to track download progress and statistics"""
+    """Class to track download progress and statistics (thread-safe)"""
     
     def __init__(self):
+        self._lock = threading.RLock()
         self.total_files = 0
         self.completed_files = 0
         self.failed_files = 0
@@ -17,8 +58,13 @@ class DownloadProgress:
         self.current_progress = 0
         self.total_bytes = 0
         self.downloaded_bytes = 0
+        self.active_files: Dict[str, Tuple[int, int]] = {}
         self.start_time = None
         self.callbacks: List[Callable] = []
+        self.speed_meter = SpeedMeter()
+        self._file_sizes: Dict[str, int] = {}
+        # Bumped on every change so pollers can skip redrawing an unchanged snapshot
+        self.version = 0
     
     def add_callback(self, callback: Callable):
         """Add progress callback function"""
@@ -26,12 +72,65 @@ class DownloadProgress:
     
     def update(self, **kwargs):
         """Update progress data and notify callbacks"""
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        with self._lock:
+            for key, value in kwargs.items():
+                setattr(self, key, value)
+            self.version += 1
         
+        self._notify()
+    
+    def _notify(self):
+        """Notify callbacks outside the lock so they can read progress safely"""
         for callback in self.callbacks:
             callback(self)
     
+    def start_file(self, filename: str):
+        """Register a file whose download just started"""
+        with self._lock:
+            # -1 marks that the first report only sets the baseline (resumed bytes are not speed)
+            self.active_files[filename] = (-1, 0)
+            self.current_file = filename
+            self.version += 1
+        
+        self._notify()
+    
+    def update_file(self, filename: str, downloaded: int, total: int):
+        """Update byte progress of an active file"""
+        with self._lock:
+            previous = self.active_files.get(filename, (-1, 0))[0]
+            if previous >= 0 and downloaded > previous:
+                self.speed_meter.add(downloaded - previous)
+            self.active_files[filename] = (downloaded, total)
+            if total > 0:
+                self._file_sizes[filename] = total
+            self.current_file = filename
+            self.downloaded_bytes = downloaded
+            self.total_bytes = total
+            self.version += 1
+        
+        self._notify()
+    
+    def finish_file(self, filename: str, success: bool):
+        """Mark an active file as finished and update counters atomically"""
+        with self._lock:
+            self.active_files.pop(filename, None)
+            if success:
+                self.completed_files += 1
+            else:
+                self.failed_files += 1
+            self.current_progress = self.completed_files + self.failed_files
+            self.version += 1
+        
+        self._notify()
+    
+    def discard_file(self, filename: str):
+        """Forget an active file that was cancelled (counts neither as completed nor failed)"""
+        with self._lock:
+            self.active_files.pop(filename, None)
+            self.version += 1
+        
+        self._notify()
+    
     def get_progress_percentage(self) -> float:
         """Get overall progress percentage"""
         if self.total_files == 0:
@@ -64,13 +163,63 @@ class DownloadProgress:
         estimated_total = elapsed / progress
         return estimated_total - elapsed
     
+    def get_speed(self) -> float:
+        """Get instantaneous transfer rate in bytes per second"""
+        with self._lock:
+            return self.speed_meter.get_speed()
+    
+    def get_eta(self) -> Optional[float]:
+        """
+        Estimate remaining seconds from the current speed
+        Files not started yet are assumed to be as big as the average file seen so far
+        Returns None while there is not enough data
+        """
+        with self._lock:
+            speed = self.speed_meter.get_speed()
+            if speed <= 0:
+                return None
+            
+            remaining = sum(max(total - max(done, 0), 0) for done, total in self.active_files.values() if total)
+            pending = self.total_files - self.completed_files - self.failed_files - len(self.active_files)
+            if pending > 0:
+                if not self._file_sizes:
+                    return None
+                remaining += pending * sum(self._file_sizes.values()) / len(self._file_sizes)
+            
+            return remaining / speed
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the current state for rendering in another thread"""
+        with self._lock:
+            finished = self.completed_files + self.failed_files
+            partial = sum(max(done, 0) / total for done, total in self.active_files.values() if total)
+            percentage = (finished + partial) / self.total_files * 100 if self.total_files else 0.0
+            
+            return {
+                'version': self.version,
+                'total_files': self.total_files,
+                'completed_files': self.completed_files,
+                'failed_files': self.failed_files,
+                'current_file': self.current_file,
+                'active_files': dict(self.active_files),
+                'percentage': min(percentage, 100.0),
+                'speed': self.get_speed(),
+                'eta': self.get_eta(),
+                'elapsed': self.get_elapsed_time()
+            }
+    
     def reset(self):
         """Reset progress tracking"""
-        self.total_files = 0
-        self.completed_files = 0
-        self.failed_files = 0
-        self.current_file = ""
-        self.current_progress = 0
-        self.total_bytes = 0
-        self.downloaded_bytes = 0
-        self.start_time = time.time() 
\ No newline at end of file
+        with self._lock:
+            self.total_files = 0
+            self.completed_files = 0
+            self.failed_files = 0
+            self.current_file = ""
+            self.current_progress = 0
+            self.total_bytes = 0
+            self.downloaded_bytes = 0
+            self.active_files = {}
+            self._file_sizes = {}
+            self.speed_meter.reset()
+            self.start_time = time.time()
+            self.version += 1 
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Rate limiting primitives for download operations
+"""
+
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared between download workers"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second (0 or less disables limiting)
+            capacity: Maximum burst size (defaults to one second worth of tokens)
+        """
+        self._lock = threading.Lock()
+        self.rate = rate
+        self._auto_capacity = capacity is None
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+    
+    def set_rate(self, rate: float):
+        """Change the rate while other threads keep using the bucket"""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+            if self._auto_capacity:
+                self.capacity = max(rate, 1.0)
+            self._tokens = min(self._tokens, self.capacity)
+    
+    @property
+    def enabled(self) -> bool:
+        """Check if the bucket actually limits anything"""
+        return self.rate > 0
+    
+    def _refill(self):
+        """Add tokens for the time elapsed since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+    
+    def acquire(self, tokens: float = 1.0, sleep: Callable[[float], None] = time.sleep,
+                max_wait: Optional[float] = None):
+        """
+        Block until the requested amount of tokens is available
+        sleep can be a cancellable wait; max_wait bounds each sleep so rate changes apply promptly
+        """
+        if not self.enabled:
+            return
+        
+        while True:
+            with self._lock:
+                # The rate may have been lifted while waiting
+                if not self.enabled:
+                    return
+                self._refill()
+                # Requests bigger than the bucket go into debt instead of blocking forever
+                needed = min(tokens, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= tokens
+                    return
+                wait_time = (needed - self._tokens) / self.rate
+            
+            sleep(min(wait_time, max_wait) if max_wait else wait_time)
+    
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens now, possibly going into debt, and return how long the caller must wait
+        Non-blocking counterpart of acquire for event loops (await asyncio.sleep(delay))
+        """
+        if not self.enabled:
+            return 0.0
+        
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so every server gets its own politeness budget"""
+    
+    # Seconds between new requests to a host when the engines are left on their defaults
+    DEFAULT_DELAY = 0.5
+    
+    def __init__(self, requests_per_second: float, burst: float = 1.0,
+                 active: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            requests_per_second: New requests allowed per second and host (0 or less disables limiting)
+            burst: Requests allowed back to back before the spacing applies
+            active: Limit only while this returns True (always when omitted)
+        """
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.active = active
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def for_delay(cls, download_delay: Optional[float], bandwidth) -> 'HostRateLimiter':
+        """
+        Limiter for the download_delay option of the engines
+        None spaces requests by DEFAULT_DELAY until the BandwidthLimiter gets a cap or schedule,
+        so a default engine never hammers a server; 0 turns the spacing off.
+        """
+        if download_delay is None:
+            return cls(1.0 / cls.DEFAULT_DELAY, active=lambda: not bandwidth.enabled)
+        return cls(1.0 / download_delay if download_delay > 0 else 0)
+    
+    @property
+    def enabled(self) -> bool:
+        """Check if new requests are spaced out right now"""
+        return self.requests_per_second > 0 and (self.active is None or self.active())
+    
+    def _get_bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the host of a URL"""
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.requests_per_second, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+    
+    def acquire(self, url: str):
+        """Wait until a new request to the URL's host is allowed"""
+        if not self.enabled:
+            return
+        self._get_bucket(url).acquire()
+    
+    def reserve(self, url: str) -> float:
+        """Reserve a request slot for the URL's host and return the delay before using it"""
+        if not self.enabled:
+            return 0.0
+        return self._get_bucket(url).reserve()
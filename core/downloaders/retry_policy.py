@@ -0,0 +1,158 @@
+"""
+Retry policy for file downloads: error classification, backoff with jitter and statistics
+"""
+
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import requests
+
+from .async_http import AsyncHTTPError
+from .integrity import IntegrityError
+
+
+class DownloadFailed(Exception):
+    """A file could not be downloaded; retryable tells whether trying again later may help"""
+    
+    def __init__(self, message: str, retryable: bool = True, attempts: int = 1, reason: str = 'other'):
+        super().__init__(message)
+        self.retryable = retryable
+        self.attempts = attempts
+        # RetryPolicy.classify() of the last underlying error
+        self.reason = reason
+
+
+class RetryPolicy:
+    """Decides whether and when a failed download attempt is tried again"""
+    
+    # Client errors that will not go away by asking again
+    FATAL_STATUSES = frozenset({400, 401, 403, 404, 405, 410, 414, 451})
+    
+    def __init__(self, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: float = 0.5, deferred_retry: bool = True):
+        """
+        Args:
+            max_retries: Attempts per file before giving up (at least 1)
+            base_delay: Wait before the second attempt; doubles on every further attempt
+            max_delay: Upper bound for any wait, including Retry-After
+            jitter: Fraction of the wait that is randomized so workers do not retry in lockstep
+            deferred_retry: Retry files that failed with retryable errors once more at the end of a batch
+        """
+        self.max_retries = max(1, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.deferred_retry = deferred_retry
+        self._lock = threading.Lock()
+        self.reset_stats()
+    
+    @staticmethod
+    def get_status(error: BaseException) -> Optional[int]:
+        """HTTP status behind an error (requests or async client response), if any"""
+        response = getattr(error, 'response', None)
+        if response is None:
+            return None
+        return getattr(response, 'status_code', None) or getattr(response, 'status', None)
+    
+    @classmethod
+    def classify(cls, error: BaseException) -> str:
+        """
+        Name the kind of failure
+        Returns: 'http_<status>', 'timeout', 'connection', 'integrity' or 'other'
+        """
+        if isinstance(error, DownloadFailed):
+            return error.reason
+        status = cls.get_status(error)
+        if status is not None:
+            return f"http_{status}"
+        if isinstance(error, requests.Timeout):
+            return 'timeout'
+        if isinstance(error, (requests.ConnectionError, requests.exceptions.ChunkedEncodingError)):
+            return 'connection'
+        # AsyncHTTPError carries the same distinction as an attribute
+        kind = getattr(error, 'kind', None)
+        if kind in ('timeout', 'connection'):
+            return kind
+        if isinstance(error, IntegrityError):
+            return 'integrity'
+        return 'other'
+    
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Timeouts, resets, 408/429/5xx and broken transfers are retried; 403, 404 and friends are not
+        Local failures (disk full, permissions, bugs) are never retried: they would fail the same way again
+        """
+        if isinstance(error, DownloadFailed):
+            return error.retryable
+        if not isinstance(error, (requests.RequestException, AsyncHTTPError)):
+            return False
+        status = self.get_status(error)
+        if status is None:
+            return True
+        return status not in self.FATAL_STATUSES and (status >= 500 or status in (408, 425, 429))
+    
+    def get_delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        Wait before the next attempt
+        Args:
+            attempt: Number of attempts already made (1 after the first failure)
+            error: The last error; its Retry-After header wins over the backoff
+        """
+        retry_after = self.get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        
+        delay = min(self.base_delay * (2 ** (attempt - 1)), self.max_delay)
+        return delay - random.uniform(0, delay * self.jitter)
+    
+    @staticmethod
+    def get_retry_after(error: Optional[BaseException]) -> Optional[float]:
+        """Seconds requested by a Retry-After header (delta-seconds or HTTP date)"""
+        response = getattr(error, 'response', None)
+        value = response.headers.get('retry-after') if response is not None else None
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, when.timestamp() - time.time())
+    
+    def record_retry(self, error: BaseException, delay: float):
+        """Count an attempt that will be retried after delay seconds"""
+        with self._lock:
+            self.stats['retries'] += 1
+            self.stats['wait_s'] += delay
+            reason = self.classify(error)
+            self.stats['reasons'][reason] = self.stats['reasons'].get(reason, 0) + 1
+    
+    def record(self, key: str, count: int = 1):
+        """Increment one of the counters of get_stats"""
+        with self._lock:
+            self.stats[key] += count
+    
+    def reset_stats(self):
+        """Start counting from zero (called at the start of a batch)"""
+        with self._lock:
+            self.stats: Dict[str, Any] = {
+                'retries': 0,
+                'wait_s': 0.0,
+                'fatal': 0,
+                'deferred': 0,
+                'recovered': 0,
+                'reasons': {}
+            }
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Copy of the retry statistics"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['reasons'] = dict(self.stats['reasons'])
+            stats['wait_s'] = round(stats['wait_s'], 3)
+        return stats
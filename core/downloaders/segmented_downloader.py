@@ -0,0 +1,184 @@
+"""
+Segmented (multi-connection) downloader for large files
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Callable, Dict, Any
+
+import requests
+
+from .bandwidth import BandwidthLimiter
+from .cancellation import CancellationToken, DownloadCancelled
+
+class SegmentedDownloader:
+    """Downloads a single file as parallel byte ranges into a preallocated .part file"""
+    
+    # Segment progress is saved while downloading after this many bytes or seconds, so a
+    # crash or kill loses at most that much of the file instead of the whole run
+    SAVE_INTERVAL_BYTES = 4 * 1024 * 1024
+    SAVE_INTERVAL = 2.0
+    
+    def __init__(self, session: requests.Session, segments: int = 4,
+                 min_segment_size: int = 8 * 1024 * 1024, chunk_size: int = 64 * 1024,
+                 bandwidth: Optional[BandwidthLimiter] = None):
+        self.session = session
+        self.segments = max(1, segments)
+        self.min_segment_size = max(1, min_segment_size)
+        self.chunk_size = chunk_size
+        self.bandwidth = bandwidth or BandwidthLimiter()
+    
+    def can_segment(self, file_info: Dict[str, Any]) -> bool:
+        """Check if the server supports ranges and the file is big enough to split"""
+        return (self.segments > 1
+                and file_info.get('accept_ranges')
+                and file_info.get('size', 0) >= 2 * self.min_segment_size)
+    
+    def plan_segments(self, size: int) -> List[List[int]]:
+        """Split a file into [start, end, downloaded] ranges (end inclusive)"""
+        count = max(1, min(self.segments, size // self.min_segment_size))
+        segment_size = size // count
+        plan = []
+        for i in range(count):
+            start = i * segment_size
+            end = size - 1 if i == count - 1 else start + segment_size - 1
+            plan.append([start, end, 0])
+        return plan
+    
+    def _load_plan(self, meta_path: Path, part_path: Path, url: str,
+                   file_info: Dict[str, Any]) -> Optional[List[List[int]]]:
+        """Reuse the segment progress of a previous run if the remote file is unchanged"""
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        size = file_info['size']
+        if (meta.get('url') != url or not meta.get('segments')
+                or meta.get('content_length') != size
+                or not part_path.exists() or part_path.stat().st_size != size):
+            return None
+        
+        etag = file_info.get('etag')
+        last_modified = file_info.get('last_modified')
+        if (etag or meta.get('etag')) and etag != meta.get('etag'):
+            return None
+        if not etag and last_modified != meta.get('last_modified'):
+            return None
+        
+        return meta['segments']
+    
+    def _save_plan(self, meta_path: Path, url: str, file_info: Dict[str, Any], plan: List[List[int]]):
+        """Atomically persist validators and per-segment progress for resuming"""
+        meta = {
+            'url': url,
+            'etag': file_info.get('etag'),
+            'last_modified': file_info.get('last_modified'),
+            'content_length': file_info['size'],
+            'segments': plan
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=meta_path.parent, prefix=meta_path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+    
+    def download(self, filename: str, url: str, part_path: Path, meta_path: Path,
+                 file_info: Dict[str, Any], progress_callback: Optional[Callable] = None,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        Fetch every segment of the file into part_path
+        Raises requests.RequestException if any segment fails and DownloadCancelled if
+        cancel_token is cancelled (progress is kept for resuming in both cases)
+        """
+        size = file_info['size']
+        plan = self._load_plan(meta_path, part_path, url, file_info)
+        
+        if plan is None:
+            plan = self.plan_segments(size)
+            # Preallocate so every segment can write at its own offset
+            with open(part_path, 'wb') as file:
+                file.truncate(size)
+            self._save_plan(meta_path, url, file_info, plan)
+        
+        lock = threading.Lock()
+        downloaded = [sum(segment[2] for segment in plan)]
+        # (bytes, time) of the last saved plan
+        saved = [downloaded[0], time.monotonic()]
+        validator = file_info.get('etag') or file_info.get('last_modified')
+        
+        def fetch_segment(segment: List[int]):
+            start, end, done = segment
+            if start + done > end:
+                return
+            
+            headers = {'Range': f'bytes={start + done}-{end}', 'Accept-Encoding': 'identity'}
+            if validator:
+                headers['If-Range'] = validator
+            
+            with self.session.get(url, stream=True, timeout=30, headers=headers) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise requests.RequestException(f"Server ignored range request for {filename}")
+                
+                with open(part_path, 'r+b') as file:
+                    file.seek(start + done)
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if cancel_token:
+                            cancel_token.checkpoint()
+                        if not chunk:
+                            continue
+                        self.bandwidth.consume(url, len(chunk), cancel_token)
+                        # Never write past the segment, even if the server over-delivers
+                        chunk = chunk[:end - (start + segment[2]) + 1]
+                        file.write(chunk)
+                        # A saved plan must only count bytes the OS already has
+                        file.flush()
+                        with lock:
+                            segment[2] += len(chunk)
+                            downloaded[0] += len(chunk)
+                            now = time.monotonic()
+                            if (downloaded[0] - saved[0] >= self.SAVE_INTERVAL_BYTES
+                                    or now - saved[1] >= self.SAVE_INTERVAL):
+                                self._save_plan(meta_path, url, file_info, plan)
+                                saved[:] = [downloaded[0], now]
+                            if progress_callback:
+                                progress_callback(downloaded[0], size, filename)
+                        if start + segment[2] > end:
+                            break
+            
+            if start + segment[2] <= end:
+                raise requests.ConnectionError(f"Segment {start}-{end} of {filename} ended early")
+        
+        errors = []
+        with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix='uclv-segment') as executor:
+            futures = [executor.submit(fetch_segment, segment) for segment in plan]
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+        
+        self._save_plan(meta_path, url, file_info, plan)
+        
+        for error in errors:
+            if isinstance(error, DownloadCancelled):
+                raise error
+        if errors:
+            # The first error itself is raised so RetryPolicy sees its real cause (status, timeout, truncation)
+            error = errors[0]
+            if len(errors) > 1 and isinstance(error, requests.RequestException):
+                error.args = (f"{len(errors)} segment(s) failed for {filename}: {error}",)
+            raise error
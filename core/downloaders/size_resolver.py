@@ -0,0 +1,105 @@
+"""
+Size resolver for remote files listed in a directory page
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .file_downloader import FileDownloader
+
+
+class SizeResolver:
+    """Resolves file sizes from listing metadata, falling back to concurrent HEAD requests"""
+    
+    def __init__(self, file_downloader: FileDownloader, max_workers: int = 4, batch_size: int = 25):
+        self.file_downloader = file_downloader
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        # url -> (size in bytes, exact); approximate sizes come from '1.2G' style listings
+        self._sizes: Dict[str, Tuple[int, bool]] = {}
+        self._lock = threading.Lock()
+    
+    def remember(self, url: str, size: Optional[int], exact: bool = False):
+        """Store a size already known from the listing page"""
+        if size is None:
+            return
+        with self._lock:
+            # Never replace an exact size with an approximate one
+            current = self._sizes.get(url)
+            if current is None or exact or not current[1]:
+                self._sizes[url] = (size, exact)
+    
+    def get(self, url: str) -> Optional[Tuple[int, bool]]:
+        """Get the cached (size, exact) pair for a URL"""
+        with self._lock:
+            return self._sizes.get(url)
+    
+    def _head(self, url: str) -> Optional[Tuple[int, bool]]:
+        """Ask the server for the exact size of a file"""
+        info = self.file_downloader.get_file_info(url)
+        # get_file_info reports 0 on errors, so 0 is treated as unknown
+        if not info.get('size'):
+            return None
+        with self._lock:
+            self._sizes[url] = (info['size'], True)
+        return self._sizes[url]
+    
+    def resolve(self, urls: Iterable[str],
+                on_batch: Optional[Callable[[Dict[str, Tuple[int, bool]]], None]] = None,
+                is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Tuple[int, bool]]:
+        """
+        Resolve the size of every URL
+        Args:
+            urls: File URLs to resolve
+            on_batch: Called from the worker thread with {url: (size, exact)} as results arrive
+            is_cancelled: Stops issuing HEAD requests once it returns True
+        Returns: Dict of every size that could be resolved
+        """
+        results: Dict[str, Tuple[int, bool]] = {}
+        missing = []
+        for url in dict.fromkeys(urls):
+            known = self.get(url)
+            if known is not None:
+                results[url] = known
+            else:
+                missing.append(url)
+        
+        # Sizes from the cache or the listing are delivered at once
+        if results and on_batch:
+            on_batch(dict(results))
+        
+        if not missing:
+            return results
+        
+        batch: Dict[str, Tuple[int, bool]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='uclv-size')
+        # Filled one by one so the finally block can cancel whatever was submitted before an error
+        futures: Dict[Future, str] = {}
+        try:
+            for url in missing:
+                futures[executor.submit(self._head, url)] = url
+            for future in as_completed(futures):
+                if is_cancelled and is_cancelled():
+                    break
+                try:
+                    size = future.result()
+                except Exception:
+                    size = None
+                if size is None:
+                    continue
+                
+                results[futures[future]] = size
+                batch[futures[future]] = size
+                if on_batch and len(batch) >= self.batch_size:
+                    on_batch(batch)
+                    batch = {}
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+        
+        if batch and on_batch and not (is_cancelled and is_cancelled()):
+            on_batch(batch)
+        
+        return results
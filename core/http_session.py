@@ -0,0 +1,112 @@
+"""
+Shared HTTP session factory for UCLV Downloader
+"""
+
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class SharedPoolAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with its own retry setting that sends through another adapter's connection pools
+    Closing it leaves the pools open; they belong to the base adapter.
+    """
+    
+    def __init__(self, base: HTTPAdapter, max_retries: int = 0):
+        self.base = base
+        super().__init__(pool_connections=base._pool_connections, pool_maxsize=base._pool_maxsize,
+                         max_retries=max_retries, pool_block=base._pool_block)
+        # Proxy pools are created lazily per proxy URL; share the dict so they are reused too
+        self.proxy_manager = base.proxy_manager
+    
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        self.poolmanager = self.base.poolmanager
+    
+    def close(self):
+        pass
+
+
+class SessionFactory:
+    """Builds pooled, keep-alive sessions shared by every component"""
+    
+    # Transient statuses the connection layer retries on its own (HEAD/GET only)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    
+    @staticmethod
+    def create_session(pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5,
+                       headers: Optional[Dict[str, str]] = None,
+                       cookies: Optional[Dict[str, str]] = None,
+                       proxies: Optional[Dict[str, str]] = None) -> requests.Session:
+        """
+        Create a session with a connection pool and urllib3 retries
+        Args:
+            pool_size: Maximum keep-alive connections per host
+            max_retries: Connection-level retries for connect errors and transient statuses
+                         (listings and HEAD requests; file downloads use create_transfer_session)
+            backoff_factor: Exponential backoff factor between connection-level retries
+            headers: Extra headers applied to every request
+            cookies: Cookies shared by every request
+            proxies: Proxy mapping as accepted by requests
+        """
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': DEFAULT_USER_AGENT,
+            'Connection': 'keep-alive'
+        })
+        if headers:
+            session.headers.update(headers)
+        if cookies:
+            session.cookies.update(cookies)
+        if proxies:
+            session.proxies.update(proxies)
+        
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=SessionFactory.RETRY_STATUSES,
+            allowed_methods=frozenset({'HEAD', 'GET'}),
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(1, pool_size), max_retries=retry)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        
+        return session
+    
+    @staticmethod
+    def create_transfer_session(session: requests.Session) -> requests.Session:
+        """
+        Create a session for file downloads that shares headers, cookies and proxies with session
+        Its adapter never retries on its own, so the download RetryPolicy alone decides when a
+        transfer is tried again (with its own delays, cap, statistics and cancellation).
+        Requests still go through the connection pools of session, so listings and transfers
+        share one set of keep-alive connections per host.
+        """
+        transfer = requests.Session()
+        # Same objects, so later changes to the main session apply to transfers too
+        transfer.headers = session.headers
+        transfer.cookies = session.cookies
+        transfer.proxies = session.proxies
+        transfer.auth = session.auth
+        transfer.verify = session.verify
+        transfer.cert = session.cert
+        transfer.trust_env = session.trust_env
+        
+        for prefix in ('https://', 'http://'):
+            base = session.get_adapter(prefix)
+            if isinstance(base, HTTPAdapter):
+                transfer.mount(prefix, SharedPoolAdapter(base))
+            else:
+                transfer.mount(prefix, HTTPAdapter(max_retries=0))
+        
+        return transfer
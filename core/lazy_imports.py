@@ -0,0 +1,29 @@
+"""
+Lazy package exports: public names are imported from their submodule on first access
+"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build the module-level __getattr__ and __dir__ of a package
+    Args:
+        package: __name__ of the package
+        exports: Dict of {public name: relative submodule that defines it}
+    Returns: (__getattr__, __dir__) to assign in the package __init__
+    """
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        # Cache it on the package so the next access skips __getattr__
+        setattr(importlib.import_module(package), name, value)
+        return value
+    
+    def __dir__() -> List[str]:
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+    
+    return __getattr__, __dir__
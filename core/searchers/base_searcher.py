@@ -5,18 +5,17 @@ Base Searcher class for subtitle searching
 import re
 import requests
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from abc import ABC, abstractmethod
 
+from ..http_session import SessionFactory
+
 
 class BaseSubtitleSearcher(ABC):
     """Base class for subtitle searchers"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SessionFactory.create_session()
     
     def clean_video_name(self, video_name: str) -> str:
         """Clean video name for better search results"""
@@ -2,7 +2,10 @@
 Simple Subtitle Searcher that aggregates multiple sources
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+import requests
+
 from .base_searcher import BaseSubtitleSearcher
 from .opensubtitles_searcher import OpenSubtitlesSearcher
 from .subdivx_searcher import SubDivXSearcher  
@@ -12,12 +15,12 @@ from .podnapisi_searcher import PodnapisiSearcher
 class SimpleSubtitleSearcher(BaseSubtitleSearcher):
     """Simple subtitle searcher that works without complex APIs"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, session: Optional[requests.Session] = None):
+        super().__init__(session)
         self.searchers = [
-            OpenSubtitlesSearcher(),
-            SubDivXSearcher(),
-            PodnapisiSearcher()
+            OpenSubtitlesSearcher(self.session),
+            SubDivXSearcher(self.session),
+            PodnapisiSearcher(self.session)
         ]
     
     def get_source_name(self) -> str:
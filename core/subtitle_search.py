@@ -3,16 +3,19 @@ Subtitle Search module for UCLV Downloader - Refactored to use searcher architec
 """
 
 import time
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
+
+import requests
+
 from .searchers import SimpleSubtitleSearcher
 
 
 class SubtitleSearchManager:
     """Manager for searching and downloading subtitles using the new searcher architecture"""
     
-    def __init__(self):
-        self.searcher = SimpleSubtitleSearcher()
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.searcher = SimpleSubtitleSearcher(session)
     
     def search_subtitles_for_videos(self, videos_without_subtitles: List[Tuple[str, str, str]], 
                                    language: str = 'spanish') -> Dict[str, List[Dict[str, Any]]]:
@@ -3,9 +3,10 @@ Utility classes for UCLV Downloader
 """
 
 import re
+import shutil
 import urllib.parse
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set
 
 
 class URLUtils:
@@ -110,4 +111,15 @@ class FileUtils:
             size /= 1024.0
             i += 1
         
-        return f"{size:.1f} {size_names[i]}" 
\ No newline at end of file
+        return f"{size:.1f} {size_names[i]}"
+    
+    @staticmethod
+    def get_free_space(path) -> Optional[int]:
+        """Get free bytes on the disk that holds path (or its nearest existing parent)"""
+        target = Path(path).expanduser().absolute()
+        while not target.exists() and target != target.parent:
+            target = target.parent
+        try:
+            return shutil.disk_usage(target).free
+        except OSError:
+            return None 
\ No newline at end of file
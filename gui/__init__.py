@@ -3,31 +3,37 @@ GUI module for UCLV Downloader
 
 This module provides modern graphical user interface components and main interface.
 Uses modular component architecture for better maintainability and design.
+
+Names are resolved on first access, so `import gui` does not build the
+interface (nor load tkinter and the download engine) until it is used.
 """
 
-from .interface import ModernGUIInterface, main
-from .components import (
-    HeaderComponent,
-    URLInputComponent,
-    FileTypeComponent, 
-    FileListComponent,
-    DownloadControlsComponent,
-    ProgressComponent,
-    ModernStyles
-)
+from core.lazy_imports import lazy_exports
 
-# Backward compatibility alias
-GUIInterface = ModernGUIInterface
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'ModernGUIInterface': '.interface',
+    'main': '.interface',
+    'HeaderComponent': '.components',
+    'URLInputComponent': '.components',
+    'FileTypeComponent': '.components',
+    'FileListComponent': '.components',
+    'DownloadControlsComponent': '.components',
+    'ProgressComponent': '.components',
+    'ModernStyles': '.components'
+}
 
 __all__ = [
     'ModernGUIInterface',
     'GUIInterface',  # For backward compatibility
-    'main',
-    'HeaderComponent',
-    'URLInputComponent',
-    'FileTypeComponent',
-    'FileListComponent', 
-    'DownloadControlsComponent',
-    'ProgressComponent',
-    'ModernStyles'
+    *_EXPORTS
 ]
+
+_getattr, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+
+def __getattr__(name: str):
+    # Backward compatibility alias
+    if name == 'GUIInterface':
+        name = 'ModernGUIInterface'
+    return _getattr(name)
@@ -9,24 +9,25 @@ This package contains modular components for the GUI interface:
 - DownloadComponent: Download path and controls
 - ProgressComponent: Progress bar and status
 - StatusComponent: Status messages and notifications
+
+Names are resolved on first access, so Tk-free submodules such as
+widgets.file_list_model can be imported without tkinter.
 """
 
-from .header import HeaderComponent
-from .url_input import URLInputComponent  
-from .file_types import FileTypeComponent
-from .file_list import FileListComponent
-from .download_controls import DownloadControlsComponent
-from .progress import ProgressComponent
-from .subtitle_search import SubtitleSearchComponent
-from .styling import ModernStyles
+from core.lazy_imports import lazy_exports
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'HeaderComponent': '.header',
+    'URLInputComponent': '.url_input',
+    'FileTypeComponent': '.file_types',
+    'FileListComponent': '.file_list',
+    'DownloadControlsComponent': '.download_controls',
+    'ProgressComponent': '.progress',
+    'SubtitleSearchComponent': '.subtitle_search',
+    'ModernStyles': '.styling'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'HeaderComponent',
-    'URLInputComponent', 
-    'FileTypeComponent',
-    'FileListComponent',
-    'DownloadControlsComponent',
-    'ProgressComponent',
-    'SubtitleSearchComponent',
-    'ModernStyles'
-] 
\ No newline at end of file
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
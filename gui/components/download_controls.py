@@ -12,17 +12,26 @@ from .styles import ModernStyles
 class DownloadControlsComponent:
     """Modern download controls component with path selection and action buttons"""
     
+    LIMIT_PRESETS = ("Sin límite", "100K", "250K", "500K", "1M", "2M", "5M")
+    
     def __init__(self, parent, on_download: Optional[Callable] = None, 
-                 on_cancel: Optional[Callable] = None):
+                 on_cancel: Optional[Callable] = None,
+                 on_pause: Optional[Callable] = None,
+                 on_enqueue: Optional[Callable] = None,
+                 on_limit_changed: Optional[Callable] = None):
         self.parent = parent
         self.on_download = on_download
         self.on_cancel = on_cancel
+        self.on_pause = on_pause
+        self.on_enqueue = on_enqueue
+        self.on_limit_changed = on_limit_changed
         self.frame = ttk.LabelFrame(parent, text="💾 Controles de descarga", 
                                    style='Section.TLabelframe', 
                                    padding=ModernStyles.get_spacing('lg'))
         
         # State variables
         self.download_path_var = tk.StringVar(value="./descarga")
+        self.limit_var = tk.StringVar(value=self.LIMIT_PRESETS[0])
         self.is_downloading = False
         
         # UI components
@@ -108,17 +117,33 @@ class DownloadControlsComponent:
                                     state=tk.DISABLED)
         self.cancel_btn.pack(side=tk.LEFT, padx=(0, ModernStyles.get_spacing('sm')))
         
-        # Pause/Resume button (for future enhancement)
+        # Pause/Resume button
         self.pause_btn = ttk.Button(main_buttons_frame, text="⏸️ Pausar",
                                    style='Warning.TButton',
                                    command=self._on_pause_clicked,
                                    state=tk.DISABLED)
         self.pause_btn.pack(side=tk.LEFT, padx=(0, ModernStyles.get_spacing('sm')))
         
+        # Add to persistent queue (works while another download is running)
+        self.enqueue_btn = ttk.Button(main_buttons_frame, text="➕ Añadir a la cola",
+                                     style='Secondary.TButton',
+                                     command=self._on_enqueue_clicked,
+                                     state=tk.DISABLED)
+        self.enqueue_btn.pack(side=tk.LEFT, padx=(0, ModernStyles.get_spacing('sm')))
+        
         # Secondary buttons (right side)
         secondary_buttons_frame = ttk.Frame(buttons_frame)
         secondary_buttons_frame.pack(side=tk.RIGHT)
         
+        # Bandwidth cap, editable while downloading (presets or values like 300K)
+        ttk.Label(secondary_buttons_frame, text="🚦 Límite:",
+                 style='Caption.TLabel').pack(side=tk.LEFT, padx=(0, ModernStyles.get_spacing('xs')))
+        self.limit_combo = ttk.Combobox(secondary_buttons_frame, textvariable=self.limit_var,
+                                        values=self.LIMIT_PRESETS, width=10)
+        self.limit_combo.pack(side=tk.LEFT, padx=(0, ModernStyles.get_spacing('md')))
+        self.limit_combo.bind('<<ComboboxSelected>>', lambda event: self._on_limit_changed())
+        self.limit_combo.bind('<Return>', lambda event: self._on_limit_changed())
+        
         # About button
         self.about_btn = ttk.Button(secondary_buttons_frame, text="ℹ️ Acerca de",
                                    style='Secondary.TButton',
@@ -208,10 +233,33 @@ class DownloadControlsComponent:
         if self.on_cancel:
             self.on_cancel()
     
+    def _on_enqueue_clicked(self):
+        """Handle add to queue button click"""
+        path = self.download_path_var.get().strip()
+        if not path:
+            messagebox.showerror("Error", "Por favor selecciona una carpeta de descarga")
+            return
+        
+        if self.on_enqueue:
+            self.on_enqueue(path)
+    
+    def _on_limit_changed(self):
+        """Handle a new bandwidth limit"""
+        if self.on_limit_changed:
+            self.on_limit_changed(self.limit_var.get().strip())
+    
+    def set_limit_text(self, text: str):
+        """Show the limit in effect"""
+        self.limit_var.set(text)
+    
     def _on_pause_clicked(self):
         """Handle pause/resume button click"""
-        # Future enhancement for pause/resume functionality
-        pass
+        if self.on_pause:
+            self.on_pause()
+    
+    def set_paused(self, paused: bool):
+        """Toggle the pause button between pause and resume"""
+        self.pause_btn.config(text="▶️ Reanudar" if paused else "⏸️ Pausar")
     
     def _show_about(self):
         """Show about dialog"""
@@ -251,10 +299,16 @@ Desarrollado con ❤️ usando Python y Tkinter
             self.pause_btn.config(state=tk.DISABLED, text="⏸️ Pausar")
             self.path_entry.config(state=tk.NORMAL)
     
+    def set_cancelling(self):
+        """Disable cancel/pause while the running download winds down"""
+        self.cancel_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.DISABLED, text="⏸️ Pausar")
+    
     def enable_download(self, enabled: bool = True):
         """Enable or disable download button"""
+        state = tk.NORMAL if enabled else tk.DISABLED
+        self.enqueue_btn.config(state=state)
         if not self.is_downloading:
-            state = tk.NORMAL if enabled else tk.DISABLED
             self.download_btn.config(state=state)
     
     def get_download_path(self) -> str:
@@ -2,7 +2,8 @@
 File List component for UCLV Downloader GUI with Individual File Selection
 """
 
-from typing import List, Tuple, Callable, Optional
+from typing import List, Tuple, Dict, Callable, Optional
+from core import FileUtils
 from .widgets import FileListModel, FileListView
 
 
@@ -34,27 +35,19 @@ class FileListComponent:
         # Setup view callbacks
         self.view.set_tree_click_callback(self._on_tree_click)
         
-        # Setup model callbacks for selection changes
-        self._setup_model_callbacks()
-    
-    def _setup_model_callbacks(self):
-        """Setup callbacks for model changes"""
-        # Add selection change callbacks to all file variables
-        for i in range(len(self.model.files_data)):
-            if i in self.model.file_vars:
-                self.model.add_selection_callback(i, lambda *args, idx=i: self._on_selection_changed_internal(idx))
+        # Setup model callback for selection changes (one call per click or bulk action)
+        self.model.add_selection_callback(self._on_selection_changed_internal)
     
     def set_files(self, files: List[Tuple[str, str, str]]):
         """Set files to display with individual selection"""
         self.model.set_files(files)
-        self._setup_model_callbacks()
         self._update_display()
         self._update_selection_stats()
     
     def _update_display(self):
         """Update view display from model"""
         # Update tree display
-        self.view.update_tree_display(self.model.files_data, self.model.file_vars)
+        self.view.update_tree_display(self.model.files_data, self.model.is_selected)
         
         # Update stats display
         stats = self.model.get_statistics()
@@ -71,6 +64,44 @@ class FileListComponent:
             
             self.view.update_stats_display(f"📊 {stats['total_count']} archivos encontrados: {' | '.join(type_summary)}")
     
+    def set_file_sizes(self, sizes: Dict[str, Tuple[int, bool]]):
+        """Show sizes resolved by URL; approximate listing sizes are prefixed with '~'"""
+        updated = self.model.set_file_sizes(sizes)
+        self.view.update_item_sizes({
+            index: f"{'' if exact else '~'}{FileUtils.format_file_size(size)}"
+            for index, (size, exact) in updated.items()
+        })
+    
+    def finish_size_resolution(self):
+        """Mark files whose size could not be resolved"""
+        self.view.update_item_sizes({
+            index: 'Desconocido'
+            for index in range(self.model.get_total_count())
+            if index not in self.model.file_sizes
+        })
+    
+    def get_selected_size(self) -> Tuple[int, int]:
+        """Get (known bytes, files without size) for the current selection"""
+        return self.model.get_selected_size()
+    
+    def show_size_summary(self, free_space: Optional[int] = None):
+        """Show selected bytes against free disk space"""
+        if self.model.get_total_count() == 0:
+            self.view.update_size_stats("")
+            return
+        
+        selected_size, unknown = self.model.get_selected_size()
+        text = f"💾 Seleccionado: {FileUtils.format_file_size(selected_size)}"
+        if unknown:
+            text += f" (+{unknown} sin calcular)"
+        style = 'Caption.TLabel'
+        if free_space is not None:
+            text += f" | Libre: {FileUtils.format_file_size(free_space)}"
+            if selected_size > free_space:
+                text += " ⚠️ Espacio insuficiente"
+                style = 'Error.TLabel'
+        self.view.update_size_stats(text, style)
+    
     def _on_tree_click(self, item, column, double_click=False):
         """Handle tree click events"""
         if not item:
@@ -85,14 +116,12 @@ class FileListComponent:
         
         # Toggle selection on checkbox column click or double-click
         if column == '#2' or double_click:  # Checkbox column or double-click
-            current_value = self.model.file_vars[file_index].get()
-            self.model.file_vars[file_index].set(not current_value)
-    
-    def _on_selection_changed_internal(self, file_index: int):
-        """Handle individual file selection change"""
-        # Update view
-        selected = self.model.file_vars[file_index].get()
-        self.view.update_item_selection(file_index, selected)
+            self.model.toggle_file_selection(file_index)
+    
+    def _on_selection_changed_internal(self, changed: List[int]):
+        """Handle a selection change of one file or of many after a bulk action"""
+        # Update only the rows that changed
+        self.view.update_items_selection({index: self.model.is_selected(index) for index in changed})
         
         # Update selection stats
         self._update_selection_stats()
@@ -135,6 +164,10 @@ class FileListComponent:
         """Get count of selected files"""
         return self.model.get_selected_count()
     
+    def get_selected_count_by_type(self, file_type: str) -> int:
+        """Get count of selected files of a type"""
+        return self.model.get_selected_count_by_type(file_type)
+    
     def has_selection(self) -> bool:
         """Check if any files are selected"""
         return self.model.has_selection()
@@ -152,6 +185,7 @@ class FileListComponent:
         self.model.clear_files()
         self._update_display()
         self._update_selection_stats()
+        self.view.update_size_stats("")
     
     def pack(self, **kwargs):
         """Pack the component"""
@@ -25,6 +25,9 @@ class FileTypeComponent:
             'info': {'var': tk.BooleanVar(value=False), 'icon': '📄', 'label': 'Info'}
         }
         
+        # Crawl subfolders (e.g. every season of a series)
+        self.recursive_var = tk.BooleanVar(value=False)
+        
         # File extensions info
         self.extensions_info = {
             'videos': ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm'],
@@ -109,6 +112,10 @@ class FileTypeComponent:
         ttk.Button(actions_frame, text="📝 Videos + Subtítulos",
                   style='Secondary.TButton',
                   command=self._videos_and_subtitles).pack(side=tk.LEFT)
+        
+        ttk.Checkbutton(actions_frame, text="📂 Incluir subcarpetas",
+                        variable=self.recursive_var,
+                        style='Modern.TCheckbutton').pack(side=tk.RIGHT)
     
     def _create_extensions_info(self, parent):
         """Create expandable extensions info"""
@@ -148,6 +155,7 @@ class FileTypeComponent:
         # Bind selection change events
         for key, data in self.file_types.items():
             data['var'].trace('w', self._on_selection_changed_internal)
+        self.recursive_var.trace('w', self._on_selection_changed_internal)
     
     def _on_selection_changed_internal(self, *args):
         """Handle internal selection changes"""
@@ -193,6 +201,10 @@ class FileTypeComponent:
             for key, data in self.file_types.items()
         }
     
+    def is_recursive(self) -> bool:
+        """Check if subfolders should be included"""
+        return self.recursive_var.get()
+    
     def set_selected_types(self, selections: Dict[str, bool]):
         """Set selected file types"""
         for key, selected in selections.items():
@@ -12,12 +12,12 @@ from .styling import ModernStyles
 class SubtitleSearchComponent:
     """Simplified subtitle search component using widget architecture"""
     
-    def __init__(self, parent, on_subtitles_selected: Optional[Callable] = None):
+    def __init__(self, parent, on_subtitles_selected: Optional[Callable] = None, session=None):
         self.parent = parent
         self.on_subtitles_selected = on_subtitles_selected
         
-        # Initialize managers and widgets
-        self.manager = SubtitleSearchManager()
+        # Initialize managers and widgets (sharing the downloader's HTTP session)
+        self.manager = SubtitleSearchManager(session)
         self.widget = SubtitleSearchWidget(parent, self.manager)
         
         # Store current videos for search
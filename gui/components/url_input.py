@@ -4,7 +4,6 @@ URL Input component for UCLV Downloader GUI
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
 from typing import Callable, Optional
 from .styles import ModernStyles
 from core import URLUtils
@@ -21,7 +20,6 @@ class URLInputComponent:
         
         # State variables
         self.url_var = tk.StringVar()
-        self.is_analyzing = False
         
         # UI components
         self.url_entry = None
@@ -168,35 +166,12 @@ class URLInputComponent:
             messagebox.showerror("Error", "URL inválida. Debe comenzar con http:// o https://")
             return
         
-        self._start_analysis(url)
+        # The handler runs the listing in the background and calls set_analyzing when done
+        if self.on_analysis_complete:
+            self.on_analysis_complete(url)
     
-    def _start_analysis(self, url: str):
-        """Start URL analysis in background thread"""
-        if self.is_analyzing:
-            return
-        
-        self.is_analyzing = True
-        self._update_analyzing_state(True)
-        
-        def analyze_thread():
-            try:
-                # Call the analysis callback if provided
-                if self.on_analysis_complete:
-                    self.on_analysis_complete(url)
-                
-            except Exception as e:
-                # Handle error in main thread
-                self.parent.after(0, lambda: self._handle_analysis_error(str(e)))
-            finally:
-                # Reset state in main thread
-                self.parent.after(0, lambda: self._update_analyzing_state(False))
-        
-        threading.Thread(target=analyze_thread, daemon=True).start()
-    
-    def _update_analyzing_state(self, analyzing: bool):
+    def set_analyzing(self, analyzing: bool):
         """Update UI state during analysis"""
-        self.is_analyzing = analyzing
-        
         if analyzing:
             self.analyze_btn.config(text="🔄 Analizando...", state=tk.DISABLED)
             self.status_label.config(text="🔍 Analizando URL y obteniendo lista de archivos...",
@@ -208,12 +183,6 @@ class URLInputComponent:
                                    style='Success.TLabel')
             self.url_entry.config(state=tk.NORMAL)
     
-    def _handle_analysis_error(self, error_msg: str):
-        """Handle analysis error"""
-        self.status_label.config(text=f"❌ Error: {error_msg}",
-                               style='Error.TLabel')
-        messagebox.showerror("Error de análisis", f"Error al analizar URL:\n{error_msg}")
-    
     def get_url(self) -> str:
         """Get the current URL"""
         return self.url_var.get().strip()
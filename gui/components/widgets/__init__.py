@@ -1,15 +1,20 @@
 """
 Widget Components for UCLV Downloader GUI
+
+Names are resolved on first access, so the Tk-free FileListModel can be
+imported (e.g. by benchmarks) without tkinter.
 """
 
-from .subtitle_search_widget import SubtitleSearchWidget
-from .subtitle_search_manager import SubtitleSearchManager
-from .file_list_model import FileListModel
-from .file_list_view import FileListView
-
-__all__ = [
-    'SubtitleSearchWidget',
-    'SubtitleSearchManager',
-    'FileListModel', 
-    'FileListView'
-] 
\ No newline at end of file
+from core.lazy_imports import lazy_exports
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'SubtitleSearchWidget': '.subtitle_search_widget',
+    'SubtitleSearchManager': '.subtitle_search_manager',
+    'FileListModel': '.file_list_model',
+    'FileListView': '.file_list_view'
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -2,43 +2,68 @@
 File List Model - Data management for file list component
 """
 
-import tkinter as tk
-from typing import List, Tuple, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Tuple, Dict, Any, Callable, Iterator
 
 
 class FileListModel:
     """Data model for file list with selection management"""
     
+    FILE_TYPES = ('video', 'subtitle', 'image', 'info', 'other')
+    
     def __init__(self):
         # Data storage
         self.files_data = []  # List of (filename, file_url, file_type)
-        self.file_vars = {}   # Dict of {index: BooleanVar} for checkboxes
+        self.selection = bytearray()  # One byte per file: 1 = selected (no Tk variable per file)
         self.file_info = {}   # Dict of {index: file_info} for additional data
+        self.file_sizes = {}  # Dict of {index: (size, exact)} once the size is known
+        self.url_index = {}   # Dict of {file_url: index} to apply sizes resolved by URL
+        
+        # Counts kept up to date on every change so stats never rescan the list
+        self.type_counts: Dict[str, int] = dict.fromkeys(self.FILE_TYPES, 0)
+        self.selected_type_counts: Dict[str, int] = dict.fromkeys(self.FILE_TYPES, 0)
+        self.selected_count = 0
+        self._type_masks: Dict[str, bytearray] = {}  # Dict of {type: selection with only that type}
         
+        # Called once per change (or bulk action) with the indices whose selection changed
+        self._selection_callbacks = []
+        self._batch_depth = 0
+        self._pending_changes: List[int] = []
+    
     def set_files(self, files: List[Tuple[str, str, str]]):
         """Set files to display with individual selection"""
         self.files_data = files
-        self.file_vars = {}
         self.file_info = {}
+        self.file_sizes = {}
+        self.url_index = {file_url: i for i, (_, file_url, _) in enumerate(files)}
+        
+        # All selected by default
+        self.selection = bytearray(b'\x01') * len(files)
+        
+        self.type_counts = dict.fromkeys(self.FILE_TYPES, 0)
+        for _, _, file_type in files:
+            self.type_counts[file_type] = self.type_counts.get(file_type, 0) + 1
+        self.selected_type_counts = dict(self.type_counts)
+        self.selected_count = len(files)
+        self._type_masks = {}
         
-        # Create BooleanVar for each file (all selected by default)
-        for i in range(len(files)):
-            var = tk.BooleanVar(value=True)
-            self.file_vars[i] = var
-            
         return self.files_data
     
+    def is_selected(self, index: int) -> bool:
+        """Check if a file is selected"""
+        return 0 <= index < len(self.selection) and self.selection[index] == 1
+    
     def get_selected_files(self) -> List[Tuple[str, str, str]]:
         """Get list of selected files"""
-        selected_files = []
-        for i, (filename, file_url, file_type) in enumerate(self.files_data):
-            if self.file_vars.get(i, tk.BooleanVar()).get():
-                selected_files.append((filename, file_url, file_type))
-        return selected_files
+        return [file for file, selected in zip(self.files_data, self.selection) if selected]
     
     def get_selected_count(self) -> int:
         """Get count of selected files"""
-        return len(self.get_selected_files())
+        return self.selected_count
+    
+    def get_selected_count_by_type(self, file_type: str) -> int:
+        """Get count of selected files of a type"""
+        return self.selected_type_counts.get(file_type, 0)
     
     def get_total_count(self) -> int:
         """Get total file count"""
@@ -46,58 +71,119 @@ class FileListModel:
     
     def has_selection(self) -> bool:
         """Check if any files are selected"""
-        return self.get_selected_count() > 0
+        return self.selected_count > 0
+    
+    @contextmanager
+    def batch_update(self) -> Iterator[None]:
+        """Coalesce every selection change made inside the block into one notification"""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._pending_changes:
+                changed, self._pending_changes = self._pending_changes, []
+                self._notify(changed)
+    
+    def _notify(self, changed: List[int]):
+        """Tell listeners which indices changed, or queue them while inside batch_update"""
+        if not changed:
+            return
+        if self._batch_depth:
+            self._pending_changes.extend(changed)
+            return
+        for callback in self._selection_callbacks:
+            callback(changed)
+    
+    def _count_change(self, index: int, selected: bool):
+        """Keep the counters in step with one flipped entry"""
+        delta = 1 if selected else -1
+        file_type = self.files_data[index][2]
+        self.selected_type_counts[file_type] = self.selected_type_counts.get(file_type, 0) + delta
+        self.selected_count += delta
     
     def set_file_selection(self, index: int, selected: bool):
         """Set selection state for a specific file"""
-        if index in self.file_vars:
-            self.file_vars[index].set(selected)
+        if not 0 <= index < len(self.selection):
+            return
+        value = 1 if selected else 0
+        if self.selection[index] != value:
+            self.selection[index] = value
+            self._count_change(index, selected)
+            self._notify([index])
+    
+    def toggle_file_selection(self, index: int):
+        """Flip the selection state of a specific file"""
+        self.set_file_selection(index, not self.is_selected(index))
+    
+    def _replace_selection(self, selection: bytearray):
+        """Swap in a whole new selection, updating counts and notifying only the changed rows"""
+        changed = [i for i, (old, new) in enumerate(zip(self.selection, selection)) if old != new]
+        self.selection = selection
+        for index in changed:
+            self._count_change(index, selection[index] == 1)
+        self._notify(changed)
+    
+    def _type_mask(self, file_type: str) -> bytearray:
+        """Selection that contains exactly the files of a type (built once per file list)"""
+        mask = self._type_masks.get(file_type)
+        if mask is None:
+            mask = bytearray(ftype == file_type for _, _, ftype in self.files_data)
+            self._type_masks[file_type] = mask
+        return mask
     
     def select_all(self):
         """Select all files"""
-        for var in self.file_vars.values():
-            var.set(True)
+        self._replace_selection(bytearray(b'\x01') * len(self.selection))
     
     def deselect_all(self):
         """Deselect all files"""
-        for var in self.file_vars.values():
-            var.set(False)
+        self._replace_selection(bytearray(len(self.selection)))
     
     def invert_selection(self):
         """Invert current selection"""
-        for var in self.file_vars.values():
-            var.set(not var.get())
+        self._replace_selection(self.selection.translate(bytes.maketrans(b'\x00\x01', b'\x01\x00')))
     
     def select_by_type(self, file_type: str):
         """Select only files of specific type"""
-        for i, (_, _, ftype) in enumerate(self.files_data):
-            self.file_vars[i].set(ftype == file_type)
+        self._replace_selection(bytearray(self._type_mask(file_type)))
+    
+    def set_file_sizes(self, sizes: Dict[str, Tuple[int, bool]]) -> Dict[int, Tuple[int, bool]]:
+        """Store sizes resolved by URL, returning them keyed by file index"""
+        updated = {}
+        for file_url, size in sizes.items():
+            index = self.url_index.get(file_url)
+            if index is not None:
+                self.file_sizes[index] = size
+                updated[index] = size
+        return updated
+    
+    def get_selected_size(self) -> Tuple[int, int]:
+        """Get (bytes of selected files with a known size, selected files without one)"""
+        total_size = 0
+        unknown = 0
+        for i, selected in enumerate(self.selection):
+            if not selected:
+                continue
+            if i in self.file_sizes:
+                total_size += self.file_sizes[i][0]
+            else:
+                unknown += 1
+        return total_size, unknown
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get file statistics"""
-        stats = {'video': 0, 'subtitle': 0, 'image': 0, 'info': 0, 'other': 0}
-        selected_stats = {'video': 0, 'subtitle': 0, 'image': 0, 'info': 0, 'other': 0}
-        
-        for i, (_, _, file_type) in enumerate(self.files_data):
-            stats[file_type] = stats.get(file_type, 0) + 1
-            
-            if self.file_vars.get(i, tk.BooleanVar()).get():
-                selected_stats[file_type] = selected_stats.get(file_type, 0) + 1
-        
         return {
-            'total': stats,
-            'selected': selected_stats,
-            'total_count': sum(stats.values()),
-            'selected_count': sum(selected_stats.values())
+            'total': dict(self.type_counts),
+            'selected': dict(self.selected_type_counts),
+            'total_count': len(self.files_data),
+            'selected_count': self.selected_count
         }
     
     def clear_files(self):
         """Clear all files"""
-        self.files_data = []
-        self.file_vars = {}
-        self.file_info = {}
+        self.set_files([])
     
-    def add_selection_callback(self, index: int, callback):
-        """Add callback for when a file selection changes"""
-        if index in self.file_vars:
-            self.file_vars[index].trace('w', callback) 
\ No newline at end of file
+    def add_selection_callback(self, callback: Callable[[List[int]], None]):
+        """Add callback for when the selection changes (receives the changed indices)"""
+        self._selection_callbacks.append(callback)
@@ -11,6 +11,18 @@ from ..styling import ModernStyles
 class FileListView:
     """View component for file list with tree display"""
     
+    # Rows inserted per event-loop turn; larger lists are rendered over several turns
+    RENDER_BATCH = 500
+    
+    # File type icons
+    ICONS = {
+        'video': '🎬',
+        'subtitle': '📝',
+        'image': '🖼️',
+        'info': '📄',
+        'other': '📄'
+    }
+    
     def __init__(self, parent):
         self.parent = parent
         self.frame = ttk.LabelFrame(parent, text="📋 Seleccionar archivos a descargar", 
@@ -21,6 +33,10 @@ class FileListView:
         self.tree = None
         self.stats_label = None
         self.selection_stats_label = None
+        self.size_stats_label = None
+        self.item_ids = {}  # Dict of {file index: tree item id}
+        self.size_texts = {}  # Dict of {file index: size text}, also for rows not inserted yet
+        self._render_job = None  # Pending after() id while a large list is being inserted
         
         # Event callbacks
         self.on_selection_changed = None
@@ -60,6 +76,11 @@ class FileListView:
         self.selection_stats_label = ttk.Label(stats_frame, text="",
                                               style='Heading.TLabel')
         self.selection_stats_label.grid(row=0, column=1, sticky=tk.E)
+        
+        # Selected size vs free disk space
+        self.size_stats_label = ttk.Label(stats_frame, text="",
+                                         style='Caption.TLabel')
+        self.size_stats_label.grid(row=1, column=0, columnspan=2, sticky=tk.W)
     
     def _create_selection_controls(self, parent):
         """Create selection control buttons"""
@@ -124,44 +145,68 @@ class FileListView:
         if item and self.on_tree_click:
             self.on_tree_click(item, None, double_click=True)
     
-    def update_tree_display(self, files_data: List[Tuple[str, str, str]], file_vars: dict):
-        """Update treeview display with files and selection state"""
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # File type icons
-        icons = {
-            'video': '🎬',
-            'subtitle': '📝', 
-            'image': '🖼️',
-            'info': '📄',
-            'other': '📄'
-        }
-        
-        # Add files with checkboxes
-        for i, (filename, file_url, file_type) in enumerate(files_data):
-            icon = icons.get(file_type, '📄')
-            selected = file_vars[i].get()
-            checkbox_icon = "☑️" if selected else "☐"
-            
-            # Insert item with data
-            item_id = self.tree.insert('', tk.END,
-                                      text=f"{icon} {filename}",
-                                      values=(checkbox_icon, file_type.title(), 'Calculando...'),
-                                      tags=(str(i),))
+    def update_tree_display(self, files_data: List[Tuple[str, str, str]], is_selected: Callable[[int], bool]):
+        """
+        Update treeview display with files and selection state
+        The first RENDER_BATCH rows appear right away and the rest are inserted from the event
+        loop, so the window stays responsive while folders with thousands of files load.
+        """
+        # Stop inserting rows of the previous list
+        if self._render_job is not None:
+            self.tree.after_cancel(self._render_job)
+            self._render_job = None
+        
+        # Clear existing items in a single call
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self.item_ids = {}
+        self.size_texts = {}
+        
+        self._insert_rows(files_data, is_selected, 0)
+    
+    def _insert_rows(self, files_data: List[Tuple[str, str, str]], is_selected: Callable[[int], bool],
+                     start: int):
+        """Insert one batch of rows and schedule the next one"""
+        self._render_job = None
+        end = min(start + self.RENDER_BATCH, len(files_data))
+        
+        # Add files with checkboxes; state changed while waiting is read at insert time
+        for i in range(start, end):
+            filename, _, file_type = files_data[i]
+            checkbox_icon = "☑️" if is_selected(i) else "☐"
+            self.item_ids[i] = self.tree.insert('', tk.END,
+                                               text=f"{self.ICONS.get(file_type, '📄')} {filename}",
+                                               values=(checkbox_icon, file_type.title(),
+                                                       self.size_texts.get(i, 'Calculando...')),
+                                               tags=(str(i),))
+        
+        if end < len(files_data):
+            self._render_job = self.tree.after(1, self._insert_rows, files_data, is_selected, end)
+    
+    def is_rendering(self) -> bool:
+        """Check if rows are still being inserted"""
+        return self._render_job is not None
+    
+    def update_item_sizes(self, sizes: dict):
+        """Update the size column for {file index: size text}"""
+        self.size_texts.update(sizes)
+        for index, size_text in sizes.items():
+            item_id = self.item_ids.get(index)
+            if item_id is not None:
+                self.tree.set(item_id, 'Tamaño', size_text)
     
     def update_item_selection(self, item_index: int, selected: bool):
         """Update selection display for a specific item"""
-        # Find the item with the matching tag
-        for item in self.tree.get_children():
-            tags = self.tree.item(item, 'tags')
-            if tags and int(tags[0]) == item_index:
-                checkbox_icon = "☑️" if selected else "☐"
-                current_values = list(self.tree.item(item, 'values'))
-                current_values[0] = checkbox_icon
-                self.tree.item(item, values=current_values)
-                break
+        self.update_items_selection({item_index: selected})
+    
+    def update_items_selection(self, selection: dict):
+        """Update the checkbox column for {file index: selected}"""
+        for index, selected in selection.items():
+            # Rows not inserted yet pick up the state when they are rendered
+            item_id = self.item_ids.get(index)
+            if item_id is not None:
+                self.tree.set(item_id, 'Seleccionar', "☑️" if selected else "☐")
     
     def update_stats_display(self, stats_text: str):
         """Update main statistics display"""
@@ -183,6 +228,10 @@ class FileListView:
             self.selection_stats_label.config(text=f"📊 {selected_count} de {total_count} seleccionados", 
                                              style='Heading.TLabel')
     
+    def update_size_stats(self, size_text: str, style: str = 'Caption.TLabel'):
+        """Update selected size / free space summary"""
+        self.size_stats_label.config(text=size_text, style=style)
+    
     def set_selection_changed_callback(self, callback: Callable):
         """Set callback for selection changes"""
         self.on_selection_changed = callback
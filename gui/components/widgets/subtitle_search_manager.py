@@ -10,7 +10,8 @@ from typing import Dict, List, Any, Optional, Tuple, Callable
 class SubtitleSearchManager:
     """Manages subtitle search operations and state"""
     
-    def __init__(self):
+    def __init__(self, session=None):
+        self.session = session
         self.is_searching = False
         self.search_results = {}
         self.selected_subtitles = {}
@@ -38,7 +39,7 @@ class SubtitleSearchManager:
                 # Import here to avoid circular imports
                 from core.subtitle_search import SubtitleSearchManager as CoreManager
                 
-                search_manager = CoreManager()
+                search_manager = CoreManager(self.session)
                 
                 # Update status
                 if status_callback:
@@ -18,6 +18,7 @@ from .components import (
 )
 from .managers import (
     ScrollManager,
+    TaskRunner,
     DownloadManager,
     EventManager,
     UIStateManager
@@ -31,6 +32,7 @@ class ModernGUIInterface:
         # Initialize managers
         self.ui_state = UIStateManager(self)
         self.scroll_manager = None
+        self.task_runner = None
         self.download_manager = None
         self.event_manager = None
         
@@ -55,6 +57,7 @@ class ModernGUIInterface:
     def _initialize_managers(self):
         """Initialize managers that need the GUI reference"""
         self.scroll_manager = ScrollManager(self.root)
+        self.task_runner = TaskRunner(self.root)
         self.download_manager = DownloadManager(self)
         self.event_manager = EventManager(self)
     
@@ -83,13 +86,17 @@ class ModernGUIInterface:
         
         self.subtitle_search = SubtitleSearchComponent(
             self.scrollable_frame,
-            on_subtitles_selected=self.event_manager.on_subtitles_selected
+            on_subtitles_selected=self.event_manager.on_subtitles_selected,
+            session=self.download_manager.downloader.session
         )
         
         self.download_controls = DownloadControlsComponent(
             self.scrollable_frame,
             on_download=self.event_manager.on_download_started,
-            on_cancel=self.event_manager.on_download_cancelled
+            on_cancel=self.event_manager.on_download_cancelled,
+            on_pause=self.event_manager.on_download_paused,
+            on_enqueue=self.event_manager.on_files_enqueued,
+            on_limit_changed=self.event_manager.on_bandwidth_limit_changed
         )
         
         self.progress = ProgressComponent(self.scrollable_frame)
@@ -3,12 +3,17 @@ GUI Managers - Specialized managers for GUI functionality
 """
 
 from .scroll_manager import ScrollManager
+from .progress_poller import ProgressPoller
+from .task_runner import TaskRunner, Task
 from .download_manager import DownloadManager  
 from .event_manager import EventManager
 from .ui_state_manager import UIStateManager
 
 __all__ = [
     'ScrollManager',
+    'ProgressPoller',
+    'TaskRunner',
+    'Task',
     'DownloadManager', 
     'EventManager',
     'UIStateManager'
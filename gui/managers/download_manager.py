@@ -4,10 +4,12 @@ Download Manager - Handles all download-related functionality
 
 import threading
 from pathlib import Path
-from typing import List, Tuple, Dict, Any, Optional
+from typing import List, Tuple, Dict, Any, Optional, Callable
 from tkinter import messagebox
 
 from core import UCLVDownloader
+from core.downloaders import CancellationToken, DownloadQueue, QueueWorker
+from .progress_poller import ProgressPoller
 
 
 class DownloadManager:
@@ -18,11 +20,21 @@ class DownloadManager:
         self.downloader = UCLVDownloader()
         self.download_thread: Optional[threading.Thread] = None
         self.is_downloading = False
+        self.cancel_token: Optional[CancellationToken] = None
         
-        # Progress tracking
-        self._current_file_index = 0
-        self._total_files = 0
-        self._completed_files = 0
+        # Workers only write into the shared tracker; the poller renders it on the Tk thread
+        self.progress_poller = ProgressPoller(gui_interface)
+        
+        # Persistent queue drained in the background by its own engine (separate progress,
+        # shared connection pool and listing cache)
+        self.queue = DownloadQueue()
+        queue_downloader = UCLVDownloader(session=self.downloader.session,
+                                          listing_cache=self.downloader.listing_cache,
+                                          bandwidth=self.downloader.bandwidth)
+        self.queue_worker = QueueWorker(queue_downloader, self.queue,
+                                        on_item_changed=self._on_queue_item_changed)
+        if self.queue.has_work():
+            self.queue_worker.start()
     
     def configure_downloader(self, selected_types):
         """Configure downloader based on file type selections"""
@@ -33,9 +45,53 @@ class DownloadManager:
             info=selected_types.get('info', False)
         )
     
-    def get_file_list(self, url: str) -> List[Tuple[str, str, str]]:
-        """Get file list from URL"""
-        return self.downloader.get_file_list(url)
+    def get_file_list(self, url: str, recursive: bool = False,
+                      revalidate: bool = True) -> List[Tuple[str, str, str]]:
+        """Get file list from URL (optionally crawling subfolders)"""
+        return self.downloader.get_file_list(url, recursive=recursive, revalidate=revalidate)
+    
+    def resolve_sizes(self, files: List[Tuple[str, str, str]],
+                      on_batch: Callable[[Dict[str, Tuple[int, bool]]], None],
+                      on_done: Callable[[], None]):
+        """Resolve file sizes in the background, delivering each batch on the Tk thread"""
+        runner = self.gui.task_runner
+        
+        def worker(task):
+            # A newer listing cancels this task, which stops the lookups and drops pending batches
+            deliver = lambda batch: runner.post(on_batch, batch, task=task)
+            self.downloader.resolve_sizes(files, deliver, task.is_cancelled)
+        
+        runner.submit(worker, channel='sizes', pass_task=True,
+                      on_success=lambda _: on_done(), on_error=lambda _: on_done())
+    
+    def cancel_size_resolution(self):
+        """Stop delivering sizes for the current listing"""
+        self.gui.task_runner.cancel('sizes')
+    
+    def enqueue_files(self, files: List[Tuple[str, str, str]], download_path: str) -> int:
+        """Add files to the persistent queue and make sure the queue worker runs"""
+        added = self.queue.add_files(files, download_path)
+        if not self.queue_worker.is_running:
+            self.queue_worker.start()
+        self.queue_worker.wake()
+        return len(added)
+    
+    def _on_queue_item_changed(self, item: Dict[str, Any]):
+        """Report queue progress (called from the queue worker thread)"""
+        if item['state'] not in (DownloadQueue.DONE, DownloadQueue.FAILED):
+            return
+        counts = self.queue.counts()
+        waiting = counts[DownloadQueue.PENDING] + counts[DownloadQueue.PARTIAL] + counts[DownloadQueue.ACTIVE]
+        status = f"📋 Cola: {waiting} pendientes, {counts[DownloadQueue.DONE]} completados"
+        if counts[DownloadQueue.FAILED]:
+            status += f", {counts[DownloadQueue.FAILED]} fallidos"
+        self.gui.task_runner.post(self.gui.url_input.set_status, status, 'normal')
+    
+    def shutdown(self):
+        """Stop background work before the window closes (running queue items stay partial)"""
+        self.cancel_size_resolution()
+        self.queue_worker.stop(wait=True, timeout=2)
+        self.queue.close()
     
     def start_download(self, download_path: str, selected_files: List[Tuple[str, str, str]], 
                       external_subtitles: Dict[str, Dict[str, Any]] = None):
@@ -48,11 +104,17 @@ class DownloadManager:
         
         # Start download in background thread
         self.is_downloading = True
+        self.cancel_token = CancellationToken()
         self.gui.ui_state.set_download_state(True)
         
+        self.downloader.progress.reset()
+        self.progress_poller.start(self.downloader.progress)
+        
+        # Widgets are only read here on the Tk thread; the worker gets plain values
+        url = self.gui.url_input.get_url()
         self.download_thread = threading.Thread(
             target=self._download_worker,
-            args=(download_path, selected_files, external_subtitles),
+            args=(url, download_path, selected_files, external_subtitles, self.cancel_token),
             daemon=True
         )
         self.download_thread.start()
@@ -64,47 +126,53 @@ class DownloadManager:
         
         # Ask for confirmation
         if messagebox.askyesno("Cancelar descarga", "¿Estás seguro de que quieres cancelar la descarga?"):
-            self.is_downloading = False
-            self.gui.ui_state.set_download_state(False)
-            
-            # Update progress
-            self.gui.progress.set_status("❌ Descarga cancelada", 'cancelled')
-            messagebox.showinfo("Cancelado", "Descarga cancelada por el usuario")
+            # The worker stops at its next chunk and reports back through _download_completed
+            self.request_cancel()
+            self.progress_poller.stop(render=False)
+            self.gui.download_controls.set_cancelling()
+            self.gui.progress.set_status("⏹️ Cancelando descarga...", 'cancelled')
     
-    def _download_worker(self, download_path: str, selected_files: List[Tuple[str, str, str]], 
-                        external_subtitles: Dict[str, Dict[str, Any]]):
+    def request_cancel(self):
+        """Stop the running download without asking (partial files are kept)"""
+        if self.cancel_token:
+            self.cancel_token.cancel()
+    
+    def set_bandwidth_limit(self, limit: float):
+        """Cap the combined speed of the download and the queue (bytes/s, 0 = unlimited)"""
+        # Both downloaders share one limiter, so running transfers slow down right away
+        self.downloader.set_bandwidth_limit(limit)
+    
+    def toggle_pause(self) -> bool:
+        """Pause or resume the running download; returns True if now paused"""
+        if not self.is_downloading or not self.cancel_token or self.cancel_token.is_cancelled:
+            return False
+        
+        if self.cancel_token.is_paused:
+            self.cancel_token.resume()
+            self.gui.progress.set_status("Reanudando descarga...", 'downloading')
+            return False
+        
+        # Workers block between chunks; their connections and the session pool stay alive
+        self.cancel_token.pause()
+        self.gui.progress.set_status("⏸️ Descarga en pausa", 'paused')
+        return True
+    
+    def _download_worker(self, url: str, download_path: str, selected_files: List[Tuple[str, str, str]],
+                        external_subtitles: Dict[str, Dict[str, Any]],
+                        cancel_token: CancellationToken):
         """Background download worker with external subtitle support"""
         try:
-            # Track progress across files
-            self._current_file_index = 0
-            total_items = len(selected_files) + len(external_subtitles)
-            self._total_files = total_items
-            self._completed_files = 0
-            
-            def progress_callback(downloaded, total, filename):
-                # Calculate file progress percentage
-                file_progress = (downloaded / total * 100) if total > 0 else 0
-                
-                # Update UI in main thread
-                self.gui.root.after(0, lambda: self.gui.progress.set_progress(file_progress))
-                self.gui.root.after(0, lambda: self.gui.progress.set_current_file(filename))
-                self.gui.root.after(0, lambda: self.gui.progress.update_stats(
-                    downloaded=self._completed_files, 
-                    total=self._total_files
-                ))
-                self.gui.root.after(0, lambda: self.gui.progress.set_status(
-                    f"Descargando archivo {self._completed_files + 1} de {self._total_files}: {filename}", 'downloading'))
-            
-            # Start download with selected files
-            url = self.gui.url_input.get_url()
-            result = self.downloader.download_selected_files(selected_files, url, download_path, progress_callback)
+            # Start download with selected files; progress is read from the tracker by the poller
+            result = self.downloader.download_selected_files(selected_files, url, download_path,
+                                                             cancel_token=cancel_token)
             
             # Download external subtitles if any were selected
-            if external_subtitles:
-                self.gui.root.after(0, lambda: self.gui.progress.set_status("Descargando subtítulos externos...", 'downloading'))
+            if external_subtitles and not cancel_token.is_cancelled:
+                self.gui.task_runner.post(self.progress_poller.stop)
+                self.gui.task_runner.post(self.gui.progress.set_status, "Descargando subtítulos externos...", 'downloading')
                 
                 from core.subtitle_search import SubtitleSearchManager
-                search_manager = SubtitleSearchManager()
+                search_manager = SubtitleSearchManager(self.downloader.session)
                 
                 subtitle_results = search_manager.download_selected_subtitles(
                     external_subtitles, Path(download_path)
@@ -122,17 +190,25 @@ class DownloadManager:
                 result['total'] += len(external_subtitles)
             
             # Handle completion in main thread
-            self.gui.root.after(0, lambda: self._download_completed(result))
+            self.gui.task_runner.post(self._download_completed, result)
             
         except Exception as e:
             # Handle error in main thread
-            self.gui.root.after(0, lambda: self._download_error(str(e)))
+            self.gui.task_runner.post(self._download_error, str(e))
     
     def _download_completed(self, result):
         """Handle download completion"""
+        self.progress_poller.stop()
         self.is_downloading = False
+        self.cancel_token = None
         self.gui.ui_state.set_download_state(False)
         
+        if result.get('cancelled'):
+            self.gui.progress.set_status("❌ Descarga cancelada", 'cancelled')
+            messagebox.showinfo("Cancelado", f"Descarga cancelada por el usuario\n\n✅ Completados: {result.get('completed', 0)}\n"
+                                "Los archivos parciales se reanudarán en la próxima descarga")
+            return
+        
         # Update progress
         if result.get('success', False):
             self.gui.progress.animate_success()
@@ -155,7 +231,9 @@ class DownloadManager:
     
     def _download_error(self, error_msg: str):
         """Handle download error"""
+        self.progress_poller.stop(render=False)
         self.is_downloading = False
+        self.cancel_token = None
         self.gui.ui_state.set_download_state(False)
         
         # Update progress
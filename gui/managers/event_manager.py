@@ -5,7 +5,8 @@ Event Manager - Handles all GUI event bindings and callbacks
 from typing import List, Tuple, Dict, Any
 from tkinter import messagebox
 
-from core import URLUtils
+from core import URLUtils, FileUtils
+from core.downloaders import parse_rate
 
 
 class EventManager:
@@ -36,41 +37,75 @@ class EventManager:
         if self.gui.download_manager.is_downloading:
             self.on_download_cancelled()
     
-    def on_url_analysis(self, url: str):
+    def on_url_analysis(self, url: str, revalidate: bool = True):
+        """Start analyzing a URL; the listing runs on the task runner and replaces any analysis in flight"""
+        # Read the Tk state here, on the main thread; the worker only fetches the listing
+        selected_types = self.gui.file_types.get_selected_types()
+        self.gui.download_manager.configure_downloader(selected_types)
+        recursive = self.gui.file_types.is_recursive()
+        
+        # Sizes of the previous listing no longer apply
+        self.gui.download_manager.cancel_size_resolution()
+        self.gui.url_input.set_analyzing(True)
+        
+        self.gui.task_runner.submit(
+            self.gui.download_manager.get_file_list, url, recursive, revalidate,
+            channel='analysis',
+            on_success=self._on_files_listed,
+            on_error=self._on_analysis_error
+        )
+    
+    def _on_files_listed(self, files: List[Tuple[str, str, str]]):
         """Handle URL analysis completion"""
-        try:
-            # Configure downloader based on file type selections
-            selected_types = self.gui.file_types.get_selected_types()
-            self.gui.download_manager.configure_downloader(selected_types)
-            
-            # Get file list
-            files = self.gui.download_manager.get_file_list(url)
-            
-            # Update file list component
-            self.gui.file_list.set_files(files)
-            
-            # Enable download if files found
-            if files:
-                self.gui.download_controls.enable_download(True)
-                self.gui.url_input.set_status(f"✅ Encontrados {len(files)} archivos", 'success')
-            else:
-                self.gui.download_controls.enable_download(False)
-                self.gui.url_input.set_status("⚠️ No se encontraron archivos del tipo seleccionado", 'warning')
-            
-        except Exception as e:
-            # Handle analysis error
-            self.gui.file_list.clear_files()
+        self.gui.url_input.set_analyzing(False)
+        
+        # Update file list component
+        self.gui.file_list.set_files(files)
+        
+        # Fill the size column while the user reviews the list
+        if files:
+            self.gui.download_manager.resolve_sizes(files, self._on_sizes_resolved,
+                                                    self._on_size_resolution_done)
+        self._update_size_summary()
+        
+        # Enable download if files found
+        if files:
+            self.gui.download_controls.enable_download(True)
+            self.gui.url_input.set_status(f"✅ Encontrados {len(files)} archivos", 'success')
+        else:
             self.gui.download_controls.enable_download(False)
-            self.gui.url_input.set_status(f"❌ Error: {str(e)}", 'error')
-            messagebox.showerror("Error de análisis", f"Error al analizar URL:\n{e}")
+            self.gui.url_input.set_status("⚠️ No se encontraron archivos del tipo seleccionado", 'warning')
+    
+    def _on_analysis_error(self, error: Exception):
+        """Handle analysis error"""
+        self.gui.url_input.set_analyzing(False)
+        self.gui.file_list.clear_files()
+        self.gui.download_controls.enable_download(False)
+        self.gui.url_input.set_status(f"❌ Error: {str(error)}", 'error')
+        messagebox.showerror("Error de análisis", f"Error al analizar URL:\n{error}")
+    
+    def _on_sizes_resolved(self, sizes: Dict[str, Tuple[int, bool]]):
+        """Handle a batch of resolved file sizes"""
+        self.gui.file_list.set_file_sizes(sizes)
+        self._update_size_summary()
+    
+    def _on_size_resolution_done(self):
+        """Handle the end of size resolution"""
+        self.gui.file_list.finish_size_resolution()
+        self._update_size_summary()
+    
+    def _update_size_summary(self):
+        """Show selected size against free space on the download disk"""
+        free_space = FileUtils.get_free_space(self.gui.download_controls.get_download_path())
+        self.gui.file_list.show_size_summary(free_space)
     
     def on_file_type_changed(self, selected_types):
         """Handle file type selection changes"""
         # Re-analyze if URL is present
         url = self.gui.url_input.get_url()
         if url and URLUtils.is_valid_url(url):
-            # Trigger re-analysis with new file types
-            self.on_url_analysis(url)
+            # Re-filter the cached listing in memory; only missing folders hit the server
+            self.on_url_analysis(url, revalidate=False)
     
     def on_file_selection_changed(self, selected_files):
         """Handle individual file selection changes"""
@@ -80,6 +115,7 @@ class EventManager:
         
         # Check for videos without subtitles
         self._check_for_videos_without_subtitles(selected_files)
+        self._update_size_summary()
         
         # Update status
         if len(selected_files) == 0:
@@ -122,6 +158,40 @@ class EventManager:
         """Handle download cancellation"""
         self.gui.download_manager.cancel_download()
     
+    def on_files_enqueued(self, download_path: str):
+        """Handle adding the selected files to the persistent queue"""
+        selected_files = self.gui.file_list.get_selected_files()
+        if not selected_files:
+            messagebox.showwarning("Sin selección", "Selecciona al menos un archivo para añadir a la cola.")
+            return
+        
+        added = self.gui.download_manager.enqueue_files(selected_files, download_path)
+        skipped = len(selected_files) - added
+        message = f"➕ {added} archivos añadidos a la cola"
+        if skipped:
+            message += f" ({skipped} ya estaban en cola)"
+        self.gui.url_input.set_status(message, 'success')
+    
+    def on_bandwidth_limit_changed(self, text: str):
+        """Apply a bandwidth limit typed or picked in the download controls"""
+        try:
+            limit = parse_rate(text) if text != "Sin límite" else 0
+        except ValueError:
+            messagebox.showerror("Límite inválido", "Usa valores como 500K, 1.5M o 0 para no limitar.")
+            return
+        
+        self.gui.download_manager.set_bandwidth_limit(limit)
+        if limit:
+            self.gui.url_input.set_status(f"🚦 Límite de descarga: {FileUtils.format_file_size(limit)}/s", 'normal')
+        else:
+            self.gui.download_controls.set_limit_text("Sin límite")
+            self.gui.url_input.set_status("🚦 Descarga sin límite de velocidad", 'normal')
+    
+    def on_download_paused(self):
+        """Handle pause/resume toggle"""
+        paused = self.gui.download_manager.toggle_pause()
+        self.gui.download_controls.set_paused(paused)
+    
     def on_subtitles_selected(self, selected_subtitles: Dict[str, Dict[str, Any]]):
         """Handle subtitle selection from the search component"""
         # Get current download configuration
@@ -147,11 +217,26 @@ class EventManager:
         
         confirm_msg = f"¿Descargar {file_count} archivo{'s' if file_count > 1 else ''}?\n\n{type_summary}\n\nCarpeta: {download_path}"
         
+        # Disk usage estimate from the sizes resolved so far
+        selected_size, unknown = self.gui.file_list.get_selected_size()
+        confirm_msg += f"\nTamaño: {FileUtils.format_file_size(selected_size)}"
+        if unknown:
+            confirm_msg += f" (+{unknown} sin calcular)"
+        free_space = FileUtils.get_free_space(download_path)
+        if free_space is not None:
+            confirm_msg += f"\nEspacio libre: {FileUtils.format_file_size(free_space)}"
+            if selected_size > free_space:
+                confirm_msg += "\n\n⚠️ No hay suficiente espacio libre en el disco"
+        
         return messagebox.askyesno("Confirmar descarga", confirm_msg)
     
     def _check_for_videos_without_subtitles(self, selected_files: List[Tuple[str, str, str]]):
         """Check if there are videos without corresponding subtitles"""
-        videos_without_subtitles = self.gui.download_manager.get_videos_without_subtitles(selected_files)
+        # The per-type counters answer the common "no videos selected" case without matching names
+        if self.gui.file_list.get_selected_count_by_type('video') == 0:
+            videos_without_subtitles = []
+        else:
+            videos_without_subtitles = self.gui.download_manager.get_videos_without_subtitles(selected_files)
         
         if videos_without_subtitles:
             # Show a subtle hint that external subtitles can be searched
@@ -175,7 +260,13 @@ class EventManager:
         if self.gui.download_manager.is_downloading:
             if messagebox.askyesno("Cerrar aplicación", 
                                  "Hay una descarga en progreso. ¿Quieres cerrar la aplicación?"):
+                # Workers stop at their next chunk and keep the .part files for later
+                self.gui.download_manager.request_cancel()
                 self.gui.download_manager.is_downloading = False
+                self.gui.download_manager.shutdown()
+                self.gui.task_runner.shutdown()
                 self.gui.root.destroy()
         else:
+            self.gui.download_manager.shutdown()
+            self.gui.task_runner.shutdown()
             self.gui.root.destroy() 
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Progress Poller - Renders download progress on the Tk main loop at a fixed rate
+"""
+
+from typing import Optional
+
+from core import FileUtils
+
+
+class ProgressPoller:
+    """Periodically renders the latest DownloadProgress snapshot instead of one Tk event per chunk"""
+    
+    def __init__(self, gui_interface, interval_ms: int = 66):
+        self.gui = gui_interface
+        self.interval_ms = interval_ms
+        self.progress = None
+        self._after_id = None
+        self._last_version = None
+    
+    def start(self, progress):
+        """Start rendering a progress tracker (~15 times per second)"""
+        self.stop(render=False)
+        self.progress = progress
+        self._last_version = None
+        self._poll()
+    
+    def stop(self, render: bool = True):
+        """Stop polling, optionally rendering the final state once"""
+        if self._after_id is not None:
+            self.gui.root.after_cancel(self._after_id)
+            self._after_id = None
+        if render and self.progress is not None:
+            self._render(self.progress.snapshot())
+        self.progress = None
+    
+    def _poll(self):
+        """Render the latest snapshot and schedule the next poll"""
+        snapshot = self.progress.snapshot()
+        # Speed and ETA decay while stalled, so refresh them even without new bytes
+        self._render(snapshot)
+        self._after_id = self.gui.root.after(self.interval_ms, self._poll)
+    
+    def _render(self, snapshot):
+        """Push a snapshot into the progress component"""
+        progress = self.gui.progress
+        if snapshot['version'] != self._last_version:
+            self._last_version = snapshot['version']
+            progress.set_progress(snapshot['percentage'])
+            
+            filename = snapshot['current_file']
+            if filename:
+                active = len(snapshot['active_files'])
+                progress.set_current_file(filename if active <= 1 else f"{filename} (+{active - 1})")
+                position = min(snapshot['completed_files'] + snapshot['failed_files'] + 1,
+                               snapshot['total_files'])
+                progress.set_status(
+                    f"Descargando archivo {position} de {snapshot['total_files']}: {filename}", 'downloading')
+        
+        speed = snapshot['speed']
+        progress.update_stats(
+            downloaded=snapshot['completed_files'],
+            total=snapshot['total_files'],
+            speed=f"{FileUtils.format_file_size(int(speed))}/s" if speed > 0 else "--",
+            eta=self.format_eta(snapshot['eta']),
+            errors=snapshot['failed_files']
+        )
+    
+    @staticmethod
+    def format_eta(seconds: Optional[float]) -> str:
+        """Format remaining seconds as '1h 02m', '3m 05s' or '42s'"""
+        if seconds is None:
+            return "--"
+        seconds = int(seconds)
+        hours, remainder = divmod(seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        if hours:
+            return f"{hours}h {minutes:02d}m"
+        if minutes:
+            return f"{minutes}m {seconds:02d}s"
+        return f"{seconds}s"
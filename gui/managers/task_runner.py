@@ -0,0 +1,129 @@
+"""
+Task Runner - Runs blocking work off the Tk thread and delivers results on the main loop
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class Task:
+    """Handle for one background job; a cancelled task never reaches its callbacks"""
+    
+    def __init__(self, channel: Optional[str] = None):
+        self.channel = channel
+        self.future = None
+        self._cancelled = threading.Event()
+    
+    def cancel(self):
+        """Drop the task (it stops before starting, or its results are discarded)"""
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+    
+    def is_cancelled(self) -> bool:
+        """Check if the task was cancelled or superseded (safe to poll from the worker)"""
+        return self._cancelled.is_set()
+
+
+class TaskRunner:
+    """
+    Shared executor for GUI background jobs
+    Workers never touch Tk: results go through a thread-safe queue that the main loop drains
+    with after(). Jobs submitted on the same channel supersede each other, so clicking
+    Analizar twice cancels the first listing instead of racing it.
+    """
+    
+    def __init__(self, root, max_workers: int = 4, poll_ms: int = 30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='uclv-gui')
+        self._results: 'queue.Queue' = queue.Queue()
+        self._channels: Dict[str, Task] = {}
+        self._after_id = None
+        self._closed = False
+        self._drain()
+    
+    def submit(self, func: Callable, *args, channel: Optional[str] = None,
+               on_success: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               pass_task: bool = False) -> Task:
+        """
+        Run func(*args) on the executor (call from the Tk thread)
+        Args:
+            channel: Name of the job kind; the previous task on the same channel is cancelled
+            on_success: Called on the Tk thread with the return value
+            on_error: Called on the Tk thread with the exception
+            pass_task: Pass the Task as the first argument so the job can poll is_cancelled()
+                       and post() partial results
+        """
+        task = Task(channel)
+        if channel is not None:
+            self.cancel(channel)
+            self._channels[channel] = task
+        if self._closed:
+            task.cancel()
+            return task
+        
+        def run():
+            if task.is_cancelled():
+                return
+            try:
+                result = func(task, *args) if pass_task else func(*args)
+            except Exception as e:
+                if on_error:
+                    self.post(on_error, e, task=task)
+            else:
+                if on_success:
+                    self.post(on_success, result, task=task)
+            finally:
+                self.post(self._forget, task)
+        
+        task.future = self._executor.submit(run)
+        return task
+    
+    def post(self, callback: Callable, *args, task: Optional[Task] = None):
+        """Schedule callback(*args) on the Tk thread (safe from any thread); skipped if task is cancelled"""
+        self._results.put((task, callback, args))
+    
+    def cancel(self, channel: str):
+        """Cancel the running task of a channel, if any"""
+        task = self._channels.pop(channel, None)
+        if task is not None:
+            task.cancel()
+    
+    def _forget(self, task: Task):
+        """Release the channel slot of a finished task (unless it was already superseded)"""
+        if task.channel is not None and self._channels.get(task.channel) is task:
+            del self._channels[task.channel]
+    
+    def _drain(self):
+        """Run every delivered callback, then check the queue again after poll_ms"""
+        while True:
+            try:
+                task, callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None and task.is_cancelled():
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"⚠️ Error en tarea de la interfaz: {e}")
+        
+        if not self._closed:
+            self._after_id = self.root.after(self.poll_ms, self._drain)
+    
+    def shutdown(self):
+        """Cancel every task and stop draining (workers still running finish in the background)"""
+        self._closed = True
+        for channel in list(self._channels):
+            self.cancel(channel)
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._executor.shutdown(wait=False)
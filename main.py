@@ -8,6 +8,8 @@ import sys
 import argparse
 from pathlib import Path
 
+from cli.batch import BatchCLI
+
 
 def main():
     """Main launcher that chooses between CLI and GUI"""
@@ -22,7 +24,11 @@ Ejemplos:
   python main.py --cli             # Usar interfaz de línea de comandos
   python main.py --gui             # Usar interfaz gráfica (explícito)
   python main.py --help            # Mostrar esta ayuda
-        """
+  python main.py list URL -r --json                 # Listar sin interacción
+  python main.py download URL -t video -o Serie     # Descargar sin preguntas
+  python main.py mirror URL -x '*sample*'           # Replicar carpeta y subcarpetas
+  python main.py queue add URL/ && python main.py queue run
+        """ + BatchCLI.EXIT_CODES_HELP
     )
     
     interface_group = parser.add_mutually_exclusive_group()
@@ -43,8 +49,15 @@ Ejemplos:
         version='UCLV Downloader v1.4.0'
     )
     
+    # Non-interactive subcommands for cron jobs and headless machines
+    subparsers = parser.add_subparsers(dest='command', metavar='COMANDO')
+    BatchCLI.add_commands(subparsers)
+    
     args = parser.parse_args()
     
+    if args.command:
+        sys.exit(BatchCLI(args).run())
+    
     # Determine which interface to use
     use_gui = not args.cli  # Default to GUI unless CLI is explicitly requested
     
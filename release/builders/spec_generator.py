@@ -14,6 +14,7 @@ class SpecGenerator:
     def create_spec_file(self) -> str:
         """Crea archivo .spec personalizado para PyInstaller"""
         spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_submodules
 
 block_cipher = None
 
@@ -22,6 +23,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
+    # core, gui and cli export their names lazily, which the import scanner cannot follow
     hiddenimports=[
         'tkinter',
         'tkinter.ttk',
@@ -31,7 +33,7 @@ a = Analysis(
         'bs4',
         'tqdm',
         'urllib3'
-    ],
+    ] + collect_submodules('core') + collect_submodules('gui') + collect_submodules('cli'),
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
@@ -0,0 +1,156 @@
+"""
+DownloadQueue: ordering, claims, state transitions and crash recovery against a temporary database
+"""
+
+import pytest
+
+from core.downloaders.download_queue import DownloadQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = DownloadQueue(tmp_path / 'queue.sqlite3')
+    yield queue
+    queue.close()
+
+
+def files(*names, base='http://host/Serie/'):
+    """(filename, url, type) tuples for the given names"""
+    return [(name, base + name, 'video') for name in names]
+
+
+def test_claim_follows_priority_then_insertion_order(queue):
+    low = queue.add_files(files('a.mkv'), 'out')[0]
+    high = queue.add_files(files('b.mkv'), 'other', priority=5)[0]
+    folder = queue.add_folder('http://host/Serie/', 'out')
+    
+    assert [item['id'] for item in queue.claim_next()] == [high]
+    assert [item['id'] for item in queue.claim_next()] == [low]
+    assert [item['id'] for item in queue.claim_next()] == [folder]
+    assert queue.claim_next() == []
+
+
+def test_claimed_items_become_active(queue):
+    queue.add_files(files('a.mkv'), 'out')
+    item = queue.claim_next()[0]
+    
+    assert item['state'] == DownloadQueue.ACTIVE
+    assert queue.get(item['id'])['state'] == DownloadQueue.ACTIVE
+    assert queue.counts()[DownloadQueue.ACTIVE] == 1
+    # Active items are not handed out twice
+    assert queue.claim_next() == []
+
+
+def test_files_are_claimed_together_per_download_path(queue):
+    queue.add_files(files('a.mkv', 'b.mkv'), 'out')
+    queue.add_files(files('c.mkv', base='http://host/Otra/'), 'elsewhere')
+    queue.add_files(files('d.mkv'), 'out')
+    
+    batch = queue.claim_next(limit=10)
+    assert [item['filename'] for item in batch] == ['a.mkv', 'b.mkv']
+    assert [item['filename'] for item in queue.claim_next(limit=10)] == ['c.mkv']
+    assert [item['filename'] for item in queue.claim_next(limit=10)] == ['d.mkv']
+
+
+def test_folders_are_claimed_alone(queue):
+    queue.add_folder('http://host/Serie/', 'out')
+    queue.add_files(files('a.mkv'), 'out')
+    
+    batch = queue.claim_next(limit=10)
+    assert [item['kind'] for item in batch] == ['folder']
+
+
+def test_expanded_files_take_the_place_of_their_folder(queue):
+    folder = queue.add_folder('http://host/Serie/', 'out')
+    later = queue.add_files(files('z.mkv', base='http://host/Otra/'), 'out')[0]
+    queue.claim_next()
+    
+    children = queue.add_files(files('a.mkv', 'b.mkv'), 'out', parent_id=folder)
+    queue.set_state(folder, DownloadQueue.DONE)
+    
+    assert [item['id'] for item in queue.claim_next(limit=10)] == children + [later]
+
+
+def test_duplicate_files_are_skipped_unless_failed(queue):
+    first = queue.add_files(files('a.mkv'), 'out')
+    assert queue.add_files(files('a.mkv'), 'out') == []
+    # The same URL into another folder is a different download
+    assert len(queue.add_files(files('a.mkv'), 'copy')) == 1
+    
+    queue.set_state(first[0], DownloadQueue.FAILED, 'boom')
+    assert len(queue.add_files(files('a.mkv'), 'out')) == 1
+
+
+def test_failures_count_attempts_and_can_be_retried(queue):
+    item_id = queue.add_files(files('a.mkv'), 'out')[0]
+    queue.claim_next()
+    queue.set_state(item_id, DownloadQueue.FAILED, '503 Service Unavailable')
+    
+    item = queue.get(item_id)
+    assert item['state'] == DownloadQueue.FAILED
+    assert item['attempts'] == 1
+    assert item['error'] == '503 Service Unavailable'
+    assert not queue.has_work()
+    
+    assert queue.retry_failed() == 1
+    item = queue.get(item_id)
+    assert item['state'] == DownloadQueue.PENDING
+    assert item['error'] is None
+    assert item['attempts'] == 1
+    assert queue.has_work()
+
+
+def test_unknown_state_is_rejected(queue):
+    item_id = queue.add_files(files('a.mkv'), 'out')[0]
+    with pytest.raises(ValueError):
+        queue.set_state(item_id, 'paused')
+
+
+def test_active_items_are_recovered_as_partial_after_a_crash(tmp_path):
+    path = tmp_path / 'queue.sqlite3'
+    queue = DownloadQueue(path)
+    queue.add_files(files('a.mkv', 'b.mkv'), 'out')
+    claimed = queue.claim_next()[0]
+    # Simulated crash: the session ends with the item still active
+    queue.close()
+    
+    reopened = DownloadQueue(path)
+    try:
+        assert reopened.get(claimed['id'])['state'] == DownloadQueue.PARTIAL
+        assert reopened.counts()[DownloadQueue.ACTIVE] == 0
+        # Partial items keep their place at the front of the queue
+        assert reopened.claim_next()[0]['id'] == claimed['id']
+    finally:
+        reopened.close()
+
+
+def test_move_reorders_waiting_items(queue):
+    a, b, c = queue.add_files(files('a.mkv', 'b.mkv', 'c.mkv'), 'out')
+    queue.move(c, 0)
+    assert [item['id'] for item in queue.list_items()] == [c, a, b]
+    
+    queue.claim_next()
+    with pytest.raises(ValueError):
+        queue.move(c, 2)
+    with pytest.raises(KeyError):
+        queue.move(999, 0)
+
+
+def test_remove_keeps_active_items_and_drops_children(queue):
+    folder = queue.add_folder('http://host/Serie/', 'out')
+    queue.add_files(files('a.mkv'), 'out', parent_id=folder)
+    queue.remove(folder)
+    assert queue.list_items() == []
+    
+    active = queue.add_files(files('b.mkv'), 'out')[0]
+    queue.claim_next()
+    queue.remove(active)
+    assert queue.get(active) is not None
+
+
+def test_clear_finished(queue):
+    done, waiting = queue.add_files(files('a.mkv', 'b.mkv'), 'out')
+    queue.set_state(done, DownloadQueue.DONE)
+    
+    assert queue.clear_finished() == 1
+    assert [item['id'] for item in queue.list_items()] == [waiting]
@@ -0,0 +1,120 @@
+"""
+MetricsCollector: counters from engine events and the Prometheus text format
+"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.downloaders.download_queue import DownloadQueue
+from core.downloaders.events import EventLog
+from core.downloaders.listing_cache import ListingCache
+from core.downloaders.main_downloader import UCLVDownloader
+from core.downloaders.metrics_server import MetricsCollector, MetricsServer, _escape, _format_value
+
+
+@pytest.fixture
+def downloader():
+    return UCLVDownloader(listing_cache=ListingCache(persist=False), events=EventLog([]))
+
+
+def samples(text: str) -> dict:
+    """{'name{labels}': 'value'} for every sample line"""
+    result = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            result[name] = value
+    return result
+
+
+def test_counters_follow_engine_events(downloader):
+    collector = MetricsCollector(downloader)
+    events = downloader.events
+    events.emit('batch_started', total=3, download_path='out')
+    events.emit('file_completed', filename='a', url='u', bytes=1000, resumed_from=200, transfer_s=0.5)
+    events.emit('file_completed', filename='b', url='u', bytes=500, resumed_from=0, transfer_s=None)
+    events.emit('file_exists', filename='c', url='u')
+    events.emit('retry', filename='a', url='u', attempt=1, reason='http_503', delay=1.0)
+    events.emit('retry', filename='a', url='u', attempt=2, reason='http_503', delay=2.0)
+    events.emit('file_failed', filename='d', url='u', reason='timeout', error='slow')
+    
+    values = samples(collector.render())
+    assert values['uclv_downloaded_bytes_total'] == '1500'
+    assert values['uclv_resumed_bytes_total'] == '200'
+    assert values['uclv_transfer_seconds_total'] == '0.5'
+    assert values['uclv_files_total{result="completed"}'] == '2'
+    assert values['uclv_files_total{result="existing"}'] == '1'
+    assert values['uclv_files_total{result="failed"}'] == '1'
+    assert values['uclv_retries_total{reason="http_503"}'] == '2'
+    assert values['uclv_failures_total{reason="timeout"}'] == '1'
+    assert values['uclv_batches_total'] == '1'
+    
+    collector.close()
+    events.emit('file_completed', filename='e', url='u', bytes=1, resumed_from=0, transfer_s=0.1)
+    assert samples(collector.render())['uclv_downloaded_bytes_total'] == '1500'
+
+
+def test_every_metric_has_help_and_type(downloader):
+    text = MetricsCollector(downloader).render()
+    assert text.endswith('\n')
+    
+    lines = text.splitlines()
+    for name, metric_type, _, _samples in MetricsCollector(downloader).collect():
+        assert f"# TYPE {name} {metric_type}" in lines
+        assert any(line.startswith(f"# HELP {name} ") for line in lines)
+        assert metric_type in ('counter', 'gauge')
+        # Counters end in _total as the exposition format expects
+        assert (metric_type == 'counter') == name.endswith('_total')
+
+
+def test_gauges_read_the_downloader_and_queue(downloader, tmp_path):
+    downloader.set_bandwidth_limit(2048, per_host_limit=1024)
+    queue = DownloadQueue(tmp_path / 'queue.sqlite3')
+    try:
+        queue.add_files([('a.mkv', 'http://host/a.mkv', 'video'), ('b.mkv', 'http://host/b.mkv', 'video')], 'out')
+        queue.claim_next()
+        
+        values = samples(MetricsCollector(downloader, queue).render())
+    finally:
+        queue.close()
+    
+    assert values['uclv_bandwidth_limit_bytes_per_second{scope="global"}'] == '2048'
+    assert values['uclv_bandwidth_limit_bytes_per_second{scope="host"}'] == '1024'
+    assert values['uclv_active_transfers'] == '0'
+    assert values['uclv_listing_cache_hit_ratio'] == '0'
+    assert values['uclv_queue_items{state="active"}'] == '1'
+    assert values['uclv_queue_items{state="pending"}'] == '1'
+    assert values['uclv_queue_items{state="failed"}'] == '0'
+
+
+def test_label_values_are_escaped():
+    assert _escape('a"b\\c\nd') == 'a\\"b\\\\c\\nd'
+
+
+@pytest.mark.parametrize('value, text', [
+    (3, '3'),
+    (3.0, '3'),
+    (True, '1'),
+    (0.25, '0.25'),
+    (1e-07, '1e-07'),
+])
+def test_format_value(value, text):
+    assert _format_value(value) == text
+
+
+def test_server_serves_metrics_and_404(downloader):
+    server = MetricsServer(MetricsCollector(downloader), port=0)
+    server.start()
+    try:
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            assert response.status == 200
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert b'uclv_downloaded_bytes_total 0' in response.read()
+        
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(server.url.replace('/metrics', '/other'), timeout=5)
+        assert error.value.code == 404
+    finally:
+        server.stop()
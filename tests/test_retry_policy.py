@@ -0,0 +1,114 @@
+"""
+RetryPolicy: error classification, retry decisions and backoff
+"""
+
+import errno
+import email.utils
+import time
+
+import pytest
+import requests
+
+from core.downloaders.async_http import AsyncHTTPError
+from core.downloaders.integrity import IntegrityError
+from core.downloaders.retry_policy import DownloadFailed, RetryPolicy
+
+
+def http_error(status: int, headers=None) -> requests.HTTPError:
+    """HTTPError carrying a response with the given status and headers"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+@pytest.mark.parametrize('error, reason', [
+    (http_error(503), 'http_503'),
+    (http_error(404), 'http_404'),
+    (requests.Timeout('slow'), 'timeout'),
+    (requests.ConnectionError('reset'), 'connection'),
+    (requests.exceptions.ChunkedEncodingError('cut'), 'connection'),
+    (AsyncHTTPError('slow', kind='timeout'), 'timeout'),
+    (AsyncHTTPError('closed', kind='connection'), 'connection'),
+    (IntegrityError('size mismatch'), 'integrity'),
+    (DownloadFailed('gave up', reason='http_429'), 'http_429'),
+    (requests.RequestException('odd'), 'other'),
+])
+def test_classify(error, reason):
+    assert RetryPolicy.classify(error) == reason
+
+
+@pytest.mark.parametrize('error, retryable', [
+    (http_error(500), True),
+    (http_error(503), True),
+    (http_error(408), True),
+    (http_error(429), True),
+    (http_error(403), False),
+    (http_error(404), False),
+    (http_error(418), False),
+    (requests.Timeout('slow'), True),
+    (requests.ConnectionError('reset'), True),
+    (AsyncHTTPError('closed', kind='connection'), True),
+    (IntegrityError('size mismatch'), True),
+    (DownloadFailed('x', retryable=True), True),
+    (DownloadFailed('x', retryable=False), False),
+    # Local failures would fail the same way again
+    (OSError(errno.ENOSPC, 'No space left on device'), False),
+    (PermissionError('denied'), False),
+    (KeyError('bug'), False),
+])
+def test_is_retryable(error, retryable):
+    assert RetryPolicy().is_retryable(error) is retryable
+
+
+def test_backoff_doubles_up_to_max_delay():
+    policy = RetryPolicy(base_delay=1.0, max_delay=5.0, jitter=0)
+    assert [policy.get_delay(attempt) for attempt in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def test_jitter_only_shortens_the_wait():
+    policy = RetryPolicy(base_delay=2.0, max_delay=60.0, jitter=0.5)
+    for _ in range(100):
+        assert 1.0 <= policy.get_delay(1) <= 2.0
+
+
+def test_retry_after_seconds_wins_and_is_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=30.0, jitter=0)
+    assert policy.get_delay(1, http_error(503, {'Retry-After': '7'})) == 7.0
+    assert policy.get_delay(1, http_error(503, {'Retry-After': '3600'})) == 30.0
+
+
+def test_retry_after_http_date():
+    policy = RetryPolicy(max_delay=60.0, jitter=0)
+    when = email.utils.formatdate(time.time() + 20, usegmt=True)
+    assert 15 <= policy.get_delay(1, http_error(429, {'Retry-After': when})) <= 20
+    # Dates in the past mean "now"
+    past = email.utils.formatdate(time.time() - 60, usegmt=True)
+    assert policy.get_delay(1, http_error(429, {'Retry-After': past})) == 0.0
+
+
+def test_unparseable_retry_after_falls_back_to_backoff():
+    policy = RetryPolicy(base_delay=1.0, jitter=0)
+    assert policy.get_delay(2, http_error(503, {'Retry-After': 'soon'})) == 2.0
+
+
+def test_stats_count_retries_by_reason():
+    policy = RetryPolicy()
+    policy.record_retry(http_error(503), 1.5)
+    policy.record_retry(requests.Timeout('slow'), 0.5)
+    policy.record_retry(requests.Timeout('slow'), 0.25)
+    policy.record('deferred', 2)
+    
+    stats = policy.get_stats()
+    assert stats['retries'] == 3
+    assert stats['wait_s'] == 2.25
+    assert stats['deferred'] == 2
+    assert stats['reasons'] == {'http_503': 1, 'timeout': 2}
+    
+    policy.reset_stats()
+    assert policy.get_stats()['retries'] == 0
+    assert policy.get_stats()['reasons'] == {}
+
+
+def test_max_retries_is_at_least_one():
+    assert RetryPolicy(max_retries=0).max_retries == 1